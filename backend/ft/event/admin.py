@@ -71,7 +71,7 @@ class EventHostingRequestAdmin(admin.ModelAdmin):
     list_filter = ("status",)
     readonly_fields = ("created_at", "updated_at")
     search_fields = (
-        "hosting__event__name",
+        "event__name",
         "requester__first_name",
         "requester__last_name",
     )
@@ -99,6 +99,7 @@ class CarpoolTripAdmin(admin.ModelAdmin):
         "arrival_city",
     )
     ordering = ("-departure_datetime",)
+    list_select_related = ("driver", "event")
 
 
 @admin.register(CarpoolRequest)
@@ -109,6 +110,7 @@ class CarpoolRequestAdmin(admin.ModelAdmin):
         "status",
         "seats_requested",
         "is_paid",
+        "amount_paid",
         "is_active",
         "created_at",
     )
@@ -121,3 +123,8 @@ class CarpoolRequestAdmin(admin.ModelAdmin):
         "trip__arrival_city",
     )
     ordering = ("-created_at",)
+    list_select_related = ("passenger", "trip")
+
+    def get_queryset(self, request):
+        # Statut de paiement calculé en une requête pour toute la liste
+        return super().get_queryset(request).with_payment_totals()
@@ -0,0 +1,154 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, When
+from django.utils import timezone
+
+from ft.event.cache import bump_carpool_ledger_version
+from ft.event.models import (
+    CarpoolRequest,
+    CarpoolTrip,
+    Event,
+    EventHosting,
+    EventHostingRequest,
+)
+
+
+def assign_carpool_seats(event, dry_run=False):
+    """
+    Attribue les places des trajets actifs d'un événement aux demandes en
+    attente, par ordre d'arrivée des demandes.
+
+    Une demande est acceptée si son trajet a encore assez de places libres ;
+    sinon elle reste en attente, sans bloquer les demandes suivantes qui
+    tiennent dans les places restantes. Les demandes d'un même passager sont
+    traitées indépendamment (trajets aller et retour, par exemple).
+
+    Le calcul est fait en mémoire sur les demandes lues en une requête, puis
+    appliqué par des UPDATE groupés dans une seule transaction. Renvoie les
+    identifiants des demandes acceptées et restées en attente.
+    """
+    with transaction.atomic():
+        # Verrouiller les trajets, comme une acceptation manuelle
+        # (CarpoolRequestViewSet.reserve_seats), pour ne pas attribuer deux
+        # fois les mêmes places
+        free_seats = dict(
+            CarpoolTrip.objects.select_for_update()
+            .filter(event=event, is_active=True)
+            .with_free_seats()
+            .order_by("pk")
+            .values_list("pk", "free_seats")
+        )
+        # Les demandes lues sont verrouillées jusqu'à leur mise à jour, pour
+        # qu'une annulation concurrente ne soit pas écrasée
+        pending = (
+            CarpoolRequest.objects.select_for_update(of=("self",))
+            .filter(
+                trip__event=event,
+                trip__is_active=True,
+                status="PENDING",
+                is_active=True,
+            )
+            .order_by("created_at", "id")
+            .values_list("pk", "trip_id", "seats_requested")
+        )
+
+        accepted, waiting = [], []
+        for pk, trip, seats in pending:
+            if free_seats[trip] >= seats:
+                free_seats[trip] -= seats
+                accepted.append((pk, trip, seats))
+            else:
+                waiting.append(pk)
+
+        if not dry_run:
+            now = timezone.now()
+            CarpoolRequest.objects.filter(
+                pk__in=[pk for pk, _, _ in accepted], status="PENDING"
+            ).update(status="ACCEPTED", updated_at=now)
+            # update() ne passe pas par CarpoolRequest.save() : les places
+            # attribuées sont ajoutées aux trajets (verrouillés) en un UPDATE
+            # (un cas par nombre de places ajoutées, et non par trajet)
+            seats = Counter()
+            for pk, trip, requested in accepted:
+                seats[trip] += requested
+            trips_by_delta = defaultdict(list)
+            for trip, delta in seats.items():
+                trips_by_delta[delta].append(trip)
+            if seats:
+                CarpoolTrip.objects.filter(pk__in=seats).update(
+                    seats_taken=F("seats_taken")
+                    + Case(
+                        *(
+                            When(pk__in=trips, then=delta)
+                            for delta, trips in trips_by_delta.items()
+                        )
+                    )
+                )
+            # update() n'envoie pas non plus de signal post_save
+            bump_carpool_ledger_version(Event.objects.filter(pk=event.pk))
+
+    return {
+        "accepted": [pk for pk, _, _ in accepted],
+        "pending": waiting,
+    }
+
+
+def assign_hosting_beds(event, dry_run=False):
+    """
+    Attribue les lits des hébergements actifs d'un événement aux demandes
+    d'hébergement en attente, par ordre d'arrivée des demandes.
+
+    Une demande est acceptée si l'hébergement demandé a encore un lit (après
+    les demandes déjà acceptées) ; sinon elle reste en attente, sans bloquer
+    les demandes suivantes. Comme pour les covoiturages, une demande n'est
+    jamais reportée sur un autre hébergement, dont l'hôte ne l'a pas reçue.
+
+    Le calcul est fait en mémoire, puis appliqué par un UPDATE groupé dans
+    une seule transaction. Renvoie les identifiants des demandes acceptées et
+    restées en attente.
+    """
+    Status = EventHostingRequest.Status
+    with transaction.atomic():
+        # Verrouiller les hébergements, comme une acceptation manuelle
+        # (EventHostingRequestViewSet.reserve_bed), pour ne pas attribuer deux
+        # fois les mêmes lits
+        hostings = list(
+            EventHosting.objects.select_for_update()
+            .filter(event=event)
+            .order_by("pk")
+            .values_list("pk", "available_beds", "is_active")
+        )
+        pending = list(
+            EventHostingRequest.objects.select_for_update()
+            .filter(event=event, status=Status.PENDING)
+            .order_by("created_at", "id")
+            .values_list("pk", "hosting_id")
+        )
+        # Lu après les verrous, dans une nouvelle requête : les acceptations
+        # validées pendant l'attente sont comptées
+        accepted_guests = Counter(
+            EventHostingRequest.objects.filter(
+                event=event, status=Status.ACCEPTED
+            ).values_list("hosting_id", flat=True)
+        )
+
+        free_beds = {
+            pk: max(beds - accepted_guests[pk], 0) if is_active else 0
+            for pk, beds, is_active in hostings
+        }
+
+        accepted, waiting = [], []
+        for pk, hosting in pending:
+            if free_beds[hosting]:
+                free_beds[hosting] -= 1
+                accepted.append(pk)
+            else:
+                waiting.append(pk)
+
+        if not dry_run:
+            EventHostingRequest.objects.filter(
+                pk__in=accepted, status=Status.PENDING
+            ).update(status=Status.ACCEPTED, updated_at=timezone.now())
+
+    return {"accepted": accepted, "pending": waiting}
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     name = "ft.event"
     verbose_name = "Evenements"
+
+    def ready(self):
+        from ft.event import signals  # noqa: F401
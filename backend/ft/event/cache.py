@@ -0,0 +1,73 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+# Les entrées ne sont jamais invalidées explicitement : une modification
+# incrémente Event.cache_version, ce qui change la clé. L'expiration ne sert
+# qu'à libérer les anciennes versions.
+EVENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def event_cache_key(event):
+    """
+    Renvoie la clé de cache de la représentation sérialisée d'un événement.
+    """
+    return f"event:{event.pk}:v{event.cache_version}"
+
+
+def get_cached_events(events):
+    """
+    Renvoie les représentations en cache des événements donnés, indexées par
+    clé de cache, en une seule lecture (get_many).
+    """
+    return cache.get_many([event_cache_key(event) for event in events])
+
+
+def set_cached_events(representations):
+    """
+    Enregistre des représentations sérialisées, indexées par clé de cache.
+    """
+    cache.set_many(representations, timeout=EVENT_CACHE_TIMEOUT)
+
+
+def bump_event_cache_version(events):
+    """
+    Incrémente la version du cache des événements donnés (QuerySet).
+    """
+    return events.update(**cache_version_bump())
+
+
+def cache_version_bump():
+    """
+    Renvoie les valeurs d'UPDATE qui invalident la représentation d'un
+    événement : la version du cache et la date de mise à jour (utilisée dans
+    l'ETag des listes) avancent ensemble.
+    """
+    return {"cache_version": F("cache_version") + 1, "updated_at": timezone.now()}
+
+
+def carpool_ledger_cache_key(event, group_by):
+    """
+    Renvoie la clé de cache du registre des paiements de covoiturage d'un
+    événement, pour un groupement donné (par trajet, conducteur...).
+    """
+    return f"carpool-ledger:{event.pk}:{group_by}:v{event.carpool_ledger_version}"
+
+
+def bump_carpool_ledger_version(events):
+    """
+    Invalide le registre des paiements de covoiturage des événements donnés
+    (QuerySet). La version est conservée en base, comme cache_version, pour
+    changer dans tous les processus ; la date de mise à jour de l'événement,
+    elle, ne change pas.
+
+    L'UPDATE est exécuté après la validation de la transaction en cours, hors
+    de celle-ci : la ligne de l'événement n'est verrouillée que le temps de
+    cet UPDATE, et non jusqu'à la fin de chaque écriture de covoiturage. Un
+    calcul concurrent ne peut donc mettre en cache, sous l'ancienne version,
+    que des données déjà remplacées.
+    """
+    transaction.on_commit(
+        lambda: events.update(carpool_ledger_version=F("carpool_ledger_version") + 1)
+    )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ft.event.allocation import assign_carpool_seats
+from ft.event.models import Event
+
+
+class Command(BaseCommand):
+    help = (
+        "Attribue les places des trajets d'un événement aux demandes de "
+        "covoiturage en attente, par ordre d'arrivée."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("event", type=int, help="Identifiant de l'événement.")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Calcule l'attribution sans modifier les demandes.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            event = Event.objects.get(pk=options["event"])
+        except Event.DoesNotExist:
+            raise CommandError(f"Événement #{options['event']} introuvable.")
+
+        result = assign_carpool_seats(event, dry_run=options["dry_run"])
+        summary = (
+            f"{len(result['accepted'])} demande(s) acceptée(s), "
+            f"{len(result['pending'])} toujours en attente"
+        )
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"{summary} (aucune modification)."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{summary}."))
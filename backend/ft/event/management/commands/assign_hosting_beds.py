@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ft.event.allocation import assign_hosting_beds
+from ft.event.models import Event
+
+
+class Command(BaseCommand):
+    help = (
+        "Attribue les lits des hébergements d'un événement aux demandes "
+        "d'hébergement en attente, par ordre d'arrivée."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("event", type=int, help="Identifiant de l'événement.")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Calcule l'attribution sans modifier les demandes.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            event = Event.objects.get(pk=options["event"])
+        except Event.DoesNotExist:
+            raise CommandError(f"Événement #{options['event']} introuvable.")
+
+        result = assign_hosting_beds(event, dry_run=options["dry_run"])
+        summary = (
+            f"{len(result['accepted'])} demande(s) acceptée(s), "
+            f"{len(result['pending'])} toujours en attente"
+        )
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"{summary} (aucune modification)."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{summary}."))
@@ -0,0 +1,85 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+
+from ft.event.allocation import assign_hosting_beds
+from ft.event.models import Event, EventHostingRequest
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure l'attribution automatique des lits d'hébergement "
+        "(assign_hosting_beds) sur les événements ayant le plus de demandes "
+        "en attente. Les attributions sont annulées après chaque mesure."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--events",
+            type=int,
+            default=3,
+            help="Nombre d'événements mesurés, parmi les plus demandés (défaut: 3).",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Nombre de mesures par événement (défaut: 5).",
+        )
+        parser.add_argument(
+            "--budget-ms",
+            type=float,
+            default=500,
+            help="Durée médiane maximale tolérée, en millisecondes (défaut: 500).",
+        )
+
+    def handle(self, *args, **options):
+        self.repeat = options["repeat"]
+        busiest = (
+            EventHostingRequest.objects.filter(status="PENDING")
+            .values_list("event", flat=True)
+            .annotate(pending=Count("pk"))
+            .order_by("-pending")[: options["events"]]
+        )
+        if not busiest:
+            raise CommandError(
+                "Aucune demande en attente : lancer d'abord seed_perf_data."
+            )
+
+        too_slow = []
+        events = Event.objects.in_bulk(list(busiest))
+        for event in map(events.get, busiest):
+            result, duration_ms = self.measure(event)
+            self.stdout.write(
+                f"Événement #{event.pk} : {len(result['accepted'])} acceptée(s), "
+                f"{len(result['pending'])} en attente sur "
+                f"{len(result['accepted']) + len(result['pending'])} demande(s) : "
+                f"{duration_ms:.1f} ms"
+            )
+            if duration_ms > options["budget_ms"]:
+                too_slow.append(event.pk)
+
+        if too_slow:
+            raise CommandError(
+                f"{len(too_slow)} événement(s) au-delà de {options['budget_ms']} ms."
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Attributions sous {options['budget_ms']} ms.")
+        )
+
+    def measure(self, event):
+        """
+        Renvoie le résultat et la durée médiane, en millisecondes, de
+        l'attribution appliquée puis annulée.
+        """
+        durations = []
+        for _ in range(self.repeat):
+            with transaction.atomic():
+                started = time.perf_counter()
+                result = assign_hosting_beds(event)
+                durations.append((time.perf_counter() - started) * 1000)
+                transaction.set_rollback(True)
+        return result, statistics.median(durations)
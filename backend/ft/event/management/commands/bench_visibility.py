@@ -0,0 +1,120 @@
+import re
+import statistics
+import time
+from functools import reduce
+from operator import or_
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Q
+
+from ft.event.models import CarpoolPayment, CarpoolRequest, EventHostingRequest
+
+PAGE_SIZE = 20
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le filtrage par participant (visible_to) des demandes de "
+        "covoiturage, paiements et demandes d'hébergement pour les "
+        "utilisateurs les plus actifs, le compare à l'ancien OR entre "
+        "jointures, et vérifie que chaque participant est filtré par un index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=3,
+            help=(
+                "Nombre d'utilisateurs mesurés par participant, parmi les plus "
+                "actifs et au hasard (défaut: 3)."
+            ),
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Nombre de mesures par requête (défaut: 5).",
+        )
+
+    def handle(self, *args, **options):
+        self.repeat = options["repeat"]
+        unindexed = []
+
+        for model in (CarpoolRequest, CarpoolPayment, EventHostingRequest):
+            table = model._meta.db_table
+            self.stdout.write(self.style.MIGRATE_HEADING(table))
+            for user in self.sample_users(model, options["users"]):
+                page = (
+                    model.objects.visible_to(user)
+                    .order_by("-created_at", "id")
+                    .values_list("pk", flat=True)
+                )
+                legacy = (
+                    model.objects.filter(
+                        reduce(
+                            or_,
+                            (
+                                Q(**{lookup: user})
+                                for lookup in model.objects.all().participant_lookups
+                            ),
+                        )
+                    )
+                    .order_by("-created_at", "id")
+                    .values_list("pk", flat=True)
+                )
+
+                rows = page.count()
+                union_ms = self.measure(lambda: list(page[:PAGE_SIZE]))
+                legacy_ms = self.measure(lambda: list(legacy[:PAGE_SIZE]))
+                count_ms = self.measure(page.count)
+                plan = page[:PAGE_SIZE].explain()
+                # Pour les utilisateurs très actifs, la base peut préférer
+                # relire la table et joindre par hachage plutôt que d'accéder
+                # à chaque ligne par sa clé primaire
+                fetch = "clé primaire" if f"{table}_pkey" in plan else "hachage"
+                self.stdout.write(
+                    f"  utilisateur {user} : {rows} lignes, page {union_ms:.2f} ms "
+                    f"(OR : {legacy_ms:.2f} ms), count {count_ms:.2f} ms, "
+                    f"lignes lues par {fetch}"
+                )
+                for lookup in model.objects.all().participant_lookups:
+                    column = f"{lookup.rsplit('__', 1)[-1]}_id"
+                    if not re.search(rf"Index Cond: \({column} = {user}\)", plan):
+                        unindexed.append((table, user, plan))
+
+        if unindexed:
+            for table, user, plan in unindexed:
+                self.stderr.write(f"{table}, utilisateur {user} :\n{plan}")
+            raise CommandError(
+                f"{len(unindexed)} plan(s) filtrant un participant sans index."
+            )
+        self.stdout.write(
+            self.style.SUCCESS("Chaque participant est filtré par un index.")
+        )
+
+    def sample_users(self, model, count):
+        """
+        Renvoie, pour chaque participant, les utilisateurs ayant le plus de
+        lignes (les cas les plus coûteux) et quelques utilisateurs au hasard
+        (les cas courants).
+        """
+        users = []
+        for lookup in model.objects.all().participant_lookups:
+            participants = model.objects.values_list(lookup, flat=True)
+            users.extend(
+                participants.annotate(rows=Count("pk")).order_by("-rows")[:count]
+            )
+            users.extend(participants.order_by("?")[:count])
+        return list(dict.fromkeys(users))
+
+    def measure(self, run):
+        """
+        Renvoie la durée médiane d'exécution, en millisecondes.
+        """
+        durations = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            run()
+            durations.append((time.perf_counter() - started) * 1000)
+        return statistics.median(durations)
@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ft.event.models import Event
+from ft.event.models.Event import SUBSCRIPTION_COUNTER_FIELDS
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule les compteurs d'inscriptions des événements "
+        "(yes_count, no_count, maybe_count) et signale les écarts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Signale les écarts sans corriger les compteurs.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Nombre d'événements corrigés par requête.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        batch_size = options["batch_size"]
+        counter_fields = list(SUBSCRIPTION_COUNTER_FIELDS.values())
+
+        # Décompte réel calculé en une seule requête avec des agrégats
+        # conditionnels, comparé aux compteurs stockés
+        events = (
+            Event.objects.with_subscription_counts()
+            .order_by("pk")
+            .only("pk", "name", *counter_fields)
+        )
+
+        drifted_ids = []
+        for event in events.iterator(chunk_size=batch_size):
+            changes = []
+            for field in counter_fields:
+                expected = getattr(event, f"subscriptions_{field}")
+                stored = getattr(event, field)
+                if stored != expected:
+                    changes.append(f"{field} {stored} → {expected}")
+            if changes:
+                drifted_ids.append(event.pk)
+                self.stdout.write(
+                    f"Événement #{event.pk} ({event.name}) : " + ", ".join(changes)
+                )
+
+        if not drifted_ids:
+            self.stdout.write(self.style.SUCCESS("Aucun écart détecté."))
+            return
+
+        if dry_run:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{len(drifted_ids)} événement(s) en écart (aucune correction)."
+                )
+            )
+            return
+
+        # Les compteurs sont recalculés par la base au moment de l'UPDATE, pour
+        # ne pas écraser une inscription arrivée entre-temps
+        with transaction.atomic():
+            for start in range(0, len(drifted_ids), batch_size):
+                Event.objects.filter(
+                    pk__in=drifted_ids[start : start + batch_size]
+                ).recompute_subscription_counters()
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(drifted_ids)} événement(s) corrigé(s).")
+        )
@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ft.event.models import CarpoolTrip
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule les places attribuées des trajets de covoiturage "
+        "(seats_taken) et signale les écarts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Signale les écarts sans corriger les places attribuées.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Nombre de trajets corrigés par requête.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        batch_size = options["batch_size"]
+
+        # Places réellement attribuées calculées en une seule requête,
+        # comparées à la colonne stockée
+        trips = (
+            CarpoolTrip.objects.with_accepted_seats()
+            .order_by("pk")
+            .only("pk", "departure_city", "arrival_city", "seats_taken")
+        )
+
+        drifted_ids = []
+        for trip in trips.iterator(chunk_size=batch_size):
+            if trip.seats_taken != trip.accepted_seats:
+                drifted_ids.append(trip.pk)
+                self.stdout.write(
+                    f"Trajet #{trip.pk} ({trip.departure_city} → "
+                    f"{trip.arrival_city}) : seats_taken {trip.seats_taken} → "
+                    f"{trip.accepted_seats}"
+                )
+
+        if not drifted_ids:
+            self.stdout.write(self.style.SUCCESS("Aucun écart détecté."))
+            return
+
+        if dry_run:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{len(drifted_ids)} trajet(s) en écart (aucune correction)."
+                )
+            )
+            return
+
+        # Les places sont recalculées par la base au moment de l'UPDATE, pour
+        # ne pas écraser une acceptation arrivée entre-temps
+        with transaction.atomic():
+            for start in range(0, len(drifted_ids), batch_size):
+                CarpoolTrip.objects.filter(
+                    pk__in=drifted_ids[start : start + batch_size]
+                ).recompute_seats_taken()
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(drifted_ids)} trajet(s) corrigé(s).")
+        )
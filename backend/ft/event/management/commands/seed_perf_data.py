@@ -0,0 +1,466 @@
+import random
+import secrets
+import time
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate, islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from ft.event.models import (
+    CarpoolPayment,
+    CarpoolRequest,
+    CarpoolTrip,
+    Event,
+    EventHosting,
+    EventHostingRequest,
+    EventSubscription,
+)
+from ft.geo import geocode_city
+from ft.user.models import Membership, User
+
+FIRST_NAMES = [
+    "Camille",
+    "Léa",
+    "Manon",
+    "Chloé",
+    "Inès",
+    "Lucas",
+    "Hugo",
+    "Louis",
+    "Théo",
+    "Maël",
+    "Jules",
+    "Emma",
+    "Zoé",
+    "Arthur",
+    "Nathan",
+    "Sarah",
+]
+LAST_NAMES = [
+    "Martin",
+    "Bernard",
+    "Dubois",
+    "Thomas",
+    "Robert",
+    "Richard",
+    "Petit",
+    "Durand",
+    "Leroy",
+    "Moreau",
+    "Simon",
+    "Laurent",
+    "Lefebvre",
+    "Michel",
+    "Garcia",
+    "Belval",
+]
+CITIES = [
+    "Compiègne",
+    "Amiens",
+    "Paris",
+    "Lille",
+    "Beauvais",
+    "Reims",
+    "Rouen",
+    "Creil",
+    "Noyon",
+    "Senlis",
+    "Soissons",
+    "Saint-Quentin",
+    "Lyon",
+    "Nancy",
+    "Troyes",
+]
+EVENT_TYPES = ["CONGRESS", "DRINK", "OFFICE", "OTHER"]
+
+
+def zipf_weights(size, exponent):
+    """
+    Poids cumulés décroissants (loi de Zipf) : quelques éléments très
+    populaires et une longue traîne d'éléments peu sollicités. Les poids sont
+    cumulés une fois pour toutes, random.choices les recalculant sinon à
+    chaque tirage.
+    """
+    return list(accumulate(1 / (rank**exponent) for rank in range(1, size + 1)))
+
+
+class Command(BaseCommand):
+    help = (
+        "Génère un jeu de données volumineux et réaliste (utilisateurs, "
+        "événements, inscriptions, hébergements, covoiturages, paiements) "
+        "pour les mesures de performance et les tests de charge."
+    )
+
+    def add_arguments(self, parser):
+        volumes = {
+            "users": 5000,
+            "events": 500,
+            "subscriptions": 100000,
+            "hostings": 1000,
+            "hosting-requests": 5000,
+            "trips": 3000,
+            "carpool-requests": 15000,
+        }
+        for name, default in volumes.items():
+            parser.add_argument(
+                f"--{name}",
+                type=int,
+                default=default,
+                help=f"Nombre de lignes à générer (défaut: {default}).",
+            )
+        parser.add_argument(
+            "--payment-ratio",
+            type=float,
+            default=0.6,
+            help="Part des demandes acceptées ayant un paiement (défaut: 0.6).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Nombre de lignes par INSERT (défaut: 5000).",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=None,
+            help="Graine du générateur aléatoire, pour un jeu reproductible.",
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.now = timezone.now()
+        # Préfixe propre à cette exécution pour pouvoir relancer la commande
+        self.run = secrets.token_hex(3)
+        started = time.monotonic()
+
+        with transaction.atomic():
+            users = self.create_users(options["users"])
+            self.create_memberships(users)
+            events = self.create_events(options["events"])
+            self.create_subscriptions(users, events, options["subscriptions"])
+            hostings = self.create_hostings(users, events, options["hostings"])
+            self.create_hosting_requests(users, hostings, options["hosting_requests"])
+            trips = self.create_trips(users, events, options["trips"])
+            accepted = self.create_carpool_requests(
+                users, trips, options["carpool_requests"]
+            )
+            self.create_payments(accepted, options["payment_ratio"])
+
+            # Les bulk_create contournent save() : on recalcule les colonnes
+            # dénormalisées des lignes créées
+            Event.objects.filter(pk__in=[event[0] for event in events]).order_by(
+                "pk"
+            ).recompute_subscription_counters()
+            CarpoolTrip.objects.filter(
+                pk__in=[trip[0] for trip in trips]
+            ).recompute_seats_taken()
+            CarpoolRequest.objects.filter(
+                pk__in=[carpool_request for carpool_request, _ in accepted]
+            ).recompute_amount_paid()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Jeu de données « {self.run} » généré en "
+                f"{time.monotonic() - started:.1f} s."
+            )
+        )
+
+    def insert(self, model, objects):
+        """
+        Insère les objets générés par lots avec bulk_create, sans les garder
+        tous en mémoire, et étale leur date de création sur l'année écoulée.
+        Renvoie les clés primaires créées.
+        """
+        pks = []
+        objects = iter(objects)
+        while batch := list(islice(objects, self.batch_size)):
+            pks.extend(obj.pk for obj in model.objects.bulk_create(batch))
+
+        if pks and any(field.name == "created_at" for field in model._meta.fields):
+            model.objects.filter(pk__in=pks).update(
+                created_at=F("created_at")
+                - RawSQL("random() * interval '365 days'", [])
+            )
+        self.stdout.write(f"  {model._meta.verbose_name_plural} : {len(pks)}")
+        return pks
+
+    def create_users(self, count):
+        password = make_password("tocarde")
+
+        def generate():
+            for n in range(count):
+                email = f"perf-{self.run}-{n}@tocarde.fr"
+                has_car = self.random.random() < 0.3
+                can_host = self.random.random() < 0.2
+                yield User(
+                    email=email,
+                    username=email,
+                    password=password,
+                    first_name=self.random.choice(FIRST_NAMES),
+                    last_name=self.random.choice(LAST_NAMES),
+                    city=self.random.choice(CITIES),
+                    is_staff=False,
+                    has_car=has_car,
+                    car_seats=self.random.randint(2, 5) if has_car else 1,
+                    can_host_peoples=can_host,
+                    home_available_beds=self.random.randint(1, 4) if can_host else 1,
+                )
+
+        pks = self.insert(User, generate())
+        # Quelques utilisateurs très actifs, beaucoup d'occasionnels
+        self.user_weights = zipf_weights(len(pks), 0.8)
+        return pks
+
+    def pick_users(self, users, k):
+        return self.random.choices(users, cum_weights=self.user_weights, k=k)
+
+    def create_memberships(self, users):
+        def generate():
+            for user in users:
+                # Adhésions annuelles consécutives, sans chevauchement, la
+                # dernière en cours
+                years = self.random.choices([0, 1, 2, 3], weights=[3, 4, 2, 1])[0]
+                offset = self.random.randrange(365)
+                for year in range(years):
+                    start = self.now - timedelta(days=365 * year + offset)
+                    yield Membership(
+                        user_id=user,
+                        start_date=start,
+                        end_date=start + timedelta(days=364),
+                    )
+
+        self.insert(Membership, generate())
+
+    def create_events(self, count):
+        events = []
+
+        def generate():
+            for n in range(count):
+                # Beaucoup d'événements passés, quelques-uns à venir
+                if self.random.random() < 0.8:
+                    start = self.now - timedelta(days=self.random.uniform(1, 1095))
+                else:
+                    start = self.now + timedelta(days=self.random.uniform(1, 180))
+                event = Event(
+                    name=f"Événement {self.run}-{n}",
+                    description="Généré par seed_perf_data",
+                    location=self.random.choice(CITIES),
+                    at_compiegne=self.random.random() < 0.6,
+                    start_date=start,
+                    end_date=start + timedelta(hours=self.random.choice([4, 8, 48])),
+                    type=self.random.choice(EVENT_TYPES),
+                )
+                events.append(event)
+                yield event
+
+        self.insert(Event, generate())
+        # Quelques événements phares concentrent l'essentiel des réponses
+        self.event_weights = zipf_weights(len(events), 1.1)
+        return [(event.pk, event.start_date) for event in events]
+
+    def pick_events(self, events, k):
+        return self.random.choices(events, cum_weights=self.event_weights, k=k)
+
+    def create_subscriptions(self, users, events, count):
+        seen = set()
+
+        def generate():
+            attempts = 0
+            while len(seen) < count and attempts < count * 3:
+                attempts += 1
+                (event, _), user = (
+                    self.pick_events(events, 1)[0],
+                    self.pick_users(users, 1)[0],
+                )
+                if (event, user) in seen:
+                    continue
+                seen.add((event, user))
+                yield EventSubscription(
+                    event_id=event,
+                    user_id=user,
+                    answer=self.random.choices(
+                        ["YES", "MAYBE", "NO"], weights=[6, 2, 2]
+                    )[0],
+                    is_active=self.random.random() < 0.95,
+                )
+
+        self.insert(EventSubscription, generate())
+
+    def create_hostings(self, users, events, count):
+        hostings = []
+        seen = set()
+
+        def generate():
+            attempts = 0
+            while len(seen) < count and attempts < count * 3:
+                attempts += 1
+                (event, _), host = self.pick_events(events, 1)[0], self.random.choice(
+                    users
+                )
+                if (event, host) in seen:
+                    continue
+                seen.add((event, host))
+                hosting = EventHosting(
+                    event_id=event,
+                    host_id=host,
+                    available_beds=self.random.randint(1, 4),
+                    is_active=self.random.random() < 0.9,
+                )
+                hostings.append(hosting)
+                yield hosting
+
+        self.insert(EventHosting, generate())
+        return [
+            (hosting.pk, hosting.event_id, hosting.host_id, hosting.available_beds)
+            for hosting in hostings
+        ]
+
+    def create_hosting_requests(self, users, hostings, count):
+        Status = EventHostingRequest.Status
+        seen = set()
+        # Une seule demande active (en attente ou acceptée) par événement et
+        # par demandeur, et jamais plus de lits acceptés que disponibles
+        active = set()
+        accepted = {}
+        hosting_weights = zipf_weights(len(hostings), 0.7)
+
+        def generate():
+            attempts = 0
+            while len(seen) < count and attempts < count * 3:
+                attempts += 1
+                hosting, event, host, beds = self.random.choices(
+                    hostings, cum_weights=hosting_weights
+                )[0]
+                requester = self.pick_users(users, 1)[0]
+                if requester == host or (hosting, requester) in seen:
+                    continue
+                seen.add((hosting, requester))
+
+                status = self.random.choices(
+                    [
+                        Status.PENDING,
+                        Status.ACCEPTED,
+                        Status.REJECTED,
+                        Status.CANCELLED,
+                    ],
+                    weights=[3, 4, 2, 1],
+                )[0]
+                if status == Status.ACCEPTED and accepted.get(hosting, 0) >= beds:
+                    status = Status.REJECTED
+                if status in (Status.PENDING, Status.ACCEPTED):
+                    if (requester, event) in active:
+                        status = Status.CANCELLED
+                    else:
+                        active.add((requester, event))
+                if status == Status.ACCEPTED:
+                    accepted[hosting] = accepted.get(hosting, 0) + 1
+
+                yield EventHostingRequest(
+                    hosting_id=hosting,
+                    event_id=event,
+                    requester_id=requester,
+                    status=status,
+                )
+
+        self.insert(EventHostingRequest, generate())
+
+    def create_trips(self, users, events, count):
+        trips = []
+
+        def generate():
+            for _ in range(count):
+                event, start = self.pick_events(events, 1)[0]
+                departure, arrival = self.random.sample(CITIES, 2)
+                # bulk_create n'appelle pas save() : géocoder ici
+                latitude, longitude = geocode_city(departure)
+                trip = CarpoolTrip(
+                    driver_id=self.random.choice(users),
+                    event_id=event if self.random.random() < 0.9 else None,
+                    departure_city=departure,
+                    departure_latitude=latitude,
+                    departure_longitude=longitude,
+                    arrival_city=arrival,
+                    departure_datetime=start
+                    - timedelta(hours=self.random.uniform(1, 12)),
+                    seats_total=self.random.randint(1, 4),
+                    price_per_seat=Decimal(self.random.choice([0, 3, 5, 8, 10, 15])),
+                    is_active=self.random.random() < 0.95,
+                )
+                trips.append(trip)
+                yield trip
+
+        self.insert(CarpoolTrip, generate())
+        return [
+            (trip.pk, trip.driver_id, trip.seats_total, trip.price_per_seat)
+            for trip in trips
+        ]
+
+    def create_carpool_requests(self, users, trips, count):
+        seen = set()
+        seats_taken = {}
+        requests = []
+        # Les trajets vers les événements phares sont les plus demandés
+        trip_weights = zipf_weights(len(trips), 0.6)
+
+        def generate():
+            attempts = 0
+            while len(seen) < count and attempts < count * 3:
+                attempts += 1
+                trip, driver, seats_total, price = self.random.choices(
+                    trips, cum_weights=trip_weights
+                )[0]
+                passenger = self.pick_users(users, 1)[0]
+                if passenger == driver or (passenger, trip) in seen:
+                    continue
+                seen.add((passenger, trip))
+
+                seats = self.random.choices([1, 2], weights=[9, 1])[0]
+                status = self.random.choices(
+                    ["PENDING", "ACCEPTED", "REJECTED", "CANCELLED"],
+                    weights=[3, 4, 2, 1],
+                )[0]
+                if status == "ACCEPTED":
+                    if seats_taken.get(trip, 0) + seats > seats_total:
+                        status = "REJECTED"
+                    else:
+                        seats_taken[trip] = seats_taken.get(trip, 0) + seats
+
+                carpool_request = CarpoolRequest(
+                    trip_id=trip,
+                    passenger_id=passenger,
+                    status=status,
+                    seats_requested=seats,
+                )
+                if status == "ACCEPTED":
+                    requests.append((carpool_request, price * seats))
+                yield carpool_request
+
+        self.insert(CarpoolRequest, generate())
+        return [(carpool_request.pk, amount) for carpool_request, amount in requests]
+
+    def create_payments(self, accepted, ratio):
+        def generate():
+            for carpool_request, amount in accepted:
+                if not amount or self.random.random() > ratio:
+                    continue
+                completed = self.random.random() < 0.8
+                yield CarpoolPayment(
+                    request_id=carpool_request,
+                    amount=amount
+                    if completed
+                    else (amount / 2).quantize(Decimal("0.01")),
+                    is_completed=completed,
+                    payment_method=self.random.choice(
+                        ["CASH", "TRANSFER", "MOBILE", "OTHER"]
+                    ),
+                )
+
+        self.insert(CarpoolPayment, generate())
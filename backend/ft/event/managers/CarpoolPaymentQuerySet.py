@@ -0,0 +1,10 @@
+from .VisibilityQuerySet import VisibilityQuerySet
+
+
+class CarpoolPaymentQuerySet(VisibilityQuerySet):
+    """
+    QuerySet des paiements de covoiturage, visibles du passager et du
+    conducteur.
+    """
+
+    participant_lookups = ("request__passenger", "request__trip__driver")
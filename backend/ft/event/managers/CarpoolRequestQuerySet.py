@@ -0,0 +1,98 @@
+from decimal import Decimal
+
+from django.db import models
+from django.db.models import (
+    Count,
+    Exists,
+    F,
+    OuterRef,
+    Prefetch,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce
+
+from .VisibilityQuerySet import VisibilityQuerySet
+
+
+class CarpoolRequestQuerySet(VisibilityQuerySet):
+    """
+    QuerySet des demandes de covoiturage, visibles du passager et du
+    conducteur, avec les annotations utilisées par l'API.
+    """
+
+    participant_lookups = ("passenger", "trip__driver")
+
+    def with_payment_totals(self):
+        """
+        Annote la présence d'un paiement complet (has_completed_payment) par
+        une sous-requête, pour ne pas multiplier les lignes avec les autres
+        jointures. Le montant payé est lu dans la colonne amount_paid.
+        """
+        from ft.event.models import CarpoolPayment
+
+        return self.annotate(
+            has_completed_payment=Exists(
+                CarpoolPayment.objects.filter(request=OuterRef("pk"), is_completed=True)
+            ),
+        )
+
+    def recompute_amount_paid(self):
+        """
+        Réécrit la colonne dénormalisée amount_paid à partir des paiements,
+        dans un seul UPDATE évalué par la base.
+        """
+        from ft.event.models import CarpoolPayment
+
+        return self.update(
+            amount_paid=Coalesce(
+                Subquery(
+                    CarpoolPayment.objects.filter(request=OuterRef("pk"))
+                    .order_by()
+                    .values("request")
+                    .annotate(total=Sum("amount"))
+                    .values("total")
+                ),
+                Value(Decimal("0.00")),
+                output_field=models.DecimalField(max_digits=8, decimal_places=2),
+            )
+        )
+
+    def ledger(self, *groups):
+        """
+        Agrège les demandes acceptées par `groups` (ex: "trip__event",
+        "trip__driver", "trip") en une seule requête : nombre de passagers,
+        passagers sans paiement complet (unpaid_passengers), montant attendu
+        (expected_amount), montant payé (paid_amount) et restant dû
+        (outstanding_amount).
+        """
+        return (
+            self.filter(status="ACCEPTED")
+            .with_payment_totals()
+            .values(*groups)
+            .annotate(
+                passengers=Count("pk"),
+                unpaid_passengers=Count("pk", filter=Q(has_completed_payment=False)),
+                expected_amount=Sum(
+                    F("trip__price_per_seat") * F("seats_requested"),
+                    output_field=models.DecimalField(max_digits=8, decimal_places=2),
+                ),
+                paid_amount=Sum("amount_paid"),
+            )
+            .annotate(outstanding_amount=F("expected_amount") - F("paid_amount"))
+            .order_by(*groups)
+        )
+
+    def with_related(self):
+        """
+        Charge le passager avec la demande, et précharge les trajets avec leur
+        conducteur et leur événement : le nombre de requêtes ne dépend pas du
+        nombre de demandes sérialisées.
+        """
+        from ft.event.models import CarpoolTrip
+
+        return self.select_related("passenger").prefetch_related(
+            Prefetch("trip", queryset=CarpoolTrip.objects.with_related())
+        )
@@ -0,0 +1,125 @@
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import models
+from django.db.models import F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from ft.geo import InBox, GeoPoint, bounding_box, distance_km
+from ft.search import normalized
+
+from .EventQuerySet import first_subscribers_prefetch
+
+
+class CarpoolTripQuerySet(models.QuerySet):
+    """
+    QuerySet des trajets de covoiturage, avec les annotations utilisées par
+    l'API.
+    """
+
+    def with_accepted_seats(self):
+        """
+        Annote le nombre de places attribuées recalculé à partir des demandes
+        (accepted_seats) : la somme des places demandées par les demandes
+        acceptées, en une seule requête quel que soit le nombre de trajets.
+        Sert à vérifier la colonne dénormalisée seats_taken.
+        """
+        return self.annotate(
+            accepted_seats=Coalesce(
+                Sum(
+                    "requests__seats_requested",
+                    filter=Q(requests__status="ACCEPTED"),
+                ),
+                0,
+            )
+        )
+
+    def with_free_seats(self):
+        """
+        Annote le nombre de places libres (free_seats), calculé à partir des
+        colonnes du trajet et servi par l'index carpooltrip_free_seats_idx.
+        """
+        return self.annotate(free_seats=F("seats_total") - F("seats_taken"))
+
+    def recompute_seats_taken(self):
+        """
+        Réécrit la colonne dénormalisée seats_taken à partir des demandes
+        acceptées, dans un seul UPDATE évalué par la base.
+        """
+        from ft.event.models import CarpoolRequest
+
+        return self.update(
+            seats_taken=Coalesce(
+                Subquery(
+                    CarpoolRequest.objects.filter(
+                        trip=OuterRef("pk"), status="ACCEPTED"
+                    )
+                    .order_by()
+                    .values("trip")
+                    .annotate(seats=Sum("seats_requested"))
+                    .values("seats")
+                ),
+                0,
+            )
+        )
+
+    def search_cities(self, departure=None, arrival=None):
+        """
+        Recherche approximative des villes de départ et/ou d'arrivée, sans
+        tenir compte des accents ni de la casse ("compiegne" trouve
+        "Compiègne", "amien" trouve "Amiens").
+
+        Le filtrage utilise l'opérateur % de pg_trgm, servi par les index GIN
+        sur les villes normalisées, et les trajets sont classés par similarité
+        décroissante (city_similarity).
+        """
+        similarities = []
+        queryset = self
+        for field, query in (("departure_city", departure), ("arrival_city", arrival)):
+            if not query:
+                continue
+            alias = f"{field}_normalized"
+            queryset = queryset.alias(**{alias: normalized(field)}).filter(
+                **{f"{alias}__trigram_similar": normalized(Value(query))}
+            )
+            similarities.append(TrigramSimilarity(alias, normalized(Value(query))))
+
+        if not similarities:
+            return queryset
+        return queryset.annotate(
+            city_similarity=sum(similarities[1:], similarities[0])
+        ).order_by("-city_similarity", "departure_datetime", "id")
+
+    def near(self, latitude, longitude, radius_km):
+        """
+        Restreint aux trajets partant à moins de `radius_km` kilomètres du
+        point, annotés de leur distance (departure_distance) et classés du
+        plus proche au plus lointain.
+
+        Le rectangle englobant le cercle est filtré par l'index GiST
+        carpooltrip_departure_geo_idx, qui sert aussi les filtres sur la date
+        de départ : la distance exacte n'est calculée que pour les trajets du
+        rectangle.
+        """
+        return (
+            self.filter(
+                InBox(
+                    GeoPoint("departure_longitude", "departure_latitude"),
+                    *bounding_box(latitude, longitude, radius_km),
+                )
+            )
+            .annotate(
+                departure_distance=distance_km(
+                    "departure_latitude", "departure_longitude", latitude, longitude
+                )
+            )
+            .filter(departure_distance__lte=radius_km)
+            .order_by("departure_distance", "departure_datetime", "id")
+        )
+
+    def with_related(self):
+        """
+        Charge le conducteur et l'événement avec le trajet, ainsi que les
+        premiers inscrits de l'événement, pour la sérialisation.
+        """
+        return self.select_related("driver", "event").prefetch_related(
+            first_subscribers_prefetch("event__")
+        )
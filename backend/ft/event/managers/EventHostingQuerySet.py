@@ -0,0 +1,41 @@
+from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+class EventHostingQuerySet(models.QuerySet):
+    """
+    QuerySet des offres d'hébergement, avec les annotations utilisées par
+    l'API.
+    """
+
+    def with_availability(self):
+        """
+        Annote le nombre de personnes acceptées (accepted_guests) et de lits
+        encore libres (available_places) par une sous-requête, au lieu d'un
+        COUNT par hébergement.
+        """
+        from ft.event.models import EventHostingRequest
+
+        return self.annotate(
+            accepted_guests=Coalesce(
+                Subquery(
+                    EventHostingRequest.objects.filter(
+                        hosting=OuterRef("pk"),
+                        status=EventHostingRequest.Status.ACCEPTED,
+                    )
+                    .order_by()
+                    .values("hosting")
+                    .annotate(count=Count("pk"))
+                    .values("count")
+                ),
+                0,
+            ),
+            available_places=F("available_beds") - F("accepted_guests"),
+        )
+
+    def with_related(self):
+        """
+        Charge l'hôte avec l'hébergement.
+        """
+        return self.select_related("host")
@@ -0,0 +1,15 @@
+from .VisibilityQuerySet import VisibilityQuerySet
+
+
+class EventHostingRequestQuerySet(VisibilityQuerySet):
+    """
+    QuerySet des demandes d'hébergement, visibles du demandeur et de l'hôte.
+    """
+
+    participant_lookups = ("requester", "hosting__host")
+
+    def with_related(self):
+        """
+        Charge le demandeur, l'hébergement et son hôte avec la demande.
+        """
+        return self.select_related("requester", "hosting__host")
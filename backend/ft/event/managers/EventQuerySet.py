@@ -0,0 +1,106 @@
+from django.db import models
+from django.db.models import Count, F, OuterRef, Prefetch, Q, Subquery, Window
+from django.db.models.functions import Coalesce, RowNumber
+
+FIRST_SUBSCRIBERS_LIMIT = 3
+
+
+def first_subscribers_prefetch(prefix="", limit=FIRST_SUBSCRIBERS_LIMIT):
+    """
+    Construit un Prefetch qui charge, en une seule requête pour toute une page,
+    les `limit` premiers inscrits YES de chaque événement dans l'attribut
+    `first_yes_subscriptions`.
+
+    Les inscriptions sont numérotées par événement (ROW_NUMBER partitionné par
+    event_id) et seules les premières sont conservées. `prefix` permet de
+    précharger les événements au travers d'une relation (ex: "event__").
+    """
+    from ft.event.models import EventSubscription
+
+    subscriptions = (
+        EventSubscription.objects.filter(is_active=True, answer="YES")
+        .select_related("user")
+        .only(
+            "event_id",
+            "created_at",
+            "user__first_name",
+            "user__last_name",
+            "user__email",
+        )
+        .annotate(
+            row_number=Window(
+                RowNumber(),
+                partition_by=F("event_id"),
+                order_by=[F("created_at").asc(), F("id").asc()],
+            )
+        )
+        .filter(row_number__lte=limit)
+        .order_by("event_id", "row_number")
+    )
+    return Prefetch(
+        f"{prefix}eventsubscription_set",
+        queryset=subscriptions,
+        to_attr="first_yes_subscriptions",
+    )
+
+
+class EventQuerySet(models.QuerySet):
+    """
+    QuerySet des événements, avec les annotations utilisées par l'API.
+    """
+
+    def with_subscription_counts(self):
+        """
+        Annote le nombre d'inscriptions actives par réponse
+        (subscriptions_yes_count, subscriptions_no_count,
+        subscriptions_maybe_count) avec des agrégats conditionnels,
+        en une seule requête quel que soit le nombre d'événements.
+        """
+        active = Q(eventsubscription__is_active=True)
+        return self.annotate(
+            subscriptions_yes_count=Count(
+                "eventsubscription",
+                filter=active & Q(eventsubscription__answer="YES"),
+            ),
+            subscriptions_no_count=Count(
+                "eventsubscription",
+                filter=active & Q(eventsubscription__answer="NO"),
+            ),
+            subscriptions_maybe_count=Count(
+                "eventsubscription",
+                filter=active & Q(eventsubscription__answer="MAYBE"),
+            ),
+        )
+
+    def recompute_subscription_counters(self):
+        """
+        Réécrit les compteurs dénormalisés (yes_count, no_count, maybe_count)
+        à partir des inscriptions, dans un seul UPDATE évalué par la base.
+        """
+        from ft.event.models import EventSubscription
+        from ft.event.models.Event import SUBSCRIPTION_COUNTER_FIELDS
+
+        return self.update(
+            **{
+                field: Coalesce(
+                    Subquery(
+                        EventSubscription.objects.filter(
+                            event=OuterRef("pk"), is_active=True, answer=answer
+                        )
+                        .order_by()
+                        .values("event")
+                        .annotate(count=Count("pk"))
+                        .values("count")
+                    ),
+                    0,
+                )
+                for answer, field in SUBSCRIPTION_COUNTER_FIELDS.items()
+            }
+        )
+
+    def with_first_subscribers(self):
+        """
+        Précharge les premiers inscrits de chaque événement
+        (voir first_subscribers_prefetch).
+        """
+        return self.prefetch_related(first_subscribers_prefetch())
@@ -0,0 +1,27 @@
+from django.db import models
+
+
+class VisibilityQuerySet(models.QuerySet):
+    """
+    QuerySet des lignes qui ne sont visibles que de leurs participants
+    (passager et conducteur, demandeur et hôte...).
+    """
+
+    # Chemins vers les utilisateurs participant à une ligne,
+    # ex: ("passenger", "trip__driver")
+    participant_lookups = ()
+
+    def visible_to(self, user):
+        """
+        Restreint aux lignes dont `user` est l'un des participants.
+
+        Chaque participant donne une sous-requête servie par son propre index,
+        et leurs identifiants sont réunis par un UNION. Un OR entre des
+        conditions portant sur des tables jointes (`qs | qs`) oblige au
+        contraire la base à parcourir toute la table.
+        """
+        branches = [
+            self.model._base_manager.filter(**{lookup: user}).order_by().values("pk")
+            for lookup in self.participant_lookups
+        ]
+        return self.filter(pk__in=branches[0].union(*branches[1:]))
@@ -0,0 +1,18 @@
+from .VisibilityQuerySet import VisibilityQuerySet
+from .CarpoolPaymentQuerySet import CarpoolPaymentQuerySet
+from .CarpoolRequestQuerySet import CarpoolRequestQuerySet
+from .CarpoolTripQuerySet import CarpoolTripQuerySet
+from .EventHostingQuerySet import EventHostingQuerySet
+from .EventHostingRequestQuerySet import EventHostingRequestQuerySet
+from .EventQuerySet import EventQuerySet, first_subscribers_prefetch
+
+__all__ = [
+    "CarpoolPaymentQuerySet",
+    "CarpoolRequestQuerySet",
+    "CarpoolTripQuerySet",
+    "EventHostingQuerySet",
+    "EventHostingRequestQuerySet",
+    "EventQuerySet",
+    "VisibilityQuerySet",
+    "first_subscribers_prefetch",
+]
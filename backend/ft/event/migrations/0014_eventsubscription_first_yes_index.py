@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("event", "0013_remove_carpoolrequest_is_paid_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="eventsubscription",
+            index=models.Index(
+                condition=models.Q(("answer", "YES"), ("is_active", True)),
+                fields=["event", "created_at", "id"],
+                name="eventsub_first_yes_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:40
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_subscription_counters(apps, schema_editor):
+    Event = apps.get_model("event", "Event")
+    EventSubscription = apps.get_model("event", "EventSubscription")
+    counters = {"YES": "yes_count", "NO": "no_count", "MAYBE": "maybe_count"}
+    Event.objects.update(
+        **{
+            field: Coalesce(
+                Subquery(
+                    EventSubscription.objects.filter(
+                        event=OuterRef("pk"), is_active=True, answer=answer
+                    )
+                    .order_by()
+                    .values("event")
+                    .annotate(count=Count("pk"))
+                    .values("count")
+                ),
+                0,
+            )
+            for answer, field in counters.items()
+        }
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("event", "0014_eventsubscription_first_yes_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="maybe_count",
+            field=models.IntegerField(
+                default=0,
+                editable=False,
+                help_text="Nombre d'inscriptions actives avec la réponse « Peut-Être »",
+                verbose_name="Peut-être",
+            ),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="no_count",
+            field=models.IntegerField(
+                default=0,
+                editable=False,
+                help_text="Nombre d'inscriptions actives avec la réponse « Ne participe pas »",
+                verbose_name="Non participants",
+            ),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="yes_count",
+            field=models.IntegerField(
+                default=0,
+                editable=False,
+                help_text="Nombre d'inscriptions actives avec la réponse « Participe »",
+                verbose_name="Participants",
+            ),
+        ),
+        migrations.RunPython(backfill_subscription_counters, migrations.RunPython.noop),
+    ]
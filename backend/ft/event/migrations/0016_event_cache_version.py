@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("event", "0015_event_subscription_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="cache_version",
+            field=models.IntegerField(
+                default=0,
+                editable=False,
+                help_text="Incrémentée à chaque modification de l'événement ou de ses inscriptions",
+                verbose_name="Version du cache",
+            ),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("event", "0016_event_cache_version"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="carpoolpayment",
+            index=models.Index(
+                fields=["-created_at", "id"], name="carpoolpayment_created_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="carpoolrequest",
+            index=models.Index(
+                fields=["-created_at", "id"], name="carpoolrequest_created_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="carpooltrip",
+            index=models.Index(
+                fields=["departure_datetime", "id"], name="carpooltrip_departure_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["start_date", "name", "id"], name="event_start_name_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eventhosting",
+            index=models.Index(
+                fields=["-created_at", "id"], name="eventhosting_created_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eventhostingrequest",
+            index=models.Index(
+                fields=["-created_at", "id"], name="hostingrequest_created_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,137 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("event", "0017_cursor_pagination_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Index composites créés avant de supprimer les index simples des clés
+        # étrangères, qu'ils remplacent
+        migrations.AddIndex(
+            model_name="carpoolpayment",
+            index=models.Index(
+                fields=["request", "id"], name="carpoolpayment_request_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="carpoolrequest",
+            index=models.Index(
+                fields=["passenger", "id"], name="carpoolrequest_passenger_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="carpoolrequest",
+            index=models.Index(fields=["trip", "id"], name="carpoolrequest_trip_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="carpooltrip",
+            index=models.Index(fields=["driver", "id"], name="carpooltrip_driver_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="eventhosting",
+            index=models.Index(fields=["host", "id"], name="eventhosting_host_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="eventhostingrequest",
+            index=models.Index(
+                fields=["requester", "id"], name="hostingrequest_requester_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eventhostingrequest",
+            index=models.Index(
+                fields=["hosting", "id"], name="hostingrequest_hosting_idx"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="carpoolpayment",
+            name="request",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="Demande de covoiturage concernée",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="payments",
+                to="event.carpoolrequest",
+                verbose_name="Demande",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="carpoolrequest",
+            name="passenger",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="Utilisateur demandant une place",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="carpool_requests_as_passenger",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Passager",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="carpoolrequest",
+            name="trip",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="Trajet concerné par la demande",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="requests",
+                to="event.carpooltrip",
+                verbose_name="Trajet",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="carpooltrip",
+            name="driver",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="Utilisateur proposant le trajet",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="carpool_trips_as_driver",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Conducteur",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="eventhosting",
+            name="host",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="Utilisateur qui propose l'hébergement",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="event_hostings",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Hôte",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="eventhostingrequest",
+            name="hosting",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="Hébergement demandé",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="requests",
+                to="event.eventhosting",
+                verbose_name="Hébergement",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="eventhostingrequest",
+            name="requester",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="Utilisateur qui fait la demande d'hébergement",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="hosting_requests",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Demandeur",
+            ),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:58
+
+import django.db.models.expressions
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_seats_taken(apps, schema_editor):
+    CarpoolTrip = apps.get_model("event", "CarpoolTrip")
+    CarpoolRequest = apps.get_model("event", "CarpoolRequest")
+    CarpoolTrip.objects.update(
+        seats_taken=Coalesce(
+            Subquery(
+                CarpoolRequest.objects.filter(trip=OuterRef("pk"), status="ACCEPTED")
+                .order_by()
+                .values("trip")
+                .annotate(seats=Sum("seats_requested"))
+                .values("seats")
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("event", "0018_participant_visibility_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="carpooltrip",
+            name="seats_taken",
+            field=models.PositiveSmallIntegerField(
+                default=0,
+                editable=False,
+                help_text="Nombre de places attribuées aux demandes acceptées",
+                verbose_name="Places attribuées",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="carpooltrip",
+            index=models.Index(
+                django.db.models.expressions.CombinedExpression(
+                    models.F("seats_total"), "-", models.F("seats_taken")
+                ),
+                models.F("departure_datetime"),
+                name="carpooltrip_free_seats_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_seats_taken, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:01
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+import django.db.models.functions.text
+import ft.search
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("event", "0019_carpooltrip_seats_taken"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        UnaccentExtension(),
+        # unaccent() n'est que STABLE (son dictionnaire peut changer) : on
+        # l'enveloppe dans une fonction IMMUTABLE pour pouvoir l'utiliser dans
+        # les index. Le schéma de l'extension (lu dans pg_extension) est
+        # explicite, les index étant construits avec un search_path restreint.
+        migrations.RunSQL(
+            """
+            DO $$
+            DECLARE
+                schema name := (
+                    SELECT extnamespace::regnamespace::name
+                    FROM pg_extension
+                    WHERE extname = 'unaccent'
+                );
+            BEGIN
+                EXECUTE format(
+                    $sql$
+                    CREATE OR REPLACE FUNCTION ft_unaccent(text) RETURNS text
+                    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+                    AS $f$ SELECT %1$I.unaccent(%2$L::regdictionary, $1) $f$
+                    $sql$,
+                    schema,
+                    quote_ident(schema) || '.unaccent'
+                );
+            END
+            $$
+            """,
+            "DROP FUNCTION IF EXISTS ft_unaccent(text)",
+        ),
+        migrations.AddIndex(
+            model_name="carpooltrip",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Lower(
+                        ft.search.ImmutableUnaccent("departure_city")
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="carpooltrip_departure_trgm_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="carpooltrip",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Lower(
+                        ft.search.ImmutableUnaccent("arrival_city")
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="carpooltrip_arrival_trgm_idx",
+            ),
+        ),
+    ]
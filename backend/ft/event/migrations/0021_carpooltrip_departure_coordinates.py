@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:04
+
+import django.contrib.postgres.indexes
+import ft.geo
+from django.conf import settings
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+from ft.geo import geocode_city
+
+
+def backfill_departure_coordinates(apps, schema_editor):
+    CarpoolTrip = apps.get_model("event", "CarpoolTrip")
+    trips = []
+    for trip in CarpoolTrip.objects.only("departure_city").iterator():
+        coordinates = geocode_city(trip.departure_city)
+        if coordinates:
+            trip.departure_latitude, trip.departure_longitude = coordinates
+            trips.append(trip)
+    CarpoolTrip.objects.bulk_update(
+        trips, ["departure_latitude", "departure_longitude"], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("event", "0020_carpooltrip_city_trigram_search"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AddField(
+            model_name="carpooltrip",
+            name="departure_latitude",
+            field=models.FloatField(
+                blank=True,
+                editable=False,
+                help_text="Latitude de la ville de départ, déduite du répertoire des communes",
+                null=True,
+                verbose_name="Latitude de départ",
+            ),
+        ),
+        migrations.AddField(
+            model_name="carpooltrip",
+            name="departure_longitude",
+            field=models.FloatField(
+                blank=True,
+                editable=False,
+                help_text="Longitude de la ville de départ, déduite du répertoire des communes",
+                null=True,
+                verbose_name="Longitude de départ",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="carpooltrip",
+            index=django.contrib.postgres.indexes.GistIndex(
+                ft.geo.GeoPoint("departure_longitude", "departure_latitude"),
+                models.F("departure_datetime"),
+                name="carpooltrip_departure_geo_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_departure_coordinates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:14
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_amount_paid(apps, schema_editor):
+    CarpoolRequest = apps.get_model("event", "CarpoolRequest")
+    CarpoolPayment = apps.get_model("event", "CarpoolPayment")
+    CarpoolRequest.objects.update(
+        amount_paid=Coalesce(
+            Subquery(
+                CarpoolPayment.objects.filter(request=OuterRef("pk"))
+                .order_by()
+                .values("request")
+                .annotate(total=Sum("amount"))
+                .values("total")
+            ),
+            Value(Decimal("0.00")),
+            output_field=models.DecimalField(max_digits=8, decimal_places=2),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("event", "0021_carpooltrip_departure_coordinates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="carpoolrequest",
+            name="amount_paid",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0,
+                editable=False,
+                help_text="Somme des paiements enregistrés pour la demande (en €)",
+                max_digits=8,
+                verbose_name="Montant payé",
+            ),
+        ),
+        migrations.RunPython(backfill_amount_paid, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Case, F, OuterRef, Subquery, Value, When, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+
+def backfill_event(apps, schema_editor):
+    EventHosting = apps.get_model("event", "EventHosting")
+    EventHostingRequest = apps.get_model("event", "EventHostingRequest")
+    EventHostingRequest.objects.update(
+        event=Subquery(
+            EventHosting.objects.filter(pk=OuterRef("hosting")).values("event")[:1]
+        )
+    )
+
+
+def cancel_duplicate_requests(apps, schema_editor):
+    """
+    Annule les demandes actives en double (vérification applicative
+    concurrente) avant la pose de la contrainte d'unicité : on garde la
+    demande acceptée, sinon la plus ancienne.
+    """
+    EventHostingRequest = apps.get_model("event", "EventHostingRequest")
+    duplicates = (
+        EventHostingRequest.objects.filter(status__in=["PENDING", "ACCEPTED"])
+        .annotate(
+            rank=Window(
+                RowNumber(),
+                partition_by=[F("requester"), F("event")],
+                order_by=[
+                    Case(When(status="ACCEPTED", then=Value(0)), default=Value(1)),
+                    F("created_at"),
+                    F("id"),
+                ],
+            )
+        )
+        .filter(rank__gt=1)
+        .values_list("pk", flat=True)
+    )
+    EventHostingRequest.objects.filter(pk__in=list(duplicates)).update(
+        status="CANCELLED", updated_at=timezone.now()
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("event", "0022_carpoolrequest_amount_paid"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="eventhostingrequest",
+            name="event",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                help_text="Événement de l'hébergement demandé",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="hosting_requests",
+                to="event.event",
+                verbose_name="Événement",
+            ),
+        ),
+        migrations.RunPython(backfill_event, migrations.RunPython.noop),
+        migrations.RunPython(cancel_duplicate_requests, migrations.RunPython.noop),
+    ]
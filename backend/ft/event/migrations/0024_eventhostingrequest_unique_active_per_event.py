@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("event", "0023_eventhostingrequest_event"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="eventhostingrequest",
+            name="event",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                help_text="Événement de l'hébergement demandé",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="hosting_requests",
+                to="event.event",
+                verbose_name="Événement",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="eventhostingrequest",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status__in", ["PENDING", "ACCEPTED"])),
+                fields=("requester", "event"),
+                name="unique_active_hosting_request_per_event",
+            ),
+        ),
+    ]
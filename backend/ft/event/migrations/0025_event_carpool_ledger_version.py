@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("event", "0024_eventhostingrequest_unique_active_per_event"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="carpool_ledger_version",
+            field=models.IntegerField(
+                default=0,
+                editable=False,
+                help_text="Incrémentée à chaque modification des trajets, demandes ou paiements de covoiturage de l'événement",
+                verbose_name="Version du registre de covoiturage",
+            ),
+        ),
+    ]
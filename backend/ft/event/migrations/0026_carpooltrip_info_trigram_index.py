@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:56
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+import ft.search
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("event", "0025_event_carpool_ledger_version"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="carpooltrip",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Lower(
+                        ft.search.ImmutableUnaccent("additional_info")
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="carpooltrip_info_trgm_idx",
+            ),
+        ),
+    ]
@@ -1,6 +1,13 @@
-from django.db import models
+from collections import defaultdict
+from decimal import Decimal
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
+from ft.event.managers import CarpoolPaymentQuerySet
 from .CarpoolRequest import CarpoolRequest
 
+# Champs dont dépend le montant payé de la demande (amount_paid)
+PAID_FIELDS = {"request", "request_id", "amount"}
+
 
 class CarpoolPayment(models.Model):
     """
@@ -21,6 +28,8 @@ class CarpoolPayment(models.Model):
         verbose_name="Demande",
         help_text="Demande de covoiturage concernée",
         related_name="payments",
+        # Indexé avec l'id (voir Meta.indexes)
+        db_index=False,
     )
     amount = models.DecimalField(
         max_digits=8,
@@ -57,14 +66,85 @@ class CarpoolPayment(models.Model):
         help_text="Date de dernière modification du paiement",
     )
 
+    objects = CarpoolPaymentQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Paiement de covoiturage"
         verbose_name_plural = "Paiements de covoiturage"
         ordering = ["-created_at"]
+        indexes = [
+            # Ordre de la pagination par curseur
+            models.Index(
+                fields=["-created_at", "id"], name="carpoolpayment_created_id_idx"
+            ),
+            # Filtrage par participant (VisibilityQuerySet.visible_to)
+            models.Index(fields=["request", "id"], name="carpoolpayment_request_idx"),
+        ]
 
     def __str__(self):
         return f"Paiement de {self.amount}€ pour {self.request}"
 
+    def save(self, *args, **kwargs):
+        """
+        Enregistre le paiement et répercute son montant sur le montant payé de
+        la demande, dans la même transaction.
+        """
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and not PAID_FIELDS & set(update_fields):
+            super().save(*args, **kwargs)
+            return
+
+        with transaction.atomic(savepoint=False):
+            previous = None
+            if self.pk:
+                # Verrouiller la ligne pour que deux modifications concurrentes
+                # du même paiement ne faussent pas le montant payé
+                previous = (
+                    CarpoolPayment.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list("request_id", "amount")
+                    .first()
+                )
+            super().save(*args, **kwargs)
+            self.update_paid_amounts(previous, (self.request_id, self.amount))
+
+    @staticmethod
+    def update_paid_amounts(previous, current):
+        """
+        Ajuste le montant payé des demandes pour passer de l'état `previous`
+        à l'état `current`, couples (demande, montant) ou None.
+        """
+        amounts = defaultdict(Decimal)
+        if previous is not None:
+            request_id, amount = previous
+            amounts[request_id] -= Decimal(str(amount))
+        if current is not None:
+            request_id, amount = current
+            amounts[request_id] += Decimal(str(amount))
+        CarpoolPayment.add_paid_amounts(amounts)
+
+    @staticmethod
+    def add_paid_amounts(amounts):
+        """
+        Ajoute des montants, indexés par demande, au montant payé des demandes
+        avec une expression F(), en un seul UPDATE.
+        """
+        amounts = {
+            request_id: amount for request_id, amount in amounts.items() if amount
+        }
+        if not amounts:
+            return
+        CarpoolRequest.objects.filter(pk__in=amounts).update(
+            amount_paid=F("amount_paid")
+            + Case(
+                *(
+                    When(pk=request_id, then=Value(amount))
+                    for request_id, amount in amounts.items()
+                ),
+                output_field=models.DecimalField(max_digits=8, decimal_places=2),
+            )
+        )
+
     @property
     def get_payment_status_display(self):
         """Renvoie le statut du paiement sous forme lisible."""
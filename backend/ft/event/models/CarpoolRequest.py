@@ -1,7 +1,14 @@
-from django.db import models
+from collections import defaultdict
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from ft.event.managers import CarpoolRequestQuerySet
 from ft.user.models import User
 from .CarpoolTrip import CarpoolTrip
 
+# Champs dont dépendent les places attribuées du trajet (seats_taken)
+COUNTED_FIELDS = {"trip", "trip_id", "status", "seats_requested"}
+
 
 class CarpoolRequest(models.Model):
     """
@@ -21,6 +28,8 @@ class CarpoolRequest(models.Model):
         verbose_name="Passager",
         help_text="Utilisateur demandant une place",
         related_name="carpool_requests_as_passenger",
+        # Indexé avec l'id (voir Meta.indexes)
+        db_index=False,
     )
     trip = models.ForeignKey(
         CarpoolTrip,
@@ -28,6 +37,8 @@ class CarpoolRequest(models.Model):
         verbose_name="Trajet",
         help_text="Trajet concerné par la demande",
         related_name="requests",
+        # Indexé avec l'id (voir Meta.indexes)
+        db_index=False,
     )
     status = models.CharField(
         max_length=10,
@@ -58,6 +69,15 @@ class CarpoolRequest(models.Model):
         verbose_name="Active",
         help_text="Si la demande est active",
     )
+    # Dénormalisé : maintenu par CarpoolPayment.add_paid_amounts
+    amount_paid = models.DecimalField(
+        max_digits=8,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        verbose_name="Montant payé",
+        help_text="Somme des paiements enregistrés pour la demande (en €)",
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name="Date de création",
@@ -69,10 +89,24 @@ class CarpoolRequest(models.Model):
         help_text="Date de dernière modification de la demande",
     )
 
+    objects = CarpoolRequestQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Demande de covoiturage"
         verbose_name_plural = "Demandes de covoiturage"
         ordering = ["-created_at"]
+        indexes = [
+            # Ordre de la pagination par curseur
+            models.Index(
+                fields=["-created_at", "id"], name="carpoolrequest_created_id_idx"
+            ),
+            # Filtrage par participant (VisibilityQuerySet.visible_to), servi
+            # par un parcours d'index seul
+            models.Index(
+                fields=["passenger", "id"], name="carpoolrequest_passenger_idx"
+            ),
+            models.Index(fields=["trip", "id"], name="carpoolrequest_trip_idx"),
+        ]
         # Empêcher un passager de faire plusieurs demandes pour le même trajet
         constraints = [
             models.UniqueConstraint(
@@ -84,21 +118,101 @@ class CarpoolRequest(models.Model):
     def __str__(self):
         return f"{self.passenger} → {self.trip} ({self.get_status_display()})"
 
+    def save(self, *args, **kwargs):
+        """
+        Enregistre la demande et répercute son acceptation (ou la fin de son
+        acceptation) sur les places attribuées du trajet, dans la même
+        transaction.
+        """
+        # Le montant payé est maintenu par des UPDATE atomiques (voir
+        # CarpoolPayment.add_paid_amounts) : on ne le réécrit jamais depuis
+        # une instance potentiellement périmée.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "amount_paid"
+            ]
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and not COUNTED_FIELDS & set(update_fields):
+            super().save(*args, **kwargs)
+            return
+
+        # Sans point de sauvegarde : l'enregistrement et la mise à jour du
+        # trajet réussissent ou échouent avec la transaction englobante
+        with transaction.atomic(savepoint=False):
+            previous = None
+            if self.pk:
+                # Verrouiller la ligne pour que deux modifications concurrentes
+                # de la même demande ne faussent pas les places attribuées
+                previous = (
+                    CarpoolRequest.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list("trip_id", "status", "seats_requested")
+                    .first()
+                )
+                previous = self.counted_state(*previous) if previous else None
+            super().save(*args, **kwargs)
+            self.update_trip_seats(
+                previous,
+                self.counted_state(self.trip_id, self.status, self.seats_requested),
+            )
+
+    @staticmethod
+    def counted_state(trip_id, status, seats_requested):
+        """
+        Renvoie le couple (trajet, places) attribué à une demande, ou None si
+        elle n'est pas acceptée.
+        """
+        if status != "ACCEPTED":
+            return None
+        return trip_id, seats_requested
+
+    @staticmethod
+    def update_trip_seats(previous, current):
+        """
+        Ajuste les places attribuées des trajets avec des expressions F() pour
+        passer de l'état `previous` à l'état `current`.
+        """
+        if previous == current:
+            return
+
+        deltas = defaultdict(int)
+        if previous is not None:
+            trip_id, seats = previous
+            deltas[trip_id] -= seats
+        if current is not None:
+            trip_id, seats = current
+            deltas[trip_id] += seats
+
+        for trip_id, delta in deltas.items():
+            if delta:
+                # Borné à 0 : un compteur désynchronisé (lignes antérieures au
+                # recalcul, suppression en SQL) ne fait pas échouer une
+                # annulation ou une suppression ordinaire
+                # (voir recompute_trip_seats)
+                CarpoolTrip.objects.filter(pk=trip_id).update(
+                    seats_taken=Greatest(F("seats_taken") + delta, 0)
+                )
+
     @property
     def is_paid(self):
         """
         Vérifie si la demande a été entièrement payée.
         """
         # La demande est considérée comme payée s'il existe un paiement complet
+        if hasattr(self, "has_completed_payment"):
+            return self.has_completed_payment
         return self.payments.filter(is_completed=True).exists()
 
     @property
     def total_paid(self):
         """
-        Calcule le montant total payé pour cette demande.
+        Renvoie le montant total payé pour cette demande.
         """
-        # Somme de tous les paiements associés à cette demande
-        return self.payments.aggregate(models.Sum("amount"))["amount__sum"] or 0
+        # Somme des paiements, maintenue dans la colonne amount_paid
+        return self.amount_paid
 
     @property
     def expected_amount(self):
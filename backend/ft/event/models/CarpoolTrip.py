@@ -1,4 +1,8 @@
+from django.contrib.postgres.indexes import GinIndex, GistIndex, OpClass
 from django.db import models
+from ft.event.managers import CarpoolTripQuerySet
+from ft.geo import GeoPoint, geocode_city
+from ft.search import normalized
 from ft.user.models import User
 from .Event import Event
 
@@ -15,6 +19,8 @@ class CarpoolTrip(models.Model):
         verbose_name="Conducteur",
         help_text="Utilisateur proposant le trajet",
         related_name="carpool_trips_as_driver",
+        # Indexé avec l'id (voir Meta.indexes)
+        db_index=False,
     )
     event = models.ForeignKey(
         Event,
@@ -30,6 +36,20 @@ class CarpoolTrip(models.Model):
         verbose_name="Ville de départ",
         help_text="Ville de départ du trajet",
     )
+    departure_latitude = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Latitude de départ",
+        help_text="Latitude de la ville de départ, déduite du répertoire des communes",
+    )
+    departure_longitude = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Longitude de départ",
+        help_text="Longitude de la ville de départ, déduite du répertoire des communes",
+    )
     departure_address = models.CharField(
         max_length=255,
         verbose_name="Adresse de départ",
@@ -76,6 +96,12 @@ class CarpoolTrip(models.Model):
         verbose_name="Prix par place",
         help_text="Prix demandé par passager (en €)",
     )
+    seats_taken = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Places attribuées",
+        help_text="Nombre de places attribuées aux demandes acceptées",
+    )
     additional_info = models.TextField(
         null=True,
         blank=True,
@@ -98,10 +124,49 @@ class CarpoolTrip(models.Model):
         help_text="Date de dernière modification du trajet",
     )
 
+    objects = CarpoolTripQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Trajet de covoiturage"
         verbose_name_plural = "Trajets de covoiturage"
         ordering = ["departure_datetime", "event"]
+        indexes = [
+            # Ordre de la pagination par curseur
+            models.Index(
+                fields=["departure_datetime", "id"], name="carpooltrip_departure_id_idx"
+            ),
+            # Filtrage par participant (VisibilityQuerySet.visible_to)
+            models.Index(fields=["driver", "id"], name="carpooltrip_driver_idx"),
+            # Filtrage et tri par places libres (with_free_seats)
+            models.Index(
+                models.F("seats_total") - models.F("seats_taken"),
+                models.F("departure_datetime"),
+                name="carpooltrip_free_seats_idx",
+            ),
+            # Trajets partant à proximité dans une fenêtre horaire (near) :
+            # rectangle autour du point et dates servis par le même index
+            # (btree_gist pour la date)
+            GistIndex(
+                GeoPoint("departure_longitude", "departure_latitude"),
+                models.F("departure_datetime"),
+                name="carpooltrip_departure_geo_idx",
+            ),
+            # Recherche approximative des villes (search_cities)
+            GinIndex(
+                OpClass(normalized("departure_city"), name="gin_trgm_ops"),
+                name="carpooltrip_departure_trgm_idx",
+            ),
+            GinIndex(
+                OpClass(normalized("arrival_city"), name="gin_trgm_ops"),
+                name="carpooltrip_arrival_trgm_idx",
+            ),
+            # Recherche ?search= (NormalizedSearchFilter), combinée par OR aux
+            # villes
+            GinIndex(
+                OpClass(normalized("additional_info"), name="gin_trgm_ops"),
+                name="carpooltrip_info_trgm_idx",
+            ),
+        ]
 
     def __str__(self):
         return (
@@ -109,11 +174,44 @@ class CarpoolTrip(models.Model):
             f"({self.departure_datetime.strftime('%d/%m/%Y')})"
         )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Événement lu en base, dont le registre des paiements est aussi
+        # invalidé si le trajet change d'événement (voir signals.py)
+        instance._loaded_event_id = instance.__dict__.get("event_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Coordonnées de la ville de départ, lues dans le répertoire des
+        # communes embarqué (sans appel réseau)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "departure_city" in update_fields:
+            coordinates = geocode_city(self.departure_city) or (None, None)
+            self.departure_latitude, self.departure_longitude = coordinates
+            if update_fields is not None:
+                kwargs["update_fields"] = {
+                    *update_fields,
+                    "departure_latitude",
+                    "departure_longitude",
+                }
+
+        # Les places attribuées sont maintenues par des UPDATE atomiques (voir
+        # CarpoolRequest.update_trip_seats) : on ne les réécrit jamais depuis
+        # une instance potentiellement périmée.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "seats_taken"
+            ]
+        super().save(*args, **kwargs)
+        self._loaded_event_id = self.event_id
+
     @property
     def seats_available(self):
         """Renvoie le nombre de places encore disponibles."""
-        accepted_requests = self.requests.filter(status="ACCEPTED").count()
-        return self.seats_total - accepted_requests
+        return self.seats_total - self.seats_taken
 
     @property
     def is_full(self):
@@ -1,6 +1,22 @@
 from datetime import datetime
 from django.db import models
 
+from ft.event.managers import EventQuerySet
+
+# Colonne de compteur associée à chaque réponse d'inscription
+SUBSCRIPTION_COUNTER_FIELDS = {
+    "YES": "yes_count",
+    "NO": "no_count",
+    "MAYBE": "maybe_count",
+}
+
+# Colonnes mises à jour uniquement par des UPDATE atomiques (F())
+DENORMALIZED_FIELDS = {
+    *SUBSCRIPTION_COUNTER_FIELDS.values(),
+    "cache_version",
+    "carpool_ledger_version",
+}
+
 
 class Event(models.Model):
     """
@@ -71,6 +87,36 @@ class Event(models.Model):
             ("OTHER", "Autre"),
         ],
     )
+    yes_count: int = models.IntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Participants",
+        help_text="Nombre d'inscriptions actives avec la réponse « Participe »",
+    )
+    no_count: int = models.IntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Non participants",
+        help_text="Nombre d'inscriptions actives avec la réponse « Ne participe pas »",
+    )
+    maybe_count: int = models.IntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Peut-être",
+        help_text="Nombre d'inscriptions actives avec la réponse « Peut-Être »",
+    )
+    cache_version: int = models.IntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Version du cache",
+        help_text="Incrémentée à chaque modification de l'événement ou de ses inscriptions",
+    )
+    carpool_ledger_version: int = models.IntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Version du registre de covoiturage",
+        help_text="Incrémentée à chaque modification des trajets, demandes ou paiements de covoiturage de l'événement",
+    )
     created_at: datetime = models.DateTimeField(
         auto_now_add=True,
         verbose_name="Date de création",
@@ -82,10 +128,30 @@ class Event(models.Model):
         help_text="Date de mise à jour de la ressource",
     )
 
+    objects = EventQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Événement"
         verbose_name_plural = "Événements"
         ordering = ["start_date", "name"]
+        indexes = [
+            # Ordre de la pagination par curseur
+            models.Index(
+                fields=["start_date", "name", "id"], name="event_start_name_id_idx"
+            ),
+        ]
 
     def __str__(self):
         return "{} ({})".format(self.name, self.location)
+
+    def save(self, *args, **kwargs):
+        # Les compteurs d'inscriptions et la version du cache sont maintenus
+        # par des UPDATE atomiques (voir EventSubscription et ft.event.cache) :
+        # on ne les réécrit jamais depuis une instance potentiellement périmée.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in DENORMALIZED_FIELDS
+            ]
+        super().save(*args, **kwargs)
@@ -1,7 +1,8 @@
 from datetime import datetime
-from django.db import models
+from django.db import models, transaction
 
 from ft.user.models import User
+from ft.event.managers import EventHostingQuerySet
 from ft.event.models import Event
 
 
@@ -23,6 +24,8 @@ class EventHosting(models.Model):
         verbose_name="Hôte",
         help_text="Utilisateur qui propose l'hébergement",
         related_name="event_hostings",
+        # Indexé avec l'id (voir Meta.indexes)
+        db_index=False,
     )
     available_beds: int = models.PositiveSmallIntegerField(
         verbose_name="Nombre de lits disponibles",
@@ -92,16 +95,27 @@ class EventHosting(models.Model):
         help_text="Date de mise à jour de l'offre d'hébergement",
     )
 
+    objects = EventHostingQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Hébergement"
         verbose_name_plural = "Hébergements"
         ordering = ["event", "host"]
         unique_together = ["event", "host"]
+        indexes = [
+            # Ordre de la pagination par curseur
+            models.Index(
+                fields=["-created_at", "id"], name="eventhosting_created_id_idx"
+            ),
+            # Filtrage par participant (VisibilityQuerySet.visible_to)
+            models.Index(fields=["host", "id"], name="eventhosting_host_idx"),
+        ]
 
     def __str__(self):
         return f"Hébergement par {self.host} pour {self.event}"
 
     def save(self, *args, **kwargs):
+        adding = self._state.adding
         # Si c'est une création et que les valeurs ne sont pas explicitement
         # définies, on utilise par défaut les valeurs du profil de l'utilisateur
         if not self.pk:
@@ -110,4 +124,16 @@ class EventHosting(models.Model):
             if not self.custom_rules:
                 self.custom_rules = self.host.home_rules
 
-        super().save(*args, **kwargs)
+        # Sans point de sauvegarde : l'hébergement et ses demandes changent
+        # d'événement ensemble, ou pas du tout
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
+            # Les demandes recopient l'événement de l'hébergement (la
+            # contrainte unique_active_hosting_request_per_event peut alors
+            # échouer, voir EventHostingSerializer.save)
+            update_fields = kwargs.get("update_fields")
+            if not adding and (update_fields is None or "event" in update_fields):
+                self.requests.exclude(event_id=self.event_id).update(
+                    event_id=self.event_id
+                )
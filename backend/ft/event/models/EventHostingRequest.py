@@ -1,8 +1,10 @@
 from datetime import datetime
 from django.db import models
 
+from ft.event.managers import EventHostingRequestQuerySet
+
 from ft.user.models import User
-from ft.event.models import EventHosting
+from ft.event.models import Event, EventHosting
 
 
 class EventHostingRequest(models.Model):
@@ -23,6 +25,21 @@ class EventHostingRequest(models.Model):
         verbose_name="Hébergement",
         help_text="Hébergement demandé",
         related_name="requests",
+        # Indexé avec l'id (voir Meta.indexes)
+        db_index=False,
+    )
+    # Dénormalisé : recopié depuis l'hébergement par save(), pour que la base
+    # garantisse une seule demande active par événement (voir Meta.constraints)
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        editable=False,
+        verbose_name="Événement",
+        help_text="Événement de l'hébergement demandé",
+        related_name="hosting_requests",
+        # Lu avec le demandeur, par la contrainte d'unicité partielle
+        # (requester, event) ; les suppressions d'événements sont rares
+        db_index=False,
     )
     requester = models.ForeignKey(
         User,
@@ -30,6 +47,8 @@ class EventHostingRequest(models.Model):
         verbose_name="Demandeur",
         help_text="Utilisateur qui fait la demande d'hébergement",
         related_name="hosting_requests",
+        # Indexé avec l'id (voir Meta.indexes)
+        db_index=False,
     )
     status = models.CharField(
         max_length=10,
@@ -61,15 +80,62 @@ class EventHostingRequest(models.Model):
         help_text="Date de mise à jour de la demande",
     )
 
+    objects = EventHostingRequestQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Demande d'hébergement"
         verbose_name_plural = "Demandes d'hébergement"
         ordering = ["-created_at"]
+        indexes = [
+            # Ordre de la pagination par curseur
+            models.Index(
+                fields=["-created_at", "id"], name="hostingrequest_created_id_idx"
+            ),
+            # Filtrage par participant (VisibilityQuerySet.visible_to)
+            models.Index(
+                fields=["requester", "id"], name="hostingrequest_requester_idx"
+            ),
+            models.Index(fields=["hosting", "id"], name="hostingrequest_hosting_idx"),
+        ]
         unique_together = ["hosting", "requester"]
+        constraints = [
+            # Une seule demande en attente ou acceptée par événement et par
+            # demandeur, vérifiée par la base lors de l'INSERT
+            models.UniqueConstraint(
+                fields=["requester", "event"],
+                condition=models.Q(status__in=["PENDING", "ACCEPTED"]),
+                name="unique_active_hosting_request_per_event",
+            )
+        ]
 
     def __str__(self):
         return f"Demande de {self.requester} pour {self.hosting}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Hébergement lu en base, pour ne recopier l'événement que s'il change
+        instance._loaded_hosting_id = instance.__dict__.get("hosting_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        # L'événement est toujours celui de l'hébergement demandé : il n'est
+        # recopié (en chargeant l'hébergement) qu'à la création ou lorsque
+        # l'hébergement change, et non à chaque changement de statut
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            hosting_changed = self._state.adding or self.hosting_id != getattr(
+                self, "_loaded_hosting_id", None
+            )
+        else:
+            hosting_changed = "hosting" in update_fields
+            if hosting_changed:
+                kwargs["update_fields"] = {*update_fields, "event"}
+        if hosting_changed:
+            self.event_id = self.hosting.event_id
+        super().save(*args, **kwargs)
+        self._loaded_hosting_id = self.hosting_id
+
     def accept(self):
         """
         Accepte la demande d'hébergement.
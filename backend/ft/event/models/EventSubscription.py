@@ -1,8 +1,15 @@
+from collections import defaultdict
 from datetime import datetime
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 
 from ft.user.models import User
 from ft.event.models import Event
+from ft.event.models.Event import SUBSCRIPTION_COUNTER_FIELDS
+from ft.event.cache import cache_version_bump
+
+# Champs dont dépendent les compteurs d'inscriptions de l'événement
+COUNTED_FIELDS = {"event", "event_id", "answer", "is_active"}
 
 
 class EventSubscription(models.Model):
@@ -58,6 +65,80 @@ class EventSubscription(models.Model):
         verbose_name_plural = "Inscriptions"
         ordering = ["event", "user"]
         unique_together = ["event", "user"]
+        indexes = [
+            # Premiers inscrits d'un événement (avatars de la page d'accueil)
+            models.Index(
+                fields=["event", "created_at", "id"],
+                condition=models.Q(is_active=True, answer="YES"),
+                name="eventsub_first_yes_idx",
+            ),
+        ]
 
     def __str__(self):
         return "{} ({})".format(self.event.name, self.user.email)
+
+    def save(self, *args, **kwargs):
+        """
+        Enregistre l'inscription et répercute le changement de réponse ou
+        d'état sur les compteurs de l'événement, dans la même transaction.
+        """
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and not COUNTED_FIELDS & set(update_fields):
+            super().save(*args, **kwargs)
+            return
+
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                # Verrouiller la ligne pour que deux modifications concurrentes
+                # de la même inscription ne faussent pas les compteurs
+                previous = (
+                    EventSubscription.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list("event_id", "answer", "is_active")
+                    .first()
+                )
+                previous = self.counted_state(*previous) if previous else None
+            super().save(*args, **kwargs)
+            self.update_event_counters(
+                previous,
+                self.counted_state(self.event_id, self.answer, self.is_active),
+            )
+
+    @staticmethod
+    def counted_state(event_id, answer, is_active):
+        """
+        Renvoie le couple (événement, réponse) comptabilisé pour une
+        inscription, ou None si elle n'est pas comptabilisée.
+        """
+        if not is_active or answer not in SUBSCRIPTION_COUNTER_FIELDS:
+            return None
+        return event_id, answer
+
+    @staticmethod
+    def update_event_counters(previous, current):
+        """
+        Ajuste les compteurs des événements avec des expressions F() pour
+        passer de l'état comptabilisé `previous` à l'état `current`.
+
+        La version du cache et la date de mise à jour des événements concernés
+        avancent dans le même UPDATE : seules les inscriptions comptabilisées
+        (actives) figurent dans la représentation d'un événement (compteurs,
+        premiers inscrits).
+        """
+        if previous == current:
+            return
+
+        deltas = defaultdict(lambda: defaultdict(int))
+        if previous is not None:
+            event_id, answer = previous
+            deltas[event_id][SUBSCRIPTION_COUNTER_FIELDS[answer]] -= 1
+        if current is not None:
+            event_id, answer = current
+            deltas[event_id][SUBSCRIPTION_COUNTER_FIELDS[answer]] += 1
+
+        for event_id, fields in deltas.items():
+            Event.objects.filter(pk=event_id).update(
+                **cache_version_bump(),
+                **{field: F(field) + delta for field, delta in fields.items() if delta},
+            )
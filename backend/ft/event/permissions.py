@@ -62,4 +62,8 @@ class IsHostingRequestRequesterOrHost(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj):
         # Le demandeur de l'hébergement ou l'hôte peuvent consulter/modifier la demande
-        return obj.requester == request.user or obj.hosting.host == request.user
+        # Comparaison des identifiants : l'hôte n'est pas rechargé
+        return (
+            obj.requester_id == request.user.pk
+            or obj.hosting.host_id == request.user.pk
+        )
@@ -0,0 +1,24 @@
+from rest_framework import serializers
+
+
+class CarpoolLedgerSerializer(serializers.Serializer):
+    """
+    Sérialiseur d'une ligne du registre des paiements de covoiturage
+    (CarpoolRequestQuerySet.ledger). Les groupes absents du regroupement
+    (conducteur, trajet) sont omis.
+    """
+
+    event = serializers.IntegerField(source="trip__event", read_only=True)
+    driver = serializers.IntegerField(source="trip__driver", read_only=True)
+    trip = serializers.IntegerField(read_only=True)
+    passengers = serializers.IntegerField(read_only=True)
+    unpaid_passengers = serializers.IntegerField(read_only=True)
+    expected_amount = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True
+    )
+    paid_amount = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True
+    )
+    outstanding_amount = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True
+    )
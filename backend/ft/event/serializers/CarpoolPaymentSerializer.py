@@ -1,5 +1,8 @@
 from rest_framework import serializers
-from ft.event.models import CarpoolPayment, CarpoolRequest
+from ft.event.models import CarpoolPayment, CarpoolRequest, CarpoolTrip
+
+# Nombre maximal de paiements par enregistrement groupé
+MAX_BULK_PAYMENTS = 200
 
 
 class CarpoolPaymentSerializer(serializers.ModelSerializer):
@@ -63,3 +66,50 @@ class CarpoolPaymentSerializer(serializers.ModelSerializer):
             )
 
         return data
+
+
+class CarpoolPaymentBulkSerializer(serializers.Serializer):
+    """
+    Sérialiseur pour l'enregistrement groupé des paiements d'un trajet par son
+    conducteur. Chaque paiement est validé séparément par
+    CarpoolPaymentBulkItemSerializer.
+    """
+
+    trip_id = serializers.PrimaryKeyRelatedField(
+        source="trip",
+        queryset=CarpoolTrip.objects.all(),
+    )
+    payments = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=MAX_BULK_PAYMENTS,
+    )
+
+    def validate(self, data):
+        # Vérifier que l'utilisateur est bien le conducteur du trajet
+        if data["trip"].driver_id != self.context["request"].user.pk:
+            raise serializers.ValidationError(
+                {"trip_id": "Seul le conducteur peut enregistrer des paiements."}
+            )
+        return data
+
+
+class CarpoolPaymentBulkItemSerializer(serializers.ModelSerializer):
+    """
+    Sérialiseur d'un paiement de l'enregistrement groupé, validé contre les
+    demandes acceptées du trajet lues une seule fois (contexte
+    "accepted_request_ids").
+    """
+
+    request_id = serializers.IntegerField()
+
+    class Meta:
+        model = CarpoolPayment
+        fields = ["request_id", "amount", "is_completed", "payment_method", "notes"]
+
+    def validate_request_id(self, value):
+        if value not in self.context["accepted_request_ids"]:
+            raise serializers.ValidationError(
+                "Seules les demandes acceptées du trajet peuvent avoir des paiements."
+            )
+        return value
@@ -1,6 +1,9 @@
+from decimal import Decimal
+
 from rest_framework import serializers
+from ft.user.models import User
 from ft.user.serializers import UserSerializer
-from ft.event.models import CarpoolRequest, CarpoolTrip
+from ft.event.models import CarpoolPayment, CarpoolRequest, CarpoolTrip
 from .CarpoolTripSerializer import CarpoolTripSerializer
 
 
@@ -12,7 +15,7 @@ class CarpoolRequestSerializer(serializers.ModelSerializer):
     passenger = UserSerializer(read_only=True)
     passenger_id = serializers.PrimaryKeyRelatedField(
         source="passenger",
-        queryset=CarpoolTrip.objects.all(),
+        queryset=User.objects.all(),
         write_only=True,
         required=False,
     )
@@ -155,3 +158,40 @@ class CarpoolRequestActionSerializer(serializers.Serializer):
                 )
 
         return data
+
+
+class CarpoolRequestPaymentSerializer(serializers.Serializer):
+    """
+    Sérialiseur pour l'enregistrement d'un paiement sur une demande de
+    covoiturage par le conducteur.
+    """
+
+    amount = serializers.DecimalField(
+        max_digits=8,
+        decimal_places=2,
+        min_value=Decimal("0.01"),
+    )
+    is_completed = serializers.BooleanField(required=False)
+    payment_method = serializers.ChoiceField(
+        choices=CarpoolPayment.PAYMENT_METHOD_CHOICES,
+        required=False,
+    )
+    notes = serializers.CharField(required=False, allow_blank=True)
+
+    def validate(self, data):
+        request = self.context.get("request")
+        carpool_request = self.context.get("carpool_request")
+
+        # Seul le conducteur enregistre les paiements
+        if request.user.pk != carpool_request.trip.driver_id:
+            raise serializers.ValidationError(
+                {"amount": "Seul le conducteur peut enregistrer des paiements."}
+            )
+
+        # Seules les demandes acceptées peuvent avoir des paiements
+        if carpool_request.status != "ACCEPTED":
+            raise serializers.ValidationError(
+                {"amount": "Seules les demandes acceptées peuvent avoir des paiements."}
+            )
+
+        return data
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from ft.user.models import User
 from ft.user.serializers import UserSerializer
 from ft.event.models import CarpoolTrip, Event
 from ft.event.serializers import EventSerializer
@@ -12,7 +13,7 @@ class CarpoolTripSerializer(serializers.ModelSerializer):
     driver = UserSerializer(read_only=True)
     driver_id = serializers.PrimaryKeyRelatedField(
         source="driver",
-        queryset=Event.objects.all(),
+        queryset=User.objects.all(),
         write_only=True,
         required=False,
     )
@@ -24,6 +25,8 @@ class CarpoolTripSerializer(serializers.ModelSerializer):
     )
     seats_available = serializers.IntegerField(read_only=True)
     is_full = serializers.BooleanField(read_only=True)
+    # Distance au point recherché, annotée par CarpoolTripQuerySet.near()
+    departure_distance = serializers.FloatField(read_only=True, required=False)
 
     class Meta:
         model = CarpoolTrip
@@ -35,6 +38,9 @@ class CarpoolTripSerializer(serializers.ModelSerializer):
             "event_id",
             "departure_city",
             "departure_address",
+            "departure_latitude",
+            "departure_longitude",
+            "departure_distance",
             "arrival_city",
             "arrival_address",
             "departure_datetime",
@@ -44,8 +50,6 @@ class CarpoolTripSerializer(serializers.ModelSerializer):
             "seats_available",
             "is_full",
             "price_per_seat",
-            "allow_luggage",
-            "allow_pets",
             "additional_info",
             "is_active",
             "created_at",
@@ -57,6 +61,9 @@ class CarpoolTripSerializer(serializers.ModelSerializer):
             "updated_at",
             "seats_available",
             "is_full",
+            "departure_latitude",
+            "departure_longitude",
+            "departure_distance",
         ]
 
     def create(self, validated_data):
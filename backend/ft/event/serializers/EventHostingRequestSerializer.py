@@ -1,7 +1,9 @@
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from ft.event.models import EventHostingRequest, EventHosting
 from ft.user.serializers import UserSerializer
 from ft.event.serializers import EventHostingSerializer
+from ft.event.serializers.EventHostingSerializer import ACTIVE_REQUEST_CONSTRAINT
 
 
 class EventHostingRequestSerializer(serializers.ModelSerializer):
@@ -13,12 +15,18 @@ class EventHostingRequestSerializer(serializers.ModelSerializer):
     # En écriture : simplement l'ID
     requester = UserSerializer(read_only=True)
     hosting = EventHostingSerializer(read_only=True)
+    hosting_id = serializers.PrimaryKeyRelatedField(
+        source="hosting",
+        queryset=EventHosting.objects.all(),
+        write_only=True,
+    )
 
     class Meta:
         model = EventHostingRequest
         fields = [
             "id",
             "hosting",
+            "hosting_id",
             "requester",
             "status",
             "message",
@@ -35,40 +43,55 @@ class EventHostingRequestSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
 
+    def get_fields(self):
+        fields = super().get_fields()
+        # L'hébergement n'est choisi qu'à la création (voir validate)
+        fields["hosting_id"].required = self.instance is None
+        return fields
+
     def validate(self, data):
         """
-        Vérifie que l'utilisateur ne fait pas une demande pour son propre hébergement
-        et qu'il n'a pas déjà fait une demande pour le même événement.
+        Vérifie que l'utilisateur ne fait pas une demande pour son propre
+        hébergement, et que l'hébergement d'une demande existante ne change
+        pas : une demande acceptée ne doit pas être reportée sur un
+        hébergement dont l'hôte ne l'a pas acceptée. L'unicité de la demande
+        active par événement est garantie par la base (voir save).
         """
-        hosting = data.get("hosting")
+        if self.instance is not None:
+            if data.get("hosting", self.instance.hosting) != self.instance.hosting:
+                raise serializers.ValidationError(
+                    {
+                        "hosting_id": "L'hébergement d'une demande existante ne "
+                        "peut pas être modifié."
+                    }
+                )
+            return data
+
+        hosting = data["hosting"]
         requester = self.context["request"].user
 
         # Vérification que l'utilisateur n'est pas l'hôte
-        if hosting.host == requester:
+        if hosting.host_id == requester.pk:
             raise serializers.ValidationError(
                 {"hosting": "Vous ne pouvez pas demander votre propre hébergement."}
             )
 
-        # Vérification que l'utilisateur n'a pas déjà une demande active
-        # pour le même événement
-        event = hosting.event
-        existing_requests = EventHostingRequest.objects.filter(
-            hosting__event=event,
-            requester=requester,
-            status__in=["PENDING", "ACCEPTED"],
-        )
-
-        # Exclure la demande actuelle en cas de mise à jour
-        if self.instance:
-            existing_requests = existing_requests.exclude(pk=self.instance.pk)
+        return data
 
-        if existing_requests.exists():
+    def save(self, **kwargs):
+        # Une seule demande en attente ou acceptée par événement : la
+        # contrainte d'unicité partielle rejette le doublon dans l'INSERT (ou
+        # l'UPDATE) même, y compris pour deux demandes simultanées
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError as error:
+            if ACTIVE_REQUEST_CONSTRAINT not in str(error):
+                raise
             raise serializers.ValidationError(
                 {"hosting": "Vous avez déjà une demande en cours pour cet événement."}
             )
 
-        return data
-
 
 class EventHostingRequestActionSerializer(serializers.Serializer):
     """
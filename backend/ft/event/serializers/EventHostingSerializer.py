@@ -1,7 +1,11 @@
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from ft.event.models import EventHosting
 from ft.user.serializers import UserSerializer
 
+# Contrainte d'unicité partielle de EventHostingRequest.Meta.constraints
+ACTIVE_REQUEST_CONSTRAINT = "unique_active_hosting_request_per_event"
+
 
 class EventHostingSerializer(serializers.ModelSerializer):
     """
@@ -9,6 +13,9 @@ class EventHostingSerializer(serializers.ModelSerializer):
     """
 
     host = UserSerializer(read_only=True)
+    # Annotés par EventHostingQuerySet.with_availability() (omis sinon)
+    accepted_guests = serializers.IntegerField(read_only=True)
+    available_places = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = EventHosting
@@ -17,6 +24,8 @@ class EventHostingSerializer(serializers.ModelSerializer):
             "event",
             "host",
             "available_beds",
+            "accepted_guests",
+            "available_places",
             "custom_rules",
             "address_override",
             "city_override",
@@ -26,7 +35,14 @@ class EventHostingSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
-        read_only_fields = ["id", "host", "created_at", "updated_at"]
+        read_only_fields = [
+            "id",
+            "host",
+            "accepted_guests",
+            "available_places",
+            "created_at",
+            "updated_at",
+        ]
 
     def create(self, validated_data):
         """
@@ -46,3 +62,20 @@ class EventHostingSerializer(serializers.ModelSerializer):
             validated_data["custom_rules"] = user.home_rules
 
         return super().create(validated_data)
+
+    def save(self, **kwargs):
+        # Les demandes recopient l'événement de l'hébergement : le déplacer
+        # sur un événement où un demandeur a déjà une demande en cours est
+        # rejeté par la contrainte d'unicité partielle
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError as error:
+            if ACTIVE_REQUEST_CONSTRAINT not in str(error):
+                raise
+            raise serializers.ValidationError(
+                {
+                    "event": "Un demandeur de cet hébergement a déjà une demande "
+                    "en cours pour cet événement."
+                }
+            )
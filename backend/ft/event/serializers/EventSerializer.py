@@ -1,6 +1,46 @@
+from django.db.models import prefetch_related_objects
+from django.db.models.manager import BaseManager
 from rest_framework import serializers
+from ft.event.cache import event_cache_key, get_cached_events, set_cached_events
 from ft.event.models import Event
-from django.db.models import Count
+from ft.event.managers.EventQuerySet import (
+    FIRST_SUBSCRIBERS_LIMIT,
+    first_subscribers_prefetch,
+)
+
+
+class CachedEventListSerializer(serializers.ListSerializer):
+    """
+    Sérialise une liste d'événements en s'appuyant sur le cache versionné :
+    une seule lecture du cache pour toute la liste, et seuls les événements
+    absents du cache sont sérialisés (avec leurs premiers inscrits préchargés
+    en une requête).
+    """
+
+    def to_representation(self, data):
+        events = list(data.all() if isinstance(data, BaseManager) else data)
+        representations = get_cached_events(events)
+
+        missing = [
+            event for event in events if event_cache_key(event) not in representations
+        ]
+        if missing:
+            prefetch_related_objects(
+                [
+                    event
+                    for event in missing
+                    if not hasattr(event, "first_yes_subscriptions")
+                ],
+                first_subscribers_prefetch(),
+            )
+            fresh = {
+                event_cache_key(event): self.child.to_representation(event)
+                for event in missing
+            }
+            set_cached_events(fresh)
+            representations.update(fresh)
+
+        return [representations[event_cache_key(event)] for event in events]
 
 
 class EventSerializer(serializers.ModelSerializer):
@@ -26,34 +66,30 @@ class EventSerializer(serializers.ModelSerializer):
             "subscriptions_count",
             "first_subscribers",
         ]
+        list_serializer_class = CachedEventListSerializer
         read_only_fields = [
             "created_at",
             "updated_at",
         ]
 
     def get_subscriptions_count(self, obj):
-        # Récupérer le décompte des réponses par type de réponse
-        counts = (
-            obj.eventsubscription_set.filter(is_active=True)
-            .values("answer")
-            .annotate(count=Count("answer"))
-        )
-
-        # Initialiser le dictionnaire avec toutes les valeurs possibles à 0
-        result = {"YES": 0, "NO": 0, "MAYBE": 0}
-
-        # Remplir avec les valeurs réelles
-        for item in counts:
-            result[item["answer"]] = item["count"]
-
-        return result
+        # Compteurs dénormalisés, maintenus à chaque changement d'inscription
+        return {
+            "YES": obj.yes_count,
+            "NO": obj.no_count,
+            "MAYBE": obj.maybe_count,
+        }
 
     def get_first_subscribers(self, obj):
-        subs = (
-            obj.eventsubscription_set.filter(is_active=True, answer="YES")
-            .select_related("user")
-            .order_by("created_at")[:3]
-        )
+        # Inscrits déjà préchargés par EventQuerySet.with_first_subscribers()
+        if hasattr(obj, "first_yes_subscriptions"):
+            subs = obj.first_yes_subscriptions
+        else:
+            subs = (
+                obj.eventsubscription_set.filter(is_active=True, answer="YES")
+                .select_related("user")
+                .order_by("created_at", "id")[:FIRST_SUBSCRIBERS_LIMIT]
+            )
         initials = []
         for sub in subs:
             first_initial = (sub.user.first_name or "").strip()[:1]
@@ -11,8 +11,14 @@ from .CarpoolTripSerializer import CarpoolTripSerializer
 from .CarpoolRequestSerializer import (
     CarpoolRequestSerializer,
     CarpoolRequestActionSerializer,
+    CarpoolRequestPaymentSerializer,
 )
-from .CarpoolPaymentSerializer import CarpoolPaymentSerializer
+from .CarpoolPaymentSerializer import (
+    CarpoolPaymentSerializer,
+    CarpoolPaymentBulkSerializer,
+    CarpoolPaymentBulkItemSerializer,
+)
+from .CarpoolLedgerSerializer import CarpoolLedgerSerializer
 
 __all__ = [
     "EventSerializer",
@@ -24,5 +30,9 @@ __all__ = [
     "CarpoolTripSerializer",
     "CarpoolRequestSerializer",
     "CarpoolRequestActionSerializer",
+    "CarpoolRequestPaymentSerializer",
     "CarpoolPaymentSerializer",
+    "CarpoolPaymentBulkSerializer",
+    "CarpoolPaymentBulkItemSerializer",
+    "CarpoolLedgerSerializer",
 ]
@@ -0,0 +1,116 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ft.event.cache import bump_carpool_ledger_version, bump_event_cache_version
+from ft.event.models import (
+    CarpoolPayment,
+    CarpoolRequest,
+    CarpoolTrip,
+    Event,
+    EventSubscription,
+)
+from ft.user.models import User
+
+# Champs de l'utilisateur affichés dans la représentation d'un événement
+# (initiales des premiers inscrits)
+EVENT_USER_FIELDS = {"first_name", "last_name", "email"}
+
+
+@receiver(post_delete, sender=EventSubscription)
+def decrement_event_counters(sender, instance, **kwargs):
+    """
+    Retire une inscription supprimée des compteurs de son événement, y compris
+    lors des suppressions en cascade (ex: suppression d'un utilisateur).
+    """
+    EventSubscription.update_event_counters(
+        EventSubscription.counted_state(
+            instance.event_id, instance.answer, instance.is_active
+        ),
+        None,
+    )
+
+
+@receiver(post_delete, sender=CarpoolRequest)
+def release_trip_seats(sender, instance, **kwargs):
+    """
+    Libère les places d'une demande acceptée supprimée, y compris lors des
+    suppressions en cascade et des suppressions groupées de l'administration.
+    """
+    CarpoolRequest.update_trip_seats(
+        CarpoolRequest.counted_state(
+            instance.trip_id, instance.status, instance.seats_requested
+        ),
+        None,
+    )
+
+
+@receiver(post_delete, sender=CarpoolPayment)
+def release_paid_amount(sender, instance, **kwargs):
+    """
+    Retire un paiement supprimé du montant payé de sa demande, y compris lors
+    des suppressions en cascade et des suppressions groupées de
+    l'administration.
+    """
+    CarpoolPayment.update_paid_amounts((instance.request_id, instance.amount), None)
+
+
+@receiver([post_save, post_delete], sender=CarpoolTrip)
+def bump_trip_carpool_ledger(sender, instance, **kwargs):
+    """
+    Invalide le registre des paiements de covoiturage de l'événement du
+    trajet (prix par place, conducteur), ainsi que celui de son ancien
+    événement lorsque le trajet en change.
+    """
+    event_ids = {instance.event_id, getattr(instance, "_loaded_event_id", None)}
+    bump_carpool_ledger_version(Event.objects.filter(pk__in=event_ids - {None}))
+
+
+@receiver([post_save, post_delete], sender=CarpoolRequest)
+def bump_request_carpool_ledger(sender, instance, **kwargs):
+    """
+    Invalide le registre des paiements de covoiturage de l'événement de la
+    demande (statut, places demandées).
+    """
+    # Sous-requête sur le trajet, plutôt que de charger instance.trip
+    bump_carpool_ledger_version(Event.objects.filter(carpool_trips=instance.trip_id))
+
+
+@receiver([post_save, post_delete], sender=CarpoolPayment)
+def bump_payment_carpool_ledger(sender, instance, **kwargs):
+    """
+    Invalide le registre des paiements de covoiturage de l'événement du
+    paiement.
+    """
+    # Sous-requête sur la demande, plutôt que de charger instance.request
+    bump_carpool_ledger_version(
+        Event.objects.filter(carpool_trips__requests=instance.request_id)
+    )
+
+
+@receiver(post_save, sender=Event)
+def bump_event_cache(sender, instance, **kwargs):
+    """
+    Invalide la représentation en cache d'un événement modifié.
+    Les modifications d'inscriptions sont prises en compte directement par
+    EventSubscription.update_event_counters.
+    """
+    bump_event_cache_version(Event.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=User)
+def bump_subscribed_events_cache(sender, instance, created, update_fields, **kwargs):
+    """
+    Invalide les événements où l'utilisateur apparaît parmi les inscrits
+    lorsque son nom ou son email change.
+    """
+    if created or (
+        update_fields is not None and not EVENT_USER_FIELDS & set(update_fields)
+    ):
+        return
+    bump_event_cache_version(
+        Event.objects.filter(
+            eventsubscription__user=instance,
+            eventsubscription__is_active=True,
+            eventsubscription__answer="YES",
+        )
+    )
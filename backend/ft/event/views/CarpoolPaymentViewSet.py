@@ -1,7 +1,18 @@
-from rest_framework import viewsets, permissions, filters
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from rest_framework import viewsets, permissions, filters, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from ft.event.models import CarpoolPayment
-from ft.event.serializers import CarpoolPaymentSerializer
+from ft.event.cache import bump_carpool_ledger_version
+from ft.event.models import CarpoolPayment, CarpoolRequest, Event
+from ft.event.serializers import (
+    CarpoolPaymentSerializer,
+    CarpoolPaymentBulkSerializer,
+    CarpoolPaymentBulkItemSerializer,
+)
 
 
 class CarpoolPaymentViewSet(viewsets.ModelViewSet):
@@ -15,6 +26,8 @@ class CarpoolPaymentViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ["request", "is_completed", "payment_method"]
     search_fields = ["notes"]
+    # Ordre de la pagination par curseur (?pagination=cursor)
+    cursor_ordering = ("-created_at", "id")
 
     def get_queryset(self):
         """
@@ -22,13 +35,66 @@ class CarpoolPaymentViewSet(viewsets.ModelViewSet):
         - Conducteur: voit tous les paiements pour ses trajets
         - Passager: voit tous ses paiements
         """
-        user = self.request.user
-        return CarpoolPayment.objects.filter(
-            request__trip__driver=user
-        ) | CarpoolPayment.objects.filter(request__passenger=user)
+        return CarpoolPayment.objects.visible_to(self.request.user)
 
     def perform_create(self, serializer):
         """
         Enregistre le paiement.
         """
         serializer.save()
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        """
+        Enregistre en une fois les paiements des passagers d'un trajet
+        (conducteur uniquement). Les paiements valides sont insérés par un
+        seul bulk_create ; la réponse donne, pour chaque paiement envoyé (dans
+        l'ordre), le paiement créé ou ses erreurs.
+        """
+        serializer = CarpoolPaymentBulkSerializer(
+            data=request.data, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+        trip = serializer.validated_data["trip"]
+
+        results, payments = [], []
+        with transaction.atomic():
+            # Demandes acceptées du trajet, lues une seule fois pour tous les
+            # paiements et verrouillées (SELECT ... FOR UPDATE) jusqu'à leur
+            # insertion : une demande annulée entre-temps ne reçoit pas de
+            # paiement
+            context = {
+                "accepted_request_ids": set(
+                    CarpoolRequest.objects.select_for_update()
+                    .filter(trip=trip, status="ACCEPTED")
+                    .values_list("pk", flat=True)
+                )
+            }
+            for index, item in enumerate(serializer.validated_data["payments"]):
+                item_serializer = CarpoolPaymentBulkItemSerializer(
+                    data=item, context=context
+                )
+                if item_serializer.is_valid():
+                    payment = CarpoolPayment(**item_serializer.validated_data)
+                    payments.append(payment)
+                    results.append({"index": index, "payment": payment})
+                else:
+                    results.append({"index": index, "errors": item_serializer.errors})
+
+            if payments:
+                CarpoolPayment.objects.bulk_create(payments)
+                # bulk_create ne passe pas par CarpoolPayment.save() et
+                # n'envoie pas de signal post_save
+                amounts = defaultdict(Decimal)
+                for payment in payments:
+                    amounts[payment.request_id] += payment.amount
+                CarpoolPayment.add_paid_amounts(amounts)
+                bump_carpool_ledger_version(Event.objects.filter(pk=trip.event_id))
+
+        for result in results:
+            if "payment" in result:
+                result["payment"] = CarpoolPaymentSerializer(result["payment"]).data
+        return Response(
+            {"created": len(payments), "results": results},
+            status=status.HTTP_201_CREATED if payments else status.HTTP_400_BAD_REQUEST,
+        )
@@ -1,12 +1,14 @@
+from django.db import transaction
 from rest_framework import viewsets, permissions, status, filters
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from ft.event.models import CarpoolRequest
+from ft.event.models import CarpoolPayment, CarpoolRequest, CarpoolTrip
 from ft.event.serializers import (
     CarpoolRequestSerializer,
     CarpoolRequestActionSerializer,
-    CarpoolPaymentSerializer,
+    CarpoolRequestPaymentSerializer,
 )
 
 
@@ -19,8 +21,10 @@ class CarpoolRequestViewSet(viewsets.ModelViewSet):
     serializer_class = CarpoolRequestSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
-    filterset_fields = ["trip", "passenger", "status", "is_active", "is_paid"]
+    filterset_fields = ["trip", "passenger", "status", "is_active"]
     search_fields = ["message"]
+    # Ordre de la pagination par curseur (?pagination=cursor)
+    cursor_ordering = ("-created_at", "id")
 
     def get_queryset(self):
         """
@@ -28,12 +32,11 @@ class CarpoolRequestViewSet(viewsets.ModelViewSet):
         - Conducteur: voit toutes les demandes pour ses trajets
         - Passager: voit toutes ses demandes
         """
-        user = self.request.user
-        # Les utilisateurs voient les demandes associées à leurs trajets (en tant que conducteur)
-        # ou leurs propres demandes (en tant que passager)
-        return CarpoolRequest.objects.filter(
-            trip__driver=user
-        ) | CarpoolRequest.objects.filter(passenger=user)
+        return (
+            CarpoolRequest.objects.visible_to(self.request.user)
+            .with_related()
+            .with_payment_totals()
+        )
 
     def perform_create(self, serializer):
         """
@@ -59,21 +62,24 @@ class CarpoolRequestViewSet(viewsets.ModelViewSet):
             action = serializer.validated_data["action"]
             response_message = serializer.validated_data.get("response_message")
 
-            # Mettre à jour le statut selon l'action
-            if action == "accept":
-                carpool_request.status = "ACCEPTED"
-            elif action == "reject":
-                carpool_request.status = "REJECTED"
-            elif action == "cancel":
-                carpool_request.status = "CANCELLED"
+            with transaction.atomic():
+                # Mettre à jour le statut selon l'action
+                if action == "accept":
+                    self.reserve_seats(carpool_request)
+                    carpool_request.status = "ACCEPTED"
+                elif action == "reject":
+                    carpool_request.status = "REJECTED"
+                elif action == "cancel":
+                    carpool_request.status = "CANCELLED"
 
-            # Enregistrer le message de réponse s'il est fourni
-            if response_message:
-                carpool_request.response_message = response_message
+                # Enregistrer le message de réponse s'il est fourni
+                if response_message:
+                    carpool_request.response_message = response_message
 
-            carpool_request.save()
+                carpool_request.save()
 
-            # Retourner la demande mise à jour
+            # Retourner la demande mise à jour, places du trajet recalculées
+            carpool_request = self.get_queryset().get(pk=carpool_request.pk)
             return Response(
                 CarpoolRequestSerializer(carpool_request).data,
                 status=status.HTTP_200_OK,
@@ -81,28 +87,79 @@ class CarpoolRequestViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def reserve_seats(self, carpool_request):
+        """
+        Vérifie qu'il reste assez de places pour accepter la demande, trajet
+        verrouillé (SELECT ... FOR UPDATE) jusqu'à la fin de la transaction :
+        les acceptations concurrentes sur un même trajet attendent leur tour
+        et voient les places déjà attribuées, ce qui empêche la surréservation.
+        """
+        trip = CarpoolTrip.objects.select_for_update().get(pk=carpool_request.trip_id)
+
+        # La demande a pu être traitée entre sa lecture et le verrouillage
+        current_status = (
+            CarpoolRequest.objects.select_for_update()
+            .values_list("status", flat=True)
+            .get(pk=carpool_request.pk)
+        )
+        if current_status != "PENDING":
+            raise ValidationError({"action": "Cette demande a déjà été traitée."})
+
+        seats_available = trip.seats_available
+        if seats_available < carpool_request.seats_requested:
+            raise ValidationError(
+                {"action": f"Il ne reste que {seats_available} place(s) disponible(s)."}
+            )
+
     @action(detail=True, methods=["post"])
     def payment(self, request, pk=None):
         """
-        Endpoint pour marquer une demande comme payée ou non.
-        Seul le conducteur peut marquer un paiement comme effectué ou non.
+        Endpoint pour enregistrer un paiement du passager (conducteur
+        uniquement). Un paiement partiel en cours est complété du montant
+        reçu, sinon un nouveau paiement est créé. Sans is_completed, le
+        paiement est complet dès que le montant attendu est atteint.
         """
         carpool_request = self.get_object()
-        serializer = CarpoolPaymentSerializer(
+        serializer = CarpoolRequestPaymentSerializer(
             data=request.data,
             context={"request": request, "carpool_request": carpool_request},
         )
 
         if serializer.is_valid():
-            is_paid = serializer.validated_data["is_paid"]
-            payment_notes = serializer.validated_data.get("payment_notes", "")
-
-            # Mettre à jour le statut de paiement
-            carpool_request.is_paid = is_paid
-            carpool_request.payment_notes = payment_notes
-            carpool_request.save()
-
-            # Retourner la demande mise à jour
+            data = serializer.validated_data
+
+            with transaction.atomic():
+                # Demande verrouillée et montant payé relu : deux paiements
+                # simultanés s'enchaînent, et le second voit le montant
+                # enregistré par le premier
+                amount_paid = (
+                    CarpoolRequest.objects.select_for_update()
+                    .values_list("amount_paid", flat=True)
+                    .get(pk=carpool_request.pk)
+                )
+                # Paiement partiel en cours, complété plutôt que dupliqué
+                payment = (
+                    carpool_request.payments.select_for_update()
+                    .filter(is_completed=False)
+                    .order_by("-created_at", "-id")
+                    .first()
+                ) or CarpoolPayment(request=carpool_request, amount=0)
+
+                payment.amount += data["amount"]
+                payment.is_completed = data.get(
+                    "is_completed",
+                    amount_paid + data["amount"] >= carpool_request.expected_amount,
+                )
+                for field in ("payment_method", "notes"):
+                    if field in data:
+                        setattr(payment, field, data[field])
+                # Met aussi à jour amount_paid sur la demande (voir
+                # CarpoolPayment.save)
+                payment.save()
+
+            # Retourner la demande mise à jour, montant payé relu dans sa
+            # colonne
+            carpool_request = self.get_queryset().get(pk=carpool_request.pk)
             return Response(
                 CarpoolRequestSerializer(carpool_request).data,
                 status=status.HTTP_200_OK,
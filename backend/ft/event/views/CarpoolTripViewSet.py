@@ -1,8 +1,14 @@
-from django.db.models import Q, Count, F
 from rest_framework import viewsets, permissions, filters
+from rest_framework.exceptions import ValidationError
 from django_filters.rest_framework import DjangoFilterBackend
 from ft.event.models import CarpoolTrip
 from ft.event.serializers import CarpoolTripSerializer
+from ft.geo import geocode_city
+from ft.search import NormalizedSearchFilter
+
+# Rayon par défaut et maximal de la recherche de proximité (?near=), en km
+DEFAULT_NEAR_RADIUS_KM = 25
+MAX_NEAR_RADIUS_KM = 200
 
 
 class CarpoolTripViewSet(viewsets.ModelViewSet):
@@ -10,12 +16,16 @@ class CarpoolTripViewSet(viewsets.ModelViewSet):
     API endpoint pour les trajets de covoiturage.
     """
 
-    queryset = CarpoolTrip.objects.all().order_by("-departure_datetime")
+    queryset = (
+        CarpoolTrip.objects.with_related()
+        .with_free_seats()
+        .order_by("-departure_datetime")
+    )
     serializer_class = CarpoolTripSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        NormalizedSearchFilter,
         filters.OrderingFilter,
     ]
     filterset_fields = [
@@ -25,8 +35,13 @@ class CarpoolTripViewSet(viewsets.ModelViewSet):
         "arrival_city",
         "is_active",
     ]
+    # Recherche sans accents ni casse, servie par les index trigrammes (voir
+    # NormalizedSearchFilter) ; ?departure_search= et ?arrival_search=
+    # tolèrent en plus les fautes de frappe (search_cities)
     search_fields = ["departure_city", "arrival_city", "additional_info"]
-    ordering_fields = ["departure_datetime", "created_at"]
+    ordering_fields = ["departure_datetime", "created_at", "free_seats"]
+    # Ordre de la pagination par curseur (?pagination=cursor)
+    cursor_ordering = ("departure_datetime", "id")
 
     def get_queryset(self):
         """
@@ -36,14 +51,15 @@ class CarpoolTripViewSet(viewsets.ModelViewSet):
 
         # Filtrer par disponibilité de places
         has_seats = self.request.query_params.get("has_seats")
-        if has_seats is not None:
-            # On compte les places acceptées par trajet
-            queryset = queryset.annotate(
-                accepted_seats=Count("requests", filter=Q(requests__status="ACCEPTED"))
-            )
-            # On filtre les trajets avec au moins une place disponible
-            if has_seats.lower() == "true":
-                queryset = queryset.filter(seats_total__gt=F("accepted_seats"))
+        if has_seats is not None and has_seats.lower() == "true":
+            # Places libres annotées par with_free_seats()
+            queryset = queryset.filter(free_seats__gt=0)
+
+        # Recherche approximative des villes, classée par similarité
+        queryset = queryset.search_cities(
+            departure=self.request.query_params.get("departure_search"),
+            arrival=self.request.query_params.get("arrival_search"),
+        )
 
         # Filtrer par date de départ après une certaine date
         departure_after = self.request.query_params.get("departure_after")
@@ -55,8 +71,43 @@ class CarpoolTripViewSet(viewsets.ModelViewSet):
         if departure_before:
             queryset = queryset.filter(departure_datetime__lte=departure_before)
 
+        # Trajets partant à proximité d'une ville (?near=me pour la ville du
+        # profil), classés par distance. Combiné aux bornes de date ci-dessus,
+        # le filtre est servi par l'index GiST (position, date de départ).
+        near = self.request.query_params.get("near")
+        if near:
+            queryset = queryset.near(*self.near_point(near), self.near_radius())
+
         return queryset
 
+    def near_point(self, near):
+        """
+        Renvoie les coordonnées de la ville recherchée, d'après le répertoire
+        des communes.
+        """
+        city = self.request.user.city if near == "me" else near
+        coordinates = geocode_city(city)
+        if coordinates is None:
+            raise ValidationError({"near": f"Ville inconnue : {city or '(vide)'}."})
+        return coordinates
+
+    def near_radius(self):
+        """
+        Renvoie le rayon de la recherche de proximité, en kilomètres.
+        """
+        radius = self.request.query_params.get("radius", DEFAULT_NEAR_RADIUS_KM)
+        try:
+            radius = float(radius)
+        except (TypeError, ValueError):
+            raise ValidationError({"radius": "Le rayon doit être un nombre."})
+        if not 0 < radius <= MAX_NEAR_RADIUS_KM:
+            raise ValidationError(
+                {
+                    "radius": f"Le rayon doit être compris entre 0 et {MAX_NEAR_RADIUS_KM} km."
+                }
+            )
+        return radius
+
     def perform_create(self, serializer):
         """
         Définit l'utilisateur courant comme conducteur lors de la création.
@@ -1,7 +1,7 @@
+from django.db import transaction
 from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Count
 
 from ft.event.models import EventHostingRequest, EventHosting
 from ft.event.serializers import (
@@ -9,9 +9,10 @@ from ft.event.serializers import (
     EventHostingRequestActionSerializer,
 )
 from ft.event.permissions import IsHostingRequestRequesterOrHost
+from ft.views.PaginatedActionMixin import PaginatedActionMixin
 
 
-class EventHostingRequestViewSet(viewsets.ModelViewSet):
+class EventHostingRequestViewSet(PaginatedActionMixin, viewsets.ModelViewSet):
     """
     API endpoint qui permet de gérer les demandes d'hébergement.
     """
@@ -22,6 +23,8 @@ class EventHostingRequestViewSet(viewsets.ModelViewSet):
     search_fields = ["requester__first_name", "requester__last_name", "status"]
     ordering_fields = ["created_at", "status"]
     ordering = ["-created_at"]
+    # Ordre de la pagination par curseur (?pagination=cursor)
+    cursor_ordering = ("-created_at", "id")
 
     def get_queryset(self):
         """
@@ -30,18 +33,12 @@ class EventHostingRequestViewSet(viewsets.ModelViewSet):
         - Un hôte voit les demandes pour ses hébergements
         """
         user = self.request.user
-        queryset = EventHostingRequest.objects.all()
+        queryset = EventHostingRequest.objects.with_related()
 
         # Si l'utilisateur n'est pas staff, on filtre selon ses droits
         if not user.is_staff:
-            # Les demandes dont l'utilisateur est le demandeur
-            user_requests = queryset.filter(requester=user)
-
-            # Les demandes pour les hébergements dont l'utilisateur est l'hôte
-            host_requests = queryset.filter(hosting__host=user)
-
-            # Union des deux querysets
-            queryset = user_requests | host_requests
+            # Les demandes dont l'utilisateur est le demandeur ou l'hôte
+            queryset = queryset.visible_to(user)
 
         # Filtrage par statut
         status = self.request.query_params.get("status", None)
@@ -66,17 +63,41 @@ class EventHostingRequestViewSet(viewsets.ModelViewSet):
         """
         serializer.save(requester=self.request.user)
 
-    def get_places_available(self, hosting):
-        """
-        Calcule le nombre de places encore disponibles pour un hébergement.
-        """
-        # Compter le nombre de demandes acceptées
-        accepted_requests_count = EventHostingRequest.objects.filter(
-            hosting=hosting, status=EventHostingRequest.Status.ACCEPTED
+    def reserve_bed(self, hosting_request):
+        """
+        Vérifie qu'il reste un lit pour accepter la demande, hébergement
+        verrouillé (SELECT ... FOR UPDATE) jusqu'à la fin de la transaction :
+        les acceptations concurrentes sur un même hébergement (plusieurs
+        onglets ou appareils de l'hôte) attendent leur tour et voient les
+        demandes déjà acceptées, ce qui empêche la surréservation.
+
+        Renvoie le message d'erreur si la demande ne peut pas être acceptée,
+        None sinon.
+        """
+        available_beds = (
+            EventHosting.objects.select_for_update()
+            .values_list("available_beds", flat=True)
+            .get(pk=hosting_request.hosting_id)
+        )
+
+        # La demande a pu être traitée entre sa lecture et le verrouillage
+        current_status = (
+            EventHostingRequest.objects.select_for_update()
+            .values_list("status", flat=True)
+            .get(pk=hosting_request.pk)
+        )
+        if current_status != EventHostingRequest.Status.PENDING:
+            return "Cette demande ne peut plus être acceptée."
+
+        # Compté après le verrouillage, dans une nouvelle requête : les
+        # acceptations validées pendant l'attente du verrou sont vues
+        accepted_guests = EventHostingRequest.objects.filter(
+            hosting_id=hosting_request.hosting_id,
+            status=EventHostingRequest.Status.ACCEPTED,
         ).count()
-
-        # Calculer le nombre de places restantes
-        return hosting.available_beds - accepted_requests_count
+        if accepted_guests >= available_beds:
+            return "Vous n'avez plus de places disponibles."
+        return None
 
     @action(detail=True, methods=["post"])
     def accept(self, request, pk=None):
@@ -87,7 +108,7 @@ class EventHostingRequestViewSet(viewsets.ModelViewSet):
         hosting_request = self.get_object()
 
         # Vérifier que l'utilisateur est bien l'hôte de l'hébergement
-        if hosting_request.hosting.host != request.user:
+        if hosting_request.hosting.host_id != request.user.pk:
             return Response(
                 {"error": "Vous n'êtes pas autorisé à accepter cette demande."},
                 status=status.HTTP_403_FORBIDDEN,
@@ -100,21 +121,22 @@ class EventHostingRequestViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Vérifier qu'il reste des places disponibles
-        places_available = self.get_places_available(hosting_request.hosting)
-        if places_available <= 0:
-            return Response(
-                {"error": "Vous n'avez plus de places disponibles."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
         # Traiter le message de l'hôte s'il y en a un
         serializer = EventHostingRequestActionSerializer(data=request.data)
         if serializer.is_valid():
-            if "host_message" in serializer.validated_data:
-                hosting_request.host_message = serializer.validated_data["host_message"]
+            # Vérification des lits et acceptation dans la même transaction
+            with transaction.atomic():
+                error = self.reserve_bed(hosting_request)
+                if error is not None:
+                    return Response(
+                        {"error": error}, status=status.HTTP_400_BAD_REQUEST
+                    )
+                if "host_message" in serializer.validated_data:
+                    hosting_request.host_message = serializer.validated_data[
+                        "host_message"
+                    ]
+                hosting_request.accept()
 
-            hosting_request.accept()
             response_serializer = self.get_serializer(hosting_request)
             return Response(response_serializer.data)
         else:
@@ -129,7 +151,7 @@ class EventHostingRequestViewSet(viewsets.ModelViewSet):
         hosting_request = self.get_object()
 
         # Vérifier que l'utilisateur est bien l'hôte de l'hébergement
-        if hosting_request.hosting.host != request.user:
+        if hosting_request.hosting.host_id != request.user.pk:
             return Response(
                 {"error": "Vous n'êtes pas autorisé à refuser cette demande."},
                 status=status.HTTP_403_FORBIDDEN,
@@ -188,15 +210,13 @@ class EventHostingRequestViewSet(viewsets.ModelViewSet):
         """
         Retourne uniquement les demandes faites par l'utilisateur connecté.
         """
-        requests = EventHostingRequest.objects.filter(requester=request.user)
-        serializer = self.get_serializer(requests, many=True)
-        return Response(serializer.data)
+        return self.list_response(self.get_queryset().filter(requester=request.user))
 
     @action(detail=False, methods=["get"])
     def for_my_hostings(self, request):
         """
         Retourne uniquement les demandes pour les hébergements de l'utilisateur connecté.
         """
-        requests = EventHostingRequest.objects.filter(hosting__host=request.user)
-        serializer = self.get_serializer(requests, many=True)
-        return Response(serializer.data)
+        return self.list_response(
+            self.get_queryset().filter(hosting__host=request.user)
+        )
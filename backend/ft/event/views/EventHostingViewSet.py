@@ -2,12 +2,13 @@ from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from ft.event.models import EventHosting, Event, EventHostingRequest
+from ft.event.models import EventHosting, Event
 from ft.event.serializers import EventHostingSerializer
 from ft.event.permissions import IsHostingOwnerOrReadOnly
+from ft.views.PaginatedActionMixin import PaginatedActionMixin
 
 
-class EventHostingViewSet(viewsets.ModelViewSet):
+class EventHostingViewSet(PaginatedActionMixin, viewsets.ModelViewSet):
     """
     API endpoint qui permet de consulter ou modifier les hébergements.
     """
@@ -16,15 +17,18 @@ class EventHostingViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, IsHostingOwnerOrReadOnly]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ["host__first_name", "host__last_name", "event__name"]
-    ordering_fields = ["created_at", "available_beds"]
+    ordering_fields = ["created_at", "available_beds", "available_places"]
     ordering = ["-created_at"]
+    # Ordre de la pagination par curseur (?pagination=cursor)
+    cursor_ordering = ("-created_at", "id")
 
     def get_queryset(self):
         """
-        Cette vue retourne une liste d'hébergements.
+        Cette vue retourne une liste d'hébergements, avec leurs places
+        disponibles.
         Filtrer par event ou host est possible en passant le paramètre dans l'URL.
         """
-        queryset = EventHosting.objects.all()
+        queryset = EventHosting.objects.with_related().with_availability()
 
         # Filtrage par événement
         event_id = self.request.query_params.get("event", None)
@@ -42,6 +46,11 @@ class EventHostingViewSet(viewsets.ModelViewSet):
             is_active = is_active.lower() == "true"
             queryset = queryset.filter(is_active=is_active)
 
+        # Filtrer les hébergements ayant encore des lits libres
+        has_beds = self.request.query_params.get("has_beds", None)
+        if has_beds is not None and has_beds.lower() == "true":
+            queryset = queryset.filter(available_places__gt=0)
+
         return queryset
 
     def perform_create(self, serializer):
@@ -55,9 +64,7 @@ class EventHostingViewSet(viewsets.ModelViewSet):
         """
         Retourne uniquement les hébergements proposés par l'utilisateur connecté.
         """
-        hostings = EventHosting.objects.filter(host=request.user)
-        serializer = self.get_serializer(hostings, many=True)
-        return Response(serializer.data)
+        return self.list_response(self.get_queryset().filter(host=request.user))
 
     @action(detail=False, methods=["get"])
     def for_event(self, request):
@@ -70,9 +77,8 @@ class EventHostingViewSet(viewsets.ModelViewSet):
 
         try:
             event = Event.objects.get(pk=event_id)
-            hostings = EventHosting.objects.filter(event=event, is_active=True)
-            serializer = self.get_serializer(hostings, many=True)
-            return Response(serializer.data)
+            hostings = self.get_queryset().filter(event=event, is_active=True)
+            return self.list_response(hostings)
         except Event.DoesNotExist:
             return Response({"error": "Événement non trouvé."}, status=404)
 
@@ -81,20 +87,13 @@ class EventHostingViewSet(viewsets.ModelViewSet):
         """
         Retourne le nombre de places disponibles dans cet hébergement.
         """
+        # Places annotées par with_availability()
         hosting = self.get_object()
 
-        # Compter le nombre de demandes acceptées
-        accepted_requests_count = EventHostingRequest.objects.filter(
-            hosting=hosting, status="ACCEPTED"
-        ).count()
-
-        # Calculer le nombre de places restantes
-        available_places = hosting.available_beds - accepted_requests_count
-
         return Response(
             {
                 "total_beds": hosting.available_beds,
-                "accepted_guests": accepted_requests_count,
-                "available_places": available_places,
+                "accepted_guests": hosting.accepted_guests,
+                "available_places": hosting.available_places,
             }
         )
@@ -2,12 +2,15 @@ from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from ft.event.models import EventSubscription
 from ft.event.serializers import EventSubscriptionSerializer
+from ft.views.ConditionalListMixin import ConditionalListMixin
 
 
-class EventSubscriptionViewSet(viewsets.ModelViewSet):
+class EventSubscriptionViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     queryset = EventSubscription.objects.all()
     serializer_class = EventSubscriptionSerializer
     permission_classes = [IsAuthenticated]
+    # Ordre de la pagination par curseur (?pagination=cursor)
+    cursor_ordering = ("id",)
 
     def get_queryset(self):
         """
@@ -1,20 +1,35 @@
+from django.core.cache import cache
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from ft.event.models import Event
+from ft.event.allocation import assign_carpool_seats, assign_hosting_beds
+from ft.event.cache import EVENT_CACHE_TIMEOUT, carpool_ledger_cache_key
+from ft.event.models import CarpoolRequest, Event
 from ft.event.serializers import (
+    CarpoolLedgerSerializer,
     EventSerializer,
     EventSubscribeActionSerializer,
     EventSubscriptionSerializer,
 )
 from ft.event.permissions import IsStaffOrReadOnly
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from ft.views.ConditionalListMixin import ConditionalListMixin
 
+# Groupements du registre des paiements de covoiturage (?group_by=)
+CARPOOL_LEDGER_GROUPS = {
+    "event": ("trip__event",),
+    "driver": ("trip__event", "trip__driver"),
+    "trip": ("trip__event", "trip__driver", "trip"),
+}
 
-class EventViewSet(viewsets.ModelViewSet):
+
+class EventViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
     permission_classes = [IsStaffOrReadOnly]
+    # Ordre de la pagination par curseur (?pagination=cursor)
+    cursor_ordering = ("start_date", "name", "id")
 
     def get_serializer_class(self):
         if self.action == "subscribe":
@@ -22,6 +37,8 @@ class EventViewSet(viewsets.ModelViewSet):
         return EventSerializer
 
     def get_queryset(self):
+        # Les premiers inscrits ne sont préchargés par le sérialiseur que pour
+        # les événements absents du cache
         return Event.objects.filter(is_active=True)
 
     @action(
@@ -45,3 +62,68 @@ class EventViewSet(viewsets.ModelViewSet):
         )
         serializer = EventSubscriptionSerializer(subscription)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="assign-carpool-seats",
+        permission_classes=[IsAdminUser],
+    )
+    def assign_carpool_seats(self, request, *args, **kwargs):
+        """
+        Attribue les places des trajets de l'événement aux demandes de
+        covoiturage en attente (?dry_run=true pour un simple calcul).
+        """
+        event = self.get_object()
+        dry_run = request.query_params.get("dry_run", "").lower() == "true"
+        result = assign_carpool_seats(event, dry_run=dry_run)
+        return Response({**result, "dry_run": dry_run}, status=status.HTTP_200_OK)
+
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="assign-hosting-beds",
+        permission_classes=[IsAdminUser],
+    )
+    def assign_hosting_beds(self, request, *args, **kwargs):
+        """
+        Attribue les lits des hébergements de l'événement aux demandes
+        d'hébergement en attente (?dry_run=true pour un simple calcul).
+        """
+        event = self.get_object()
+        dry_run = request.query_params.get("dry_run", "").lower() == "true"
+        result = assign_hosting_beds(event, dry_run=dry_run)
+        return Response({**result, "dry_run": dry_run}, status=status.HTTP_200_OK)
+
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="carpool-ledger",
+        permission_classes=[IsAdminUser],
+    )
+    def carpool_ledger(self, request, *args, **kwargs):
+        """
+        Registre des paiements de covoiturage de l'événement : montants
+        attendus, payés et restant dus, par trajet (défaut), par conducteur
+        (?group_by=driver) ou pour tout l'événement (?group_by=event).
+        """
+        event = self.get_object()
+        group_by = request.query_params.get("group_by", "trip")
+        if group_by not in CARPOOL_LEDGER_GROUPS:
+            raise ValidationError(
+                {"group_by": f"Valeurs possibles : {', '.join(CARPOOL_LEDGER_GROUPS)}."}
+            )
+
+        # Calculé en une requête, puis conservé jusqu'au prochain changement
+        # des demandes ou paiements de l'événement (voir signals.py)
+        ledger = cache.get_or_set(
+            carpool_ledger_cache_key(event, group_by),
+            lambda: CarpoolLedgerSerializer(
+                CarpoolRequest.objects.filter(trip__event=event).ledger(
+                    *CARPOOL_LEDGER_GROUPS[group_by]
+                ),
+                many=True,
+            ).data,
+            timeout=EVENT_CACHE_TIMEOUT,
+        )
+        return Response(ledger, status=status.HTTP_200_OK)
@@ -0,0 +1,120 @@
+import csv
+import gzip
+import math
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+
+from django.db.models import BooleanField, Field, FloatField, Func, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+# Communes françaises de plus de 500 habitants avec leurs coordonnées, issues
+# de GeoNames (https://www.geonames.org, licence CC BY 4.0)
+GAZETTEER_PATH = Path(__file__).resolve().parent / "data" / "communes.csv.gz"
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Abréviations courantes dans les noms de communes
+ABBREVIATIONS = {"st": "saint", "ste": "sainte"}
+
+
+def normalize_place_name(name):
+    """
+    Normalise un nom de commune pour la comparaison : sans accents, en
+    minuscules, sans ponctuation ("St-Quentin" → "saint quentin").
+    """
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(char for char in name if not unicodedata.combining(char))
+    words = re.split(r"[^a-z0-9]+", name.lower())
+    return " ".join(ABBREVIATIONS.get(word, word) for word in words if word)
+
+
+@lru_cache(maxsize=1)
+def load_gazetteer():
+    """
+    Charge le répertoire des communes, indexé par nom normalisé. Pour les
+    homonymes, la commune la plus peuplée l'emporte.
+    """
+    communes = {}
+    with gzip.open(GAZETTEER_PATH, "rt", encoding="utf-8") as gazetteer:
+        for row in csv.DictReader(gazetteer):
+            key = normalize_place_name(row["name"])
+            population = int(row["population"])
+            if key not in communes or communes[key][2] < population:
+                communes[key] = (
+                    float(row["latitude"]),
+                    float(row["longitude"]),
+                    population,
+                )
+    return {key: (lat, lon) for key, (lat, lon, _) in communes.items()}
+
+
+def geocode_city(name):
+    """
+    Renvoie les coordonnées (latitude, longitude) d'une commune, ou None si
+    elle est absente du répertoire. Aucun appel réseau n'est effectué.
+    """
+    if not name:
+        return None
+    return load_gazetteer().get(normalize_place_name(name))
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Renvoie le rectangle (lat_min, lon_min, lat_max, lon_max) qui contient le
+    cercle de rayon `radius_km` autour du point.
+    """
+    delta_lat = radius_km / KM_PER_DEGREE
+    delta_lon = radius_km / (
+        KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01)
+    )
+    return (
+        latitude - delta_lat,
+        longitude - delta_lon,
+        latitude + delta_lat,
+        longitude + delta_lon,
+    )
+
+
+class GeoPoint(Func):
+    """
+    point(longitude, latitude) de PostgreSQL.
+    """
+
+    function = "point"
+    output_field = Field()
+
+
+class InBox(Func):
+    """
+    Vrai si le point est dans le rectangle `box` (opérateur <@), condition
+    servie par un index GiST sur le point.
+    """
+
+    template = "%(expressions)s"
+    arg_joiner = " <@ "
+    output_field = BooleanField()
+
+    def __init__(self, point, lat_min, lon_min, lat_max, lon_max):
+        box = Func(
+            GeoPoint(Value(lon_min), Value(lat_min)),
+            GeoPoint(Value(lon_max), Value(lat_max)),
+            function="box",
+            output_field=Field(),
+        )
+        super().__init__(point, box)
+
+
+def distance_km(latitude_field, longitude_field, latitude, longitude):
+    """
+    Expression de la distance orthodromique (formule de haversine), en
+    kilomètres, entre les champs de coordonnées et un point.
+    """
+    lat1, lon1 = Radians(latitude_field), Radians(longitude_field)
+    lat2, lon2 = math.radians(latitude), math.radians(longitude)
+    haversine = Power(Sin((lat1 - Value(lat2)) / 2), 2) + Cos(lat1) * Value(
+        math.cos(lat2)
+    ) * Power(Sin((lon1 - Value(lon2)) / 2), 2)
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(haversine, output_field=FloatField()))
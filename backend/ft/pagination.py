@@ -0,0 +1,239 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Field, Func, Q, Value
+from django.db.models.lookups import GreaterThan, LessThan
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetCursorPagination(pagination.CursorPagination):
+    """
+    Pagination par curseur (keyset) sur l'ordre naturel déclaré par la vue
+    (`cursor_ordering`), sauf si un tri explicite est demandé via le
+    paramètre `ordering` d'un OrderingFilter.
+
+    Le curseur contient la valeur de chaque champ de l'ordre pour la dernière
+    (ou première) ligne de la page, et la page suivante est lue par une
+    comparaison de lignes `(a, b, id) > (%s, %s, %s)`, servie par l'index
+    composite de l'ordre, sans OFFSET. Les champs de l'ordre ne doivent pas
+    être nuls ; l'identifiant est ajouté en dernier s'il n'y figure pas, pour
+    que l'ordre soit total.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        has_ordering_filter = any(
+            issubclass(backend, OrderingFilter)
+            for backend in getattr(view, "filter_backends", [])
+        )
+        if has_ordering_filter and request.query_params.get(
+            OrderingFilter.ordering_param
+        ):
+            ordering = super().get_ordering(request, queryset, view)
+        else:
+            ordering = tuple(view.cursor_ordering)
+
+        if not {"pk", "id"} & {field.lstrip("-") for field in ordering}:
+            ordering += ("-pk" if ordering[-1].startswith("-") else "pk",)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = self.cursor.position if self.cursor else None
+
+        if reverse:
+            queryset = queryset.order_by(*pagination._reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = self.filter_after(queryset, position, reverse)
+
+        # Une ligne de plus pour savoir s'il existe une page au-delà
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        if self.page:
+            self.previous_position = self._get_position_from_instance(
+                self.page[0], self.ordering
+            )
+            self.next_position = self._get_position_from_instance(
+                self.page[-1], self.ordering
+            )
+        else:
+            self.previous_position = self.next_position = position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def filter_after(self, queryset, position, reverse):
+        """
+        Restreint aux lignes situées après la position du curseur dans l'ordre
+        parcouru (avant elle si le curseur est inversé).
+        """
+        if len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        fields = [field.lstrip("-") for field in self.ordering]
+        descending = [field.startswith("-") != reverse for field in self.ordering]
+        values = []
+        try:
+            for field, value in zip(fields, position):
+                output_field = queryset.query.resolve_ref(field).output_field
+                values.append(
+                    Value(output_field.to_python(value), output_field=output_field)
+                )
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if len(set(descending)) == 1:
+            # Même sens pour tous les champs : comparaison de lignes
+            lookup = LessThan if descending[0] else GreaterThan
+            return queryset.filter(
+                lookup(
+                    Func(*map(F, fields), function="ROW", output_field=Field()),
+                    Func(*values, function="ROW", output_field=Field()),
+                )
+            )
+
+        # Sens mélangés (ex: -created_at, id) : la comparaison de lignes ne
+        # s'applique pas, on la développe (a < x OU a = x ET id > z), avec une
+        # borne sur le premier champ pour parcourir l'index sur une plage
+        after, equal = Q(), Q()
+        for field, value, is_descending in zip(fields, values, descending):
+            lookup = "lt" if is_descending else "gt"
+            after |= equal & Q(**{f"{field}__{lookup}": value})
+            equal &= Q(**{field: value})
+        bound = "lte" if descending[0] else "gte"
+        return queryset.filter(after, **{f"{fields[0]}__{bound}": values[0]})
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(
+            pagination.Cursor(offset=0, reverse=False, position=self.next_position)
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(
+            pagination.Cursor(offset=0, reverse=True, position=self.previous_position)
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            tokens = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            position = tokens["p"]
+            if not isinstance(position, list):
+                raise ValueError
+            reverse = bool(tokens.get("r", False))
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        return pagination.Cursor(offset=0, reverse=reverse, position=position)
+
+    def encode_cursor(self, cursor):
+        tokens = {"p": cursor.position}
+        if cursor.reverse:
+            tokens["r"] = 1
+        encoded = urlsafe_b64encode(
+            json.dumps(tokens, default=encode_position_value).encode()
+        ).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _get_position_from_instance(self, instance, ordering):
+        fields = [field.lstrip("-") for field in ordering]
+        if isinstance(instance, dict):
+            return [instance[field] for field in fields]
+        return [getattr(instance, field) for field in fields]
+
+
+def encode_position_value(value):
+    """
+    Sérialise en JSON une valeur de position du curseur, sans perte de
+    précision (les dates gardent leurs microsecondes).
+    """
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class OptInCursorPagination(pagination.BasePagination):
+    """
+    Pagination par numéro de page par défaut, ou par curseur (keyset) si le
+    client le demande avec `?pagination=cursor` (ou en suivant un lien
+    contenant `cursor=`).
+
+    La pagination par curseur évite les OFFSET et le COUNT(*) de chaque page :
+    une page profonde coûte autant que la première, à condition que l'ordre
+    `cursor_ordering` de la vue soit couvert par un index composite.
+    Les vues sans `cursor_ordering` restent paginées par numéro de page.
+    """
+
+    mode_query_param = "pagination"
+    cursor_mode = "cursor"
+
+    def __init__(self):
+        self.delegate = pagination.PageNumberPagination()
+
+    def get_delegate(self, request, view):
+        wants_cursor = (
+            request.query_params.get(self.mode_query_param) == self.cursor_mode
+            or KeysetCursorPagination.cursor_query_param in request.query_params
+        )
+        if wants_cursor and getattr(view, "cursor_ordering", None):
+            return KeysetCursorPagination()
+        return pagination.PageNumberPagination()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.delegate = self.get_delegate(request, view)
+        page = self.delegate.paginate_queryset(queryset, request, view)
+        self.display_page_controls = self.delegate.display_page_controls
+        return page
+
+    def get_paginated_response(self, data):
+        return self.delegate.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.delegate.get_paginated_response_schema(schema)
+
+    def to_html(self):
+        return self.delegate.to_html()
+
+    def get_results(self, data):
+        return self.delegate.get_results(data)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = self.delegate.get_schema_operation_parameters(view)
+        if getattr(view, "cursor_ordering", None):
+            parameters += [
+                {
+                    "name": self.mode_query_param,
+                    "required": False,
+                    "in": "query",
+                    "description": "Utiliser « cursor » pour une pagination par curseur.",
+                    "schema": {"type": "string", "enum": [self.cursor_mode]},
+                },
+                *KeysetCursorPagination().get_schema_operation_parameters(view),
+            ]
+        return parameters
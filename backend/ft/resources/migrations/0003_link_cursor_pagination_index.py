@@ -0,0 +1,16 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("resources", "0002_init_datas"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="link",
+            index=models.Index(fields=["name", "id"], name="link_name_id_idx"),
+        ),
+    ]
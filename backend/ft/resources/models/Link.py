@@ -42,6 +42,10 @@ class Link(models.Model):
         verbose_name = "Link"
         verbose_name_plural = "Links"
         ordering = ["name"]
+        indexes = [
+            # Ordre de la pagination par curseur
+            models.Index(fields=["name", "id"], name="link_name_id_idx"),
+        ]
 
     def __str__(self):
         return "{} ({})".format(self.name, self.url)
@@ -2,12 +2,15 @@ from rest_framework import viewsets
 from ft.resources.models import Link
 from ft.resources.serializers import LinkSerializer
 from ft.event.permissions import IsStaffOrReadOnly
+from ft.views.ConditionalListMixin import ConditionalListMixin
 
 
-class LinkViewSet(viewsets.ModelViewSet):
+class LinkViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     queryset = Link.objects.all()
     serializer_class = LinkSerializer
     permission_classes = [IsStaffOrReadOnly]
+    # Ordre de la pagination par curseur (?pagination=cursor)
+    cursor_ordering = ("name", "id")
 
     def get_queryset(self):
         return Link.objects.filter(is_active=True)
@@ -0,0 +1,58 @@
+import operator
+from functools import reduce
+
+from django.db.models import Func, Q, TextField, Value
+from django.db.models.functions import Lower
+from rest_framework import filters
+
+
+class ImmutableUnaccent(Func):
+    """
+    unaccent() de PostgreSQL, enveloppée dans la fonction IMMUTABLE
+    ft_unaccent (créée par la migration event 0020) pour pouvoir être
+    utilisée dans un index.
+    """
+
+    function = "ft_unaccent"
+    output_field = TextField()
+
+
+def normalized(expression):
+    """
+    Normalise une expression (ou un nom de champ) pour la recherche : sans
+    accents et en minuscules.
+    """
+    return Lower(ImmutableUnaccent(expression))
+
+
+class NormalizedSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter sans accents ni casse : chaque terme de ?search= est cherché
+    dans les champs de search_fields normalisés ("compiegne" trouve
+    "Compiègne"). Le LIKE '%terme%' sur l'expression normalisée est servi par
+    les index GIN gin_trgm_ops de ces champs, là où l'icontains de
+    SearchFilter parcourt toute la table.
+
+    Seuls des noms de champs simples (sans préfixe ^, =, @, $) sont acceptés.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+
+        aliases = [f"{field}_normalized" for field in search_fields]
+        queryset = queryset.alias(
+            **{alias: normalized(field) for alias, field in zip(aliases, search_fields)}
+        )
+        # Chaque terme doit apparaître dans au moins un des champs
+        for term in search_terms:
+            pattern = normalized(Value(term))
+            queryset = queryset.filter(
+                reduce(
+                    operator.or_,
+                    (Q(**{f"{alias}__contains": pattern}) for alias in aliases),
+                )
+            )
+        return queryset
@@ -0,0 +1,89 @@
+from datetime import timedelta
+from itertools import count
+
+from django.utils import timezone
+
+from ft.event.models import (
+    CarpoolPayment,
+    CarpoolRequest,
+    CarpoolTrip,
+    Event,
+    EventHosting,
+    EventHostingRequest,
+    EventSubscription,
+)
+from ft.resources.models import Link
+from ft.user.models import Membership, User
+
+_sequence = count(1)
+
+
+def make_user(**kwargs):
+    """
+    Crée un utilisateur sans mot de passe (le hachage ralentirait les tests).
+    """
+    n = next(_sequence)
+    kwargs.setdefault("email", f"user{n}@tocarde.fr")
+    kwargs.setdefault("username", kwargs["email"])
+    kwargs.setdefault("first_name", f"Prénom{n}")
+    kwargs.setdefault("last_name", f"Nom{n}")
+    kwargs.setdefault("is_staff", False)
+    return User.objects.create(**kwargs)
+
+
+def make_event(**kwargs):
+    n = next(_sequence)
+    start = timezone.now() + timedelta(days=n)
+    kwargs.setdefault("name", f"Événement {n}")
+    kwargs.setdefault("location", "Compiègne")
+    kwargs.setdefault("start_date", start)
+    kwargs.setdefault("end_date", start + timedelta(hours=6))
+    kwargs.setdefault("type", "CONGRESS")
+    return Event.objects.create(**kwargs)
+
+
+def make_trip(driver, event, **kwargs):
+    kwargs.setdefault("departure_city", "Compiègne")
+    kwargs.setdefault("arrival_city", "Amiens")
+    kwargs.setdefault("departure_datetime", event.start_date - timedelta(hours=2))
+    kwargs.setdefault("seats_total", 4)
+    kwargs.setdefault("price_per_seat", 5)
+    return CarpoolTrip.objects.create(driver=driver, event=event, **kwargs)
+
+
+def seed_dataset(viewer, size):
+    """
+    Crée `size` lots de données dans lesquels `viewer` participe à tout :
+    inscrit aux événements, hôte et demandeur d'hébergement, conducteur et
+    passager de covoiturages. Chaque lot ajoute au moins une ligne visible par
+    `viewer` dans chaque liste de l'API.
+    """
+    for _ in range(size):
+        other = make_user()
+        event = make_event()
+        for user in (viewer, other):
+            EventSubscription.objects.create(event=event, user=user, answer="YES")
+
+        own_hosting = EventHosting.objects.create(
+            event=event, host=viewer, available_beds=3
+        )
+        other_hosting = EventHosting.objects.create(
+            event=event, host=other, available_beds=3
+        )
+        EventHostingRequest.objects.create(hosting=own_hosting, requester=other)
+        EventHostingRequest.objects.create(hosting=other_hosting, requester=viewer)
+
+        own_trip = make_trip(viewer, event)
+        other_trip = make_trip(other, event)
+        for trip, passenger in ((own_trip, other), (other_trip, viewer)):
+            carpool_request = CarpoolRequest.objects.create(
+                trip=trip, passenger=passenger, status="ACCEPTED"
+            )
+            CarpoolPayment.objects.create(request=carpool_request, amount=5)
+
+        Membership.objects.create(
+            user=other,
+            start_date=event.start_date,
+            end_date=event.start_date + timedelta(days=365),
+        )
+        Link.objects.create(name=f"Lien {event.pk}", url="https://tocarde.fr")
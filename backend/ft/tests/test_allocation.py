@@ -0,0 +1,197 @@
+from io import StringIO
+
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+
+from ft.event.models import (
+    CarpoolRequest,
+    CarpoolTrip,
+    EventHosting,
+    EventHostingRequest,
+)
+from ft.tests.factories import make_event, make_trip, make_user
+
+
+class AssignCarpoolSeatsTestCase(APITestCase):
+    """
+    Attribution automatique des places de covoiturage d'un événement aux
+    demandes en attente.
+    """
+
+    def setUp(self):
+        self.staff = make_user(is_staff=True)
+        self.event = make_event()
+        driver = make_user()
+        self.small = make_trip(driver, self.event, seats_total=2)
+        self.large = make_trip(make_user(), self.event, seats_total=3)
+        self.passengers = [make_user() for _ in range(5)]
+
+    def request(self, trip, passenger, seats=1, status="PENDING"):
+        return CarpoolRequest.objects.create(
+            trip=trip, passenger=passenger, seats_requested=seats, status=status
+        )
+
+    def assign(self, user=None, **params):
+        self.client.force_authenticate(user or self.staff)
+        return self.client.post(
+            f"/api/event/events/{self.event.pk}/assign-carpool-seats/"
+            + ("?dry_run=true" if params.get("dry_run") else "")
+        )
+
+    def statuses(self, *requests):
+        return [
+            CarpoolRequest.objects.get(pk=request.pk).status for request in requests
+        ]
+
+    def test_respects_order_and_capacity(self):
+        a, b, c, d, e = self.passengers
+        first = self.request(self.small, a)
+        too_large = self.request(self.small, b, seats=2)
+        fits = self.request(self.small, c)
+        already_accepted = self.request(self.large, d, seats=2, status="ACCEPTED")
+        last = self.request(self.large, e, seats=2)
+
+        response = self.assign()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["accepted"], [first.pk, fits.pk])
+        self.assertEqual(response.data["pending"], [too_large.pk, last.pk])
+        self.assertEqual(
+            self.statuses(first, too_large, fits, already_accepted, last),
+            ["ACCEPTED", "PENDING", "ACCEPTED", "ACCEPTED", "PENDING"],
+        )
+        self.assertEqual(
+            list(
+                CarpoolTrip.objects.filter(event=self.event)
+                .order_by("pk")
+                .values_list("seats_taken", flat=True)
+            ),
+            [2, 2],
+        )
+
+    def test_requests_of_a_passenger_are_independent(self):
+        # Un passager peut demander l'aller et le retour : ses autres demandes
+        # ne sont ni annulées ni bloquées par une place déjà obtenue
+        a, b = self.passengers[:2]
+        outbound = self.request(self.small, a)
+        back = self.request(self.large, a)
+        already_seated = self.request(self.large, b, status="ACCEPTED")
+        other = self.request(self.small, b)
+
+        response = self.assign()
+
+        self.assertEqual(response.data["accepted"], [outbound.pk, back.pk, other.pk])
+        self.assertEqual(response.data["pending"], [])
+        self.assertNotIn("cancelled", response.data)
+        self.assertEqual(
+            self.statuses(outbound, back, already_seated, other),
+            ["ACCEPTED", "ACCEPTED", "ACCEPTED", "ACCEPTED"],
+        )
+
+    def test_dry_run_and_command_leave_requests_untouched(self):
+        pending = self.request(self.small, self.passengers[0])
+
+        response = self.assign(dry_run=True)
+        self.assertEqual(response.data["accepted"], [pending.pk])
+        call_command(
+            "assign_carpool_seats", self.event.pk, "--dry-run", stdout=StringIO()
+        )
+        self.assertEqual(self.statuses(pending), ["PENDING"])
+
+        call_command("assign_carpool_seats", self.event.pk, stdout=StringIO())
+        self.assertEqual(self.statuses(pending), ["ACCEPTED"])
+
+    def test_requires_staff(self):
+        self.assertEqual(self.assign(user=self.passengers[0]).status_code, 403)
+
+
+class AssignHostingBedsTestCase(APITestCase):
+    """
+    Attribution automatique des lits d'hébergement d'un événement aux
+    demandes en attente.
+    """
+
+    def setUp(self):
+        self.staff = make_user(is_staff=True)
+        self.event = make_event()
+        self.first = EventHosting.objects.create(
+            event=self.event, host=make_user(), available_beds=2
+        )
+        self.second = EventHosting.objects.create(
+            event=self.event, host=make_user(), available_beds=1
+        )
+        self.closed = EventHosting.objects.create(
+            event=self.event, host=make_user(), available_beds=3, is_active=False
+        )
+
+    def request(self, hosting, requester=None, status="PENDING"):
+        return EventHostingRequest.objects.create(
+            hosting=hosting, requester=requester or make_user(), status=status
+        )
+
+    def assign(self, user=None, **params):
+        self.client.force_authenticate(user or self.staff)
+        return self.client.post(
+            f"/api/event/events/{self.event.pk}/assign-hosting-beds/"
+            + ("?dry_run=true" if params.get("dry_run") else "")
+        )
+
+    def placements(self, *requests):
+        return [
+            EventHostingRequest.objects.values_list("hosting", "status").get(
+                pk=request.pk
+            )
+            for request in requests
+        ]
+
+    def test_respects_order_and_capacity(self):
+        self.request(self.first, status="ACCEPTED")
+        first = self.request(self.first)
+        full = self.request(self.first)
+        second = self.request(self.second)
+        inactive = self.request(self.closed)
+
+        response = self.assign()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["accepted"], [first.pk, second.pk])
+        self.assertEqual(response.data["pending"], [full.pk, inactive.pk])
+        self.assertEqual(
+            self.placements(first, full, second, inactive),
+            [
+                (self.first.pk, "ACCEPTED"),
+                (self.first.pk, "PENDING"),
+                (self.second.pk, "ACCEPTED"),
+                (self.closed.pk, "PENDING"),
+            ],
+        )
+
+    def test_requests_stay_on_requested_hosting(self):
+        # L'hôte du second hébergement a un lit libre, mais n'a pas reçu la
+        # demande : elle n'y est pas reportée
+        self.request(self.first, status="ACCEPTED")
+        self.request(self.first, status="ACCEPTED")
+        waiting = self.request(self.first)
+
+        response = self.assign()
+
+        self.assertEqual(response.data["accepted"], [])
+        self.assertEqual(response.data["pending"], [waiting.pk])
+        self.assertNotIn("reassigned", response.data)
+        self.assertEqual(self.placements(waiting), [(self.first.pk, "PENDING")])
+
+    def test_dry_run_and_command_leave_requests_untouched(self):
+        pending = self.request(self.second)
+
+        response = self.assign(dry_run=True)
+        self.assertEqual(response.data["accepted"], [pending.pk])
+        call_command(
+            "assign_hosting_beds", self.event.pk, "--dry-run", stdout=StringIO()
+        )
+        self.assertEqual(self.placements(pending), [(self.second.pk, "PENDING")])
+
+        call_command("assign_hosting_beds", self.event.pk, stdout=StringIO())
+        self.assertEqual(self.placements(pending), [(self.second.pk, "ACCEPTED")])
+
+    def test_requires_staff(self):
+        self.assertEqual(self.assign(user=make_user()).status_code, 403)
@@ -0,0 +1,436 @@
+from decimal import Decimal
+from threading import Barrier, Thread
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient, APITestCase
+
+from ft.event.models import CarpoolPayment, CarpoolRequest, CarpoolTrip, Event
+from ft.tests.factories import make_event, make_trip, make_user
+
+
+class CarpoolRequestPaymentTotalsTestCase(APITestCase):
+    """
+    Les montants payés des demandes correspondent aux paiements, sans être
+    multipliés par les autres jointures.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.driver = make_user()
+        trip = make_trip(cls.driver, make_event(), price_per_seat=5)
+        cls.paid = CarpoolRequest.objects.create(
+            trip=trip, passenger=make_user(), seats_requested=2, status="ACCEPTED"
+        )
+        cls.unpaid = CarpoolRequest.objects.create(
+            trip=trip, passenger=make_user(), status="ACCEPTED"
+        )
+        for amount, is_completed in ((4, False), (6, True)):
+            CarpoolPayment.objects.create(
+                request=cls.paid, amount=amount, is_completed=is_completed
+            )
+
+    def test_totals_match_payments(self):
+        requests = CarpoolRequest.objects.with_payment_totals().in_bulk()
+        for pk in (self.paid.pk, self.unpaid.pk):
+            fresh = CarpoolRequest.objects.get(pk=pk)
+            self.assertEqual(requests[pk].total_paid, fresh.total_paid)
+            self.assertEqual(requests[pk].is_paid, fresh.is_paid)
+        self.assertEqual(requests[self.paid.pk].amount_paid, Decimal("10.00"))
+        self.assertFalse(requests[self.unpaid.pk].has_completed_payment)
+
+    def test_list_exposes_totals_and_trip_seats(self):
+        self.client.force_authenticate(self.driver)
+        response = self.client.get("/api/event/carpool-requests/")
+        results = {item["id"]: item for item in response.data["results"]}
+        self.assertEqual(Decimal(results[self.paid.pk]["total_paid"]), 10)
+        self.assertTrue(results[self.paid.pk]["is_paid"])
+        self.assertEqual(results[self.unpaid.pk]["trip"]["seats_available"], 1)
+
+
+class CarpoolRequestPaymentActionTestCase(APITestCase):
+    """
+    Enregistrement d'un paiement par le conducteur (action payment), reporté
+    dans le montant payé dénormalisé de la demande.
+    """
+
+    def setUp(self):
+        self.driver = make_user()
+        trip = make_trip(self.driver, make_event(), price_per_seat=5)
+        self.carpool_request = CarpoolRequest.objects.create(
+            trip=trip, passenger=make_user(), seats_requested=2, status="ACCEPTED"
+        )
+        self.client.force_authenticate(self.driver)
+
+    def pay(self, **data):
+        return self.client.post(
+            f"/api/event/carpool-requests/{self.carpool_request.pk}/payment/",
+            data,
+            format="json",
+        )
+
+    def test_completes_partial_payment(self):
+        response = self.pay(amount="4.00", payment_method="MOBILE")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["total_paid"], "4.00")
+        self.assertFalse(response.data["is_paid"])
+
+        response = self.pay(amount="6.00")
+        self.assertEqual(response.data["total_paid"], "10.00")
+        self.assertTrue(response.data["is_paid"])
+        (payment,) = CarpoolPayment.objects.filter(request=self.carpool_request)
+        self.assertEqual(
+            (payment.amount, payment.is_completed, payment.payment_method),
+            (Decimal("10.00"), True, "MOBILE"),
+        )
+
+        # Un nouveau paiement une fois le précédent complet
+        response = self.pay(amount="1.00", is_completed=False)
+        self.assertEqual(response.data["total_paid"], "11.00")
+        self.assertEqual(self.carpool_request.payments.count(), 2)
+
+    def test_amount_paid_follows_payment_changes(self):
+        payment = CarpoolPayment.objects.create(request=self.carpool_request, amount=3)
+        payment.amount = Decimal("7.50")
+        payment.save()
+        CarpoolPayment.objects.create(request=self.carpool_request, amount=2)
+        self.carpool_request.refresh_from_db()
+        self.assertEqual(self.carpool_request.amount_paid, Decimal("9.50"))
+
+        payment.delete()
+        CarpoolRequest.objects.filter(pk=self.carpool_request.pk).update(amount_paid=0)
+        CarpoolRequest.objects.recompute_amount_paid()
+        self.carpool_request.refresh_from_db()
+        self.assertEqual(self.carpool_request.amount_paid, Decimal("2.00"))
+
+    def test_only_driver_on_accepted_request(self):
+        self.client.force_authenticate(self.carpool_request.passenger)
+        self.assertEqual(self.pay(amount="5.00").status_code, 400)
+
+        self.client.force_authenticate(self.driver)
+        CarpoolRequest.objects.filter(pk=self.carpool_request.pk).update(
+            status="PENDING"
+        )
+        self.assertEqual(self.pay(amount="5.00").status_code, 400)
+        self.assertEqual(self.pay(amount="0").status_code, 400)
+        self.assertFalse(CarpoolPayment.objects.exists())
+
+
+class CarpoolLedgerTestCase(APITestCase):
+    """
+    Registre des paiements de covoiturage d'un événement, agrégé en une
+    requête et mis en cache jusqu'au prochain paiement.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = make_user(is_staff=True)
+        cls.event = make_event()
+        cls.driver = make_user()
+        cls.trip = make_trip(cls.driver, cls.event, price_per_seat=5)
+        cls.other_trip = make_trip(make_user(), cls.event, price_per_seat=8)
+        cls.paid = CarpoolRequest.objects.create(
+            trip=cls.trip, passenger=make_user(), seats_requested=2, status="ACCEPTED"
+        )
+        cls.unpaid = CarpoolRequest.objects.create(
+            trip=cls.trip, passenger=make_user(), status="ACCEPTED"
+        )
+        CarpoolRequest.objects.create(trip=cls.other_trip, passenger=make_user())
+        CarpoolRequest.objects.create(
+            trip=cls.other_trip, passenger=make_user(), status="ACCEPTED"
+        )
+        for amount, is_completed in ((4, False), (6, True)):
+            CarpoolPayment.objects.create(
+                request=cls.paid, amount=amount, is_completed=is_completed
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.staff)
+
+    def ledger(self, **params):
+        return self.client.get(
+            f"/api/event/events/{self.event.pk}/carpool-ledger/", params
+        )
+
+    def test_groups_by_trip(self):
+        rows = {row["trip"]: row for row in self.ledger().data}
+        self.assertEqual(
+            rows[self.trip.pk],
+            {
+                "event": self.event.pk,
+                "driver": self.driver.pk,
+                "trip": self.trip.pk,
+                "passengers": 2,
+                "unpaid_passengers": 1,
+                "expected_amount": "15.00",
+                "paid_amount": "10.00",
+                "outstanding_amount": "5.00",
+            },
+        )
+        self.assertEqual(rows[self.other_trip.pk]["outstanding_amount"], "8.00")
+
+    def test_groups_by_driver_and_event(self):
+        self.assertEqual(len(self.ledger(group_by="driver").data), 2)
+        (row,) = self.ledger(group_by="event").data
+        self.assertNotIn("trip", row)
+        self.assertEqual(row["expected_amount"], "23.00")
+        self.assertEqual(row["unpaid_passengers"], 2)
+        self.assertEqual(self.ledger(group_by="passenger").status_code, 400)
+
+    def test_cached_until_next_payment(self):
+        self.ledger()
+        with self.assertNumQueries(1):
+            # Seul l'événement est lu
+            self.ledger()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CarpoolPayment.objects.create(
+                request=self.unpaid, amount=5, is_completed=True
+            )
+        (row,) = self.ledger(group_by="event").data
+        self.assertEqual(row["unpaid_passengers"], 1)
+        self.assertEqual(self.ledger().data[0]["paid_amount"], "15.00")
+
+    def version(self, event):
+        return Event.objects.get(pk=event.pk).carpool_ledger_version
+
+    def test_version_is_bumped_after_commit(self):
+        # La version est en base (partagée par tous les processus) et n'est
+        # incrémentée qu'après la validation, sans charger le trajet ni la
+        # demande de l'instance
+        version = self.version(self.event)
+        carpool_request = CarpoolRequest.objects.get(pk=self.unpaid.pk)
+        payment = CarpoolPayment(request_id=self.unpaid.pk, amount=1)
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks() as callbacks:
+                carpool_request.save(update_fields=["message"])
+                payment.save()
+        self.assertFalse(
+            [
+                query["sql"]
+                for query in queries
+                if "event_carpooltrip" in query["sql"]
+                or query["sql"].startswith('UPDATE "event_event"')
+            ]
+        )
+        self.assertEqual(self.version(self.event), version)
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.version(self.event), version + 2)
+
+    def test_trip_move_bumps_both_events(self):
+        other_event = make_event()
+        versions = self.version(self.event), self.version(other_event)
+        trip = CarpoolTrip.objects.get(pk=self.other_trip.pk)
+        trip.event = other_event
+        with self.captureOnCommitCallbacks(execute=True):
+            trip.save()
+        self.assertEqual(
+            (self.version(self.event), self.version(other_event)),
+            (versions[0] + 1, versions[1] + 1),
+        )
+
+    def test_requires_staff(self):
+        self.client.force_authenticate(self.driver)
+        self.assertEqual(self.ledger().status_code, 403)
+
+
+class CarpoolPaymentBulkTestCase(APITestCase):
+    """
+    Enregistrement groupé des paiements d'un trajet par son conducteur.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.driver = make_user()
+        cls.trip = make_trip(cls.driver, make_event())
+        cls.accepted = [
+            CarpoolRequest.objects.create(
+                trip=cls.trip, passenger=make_user(), status="ACCEPTED"
+            )
+            for _ in range(3)
+        ]
+        cls.pending = CarpoolRequest.objects.create(
+            trip=cls.trip, passenger=make_user()
+        )
+        cls.elsewhere = CarpoolRequest.objects.create(
+            trip=make_trip(cls.driver, make_event()),
+            passenger=make_user(),
+            status="ACCEPTED",
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.driver)
+
+    def post(self, payments, trip=None):
+        return self.client.post(
+            "/api/event/carpool-payments/bulk/",
+            {"trip_id": (trip or self.trip).pk, "payments": payments},
+            format="json",
+        )
+
+    def test_reports_each_payment(self):
+        response = self.post(
+            [
+                {"request_id": self.accepted[0].pk, "amount": "5.00"},
+                {"request_id": self.pending.pk, "amount": "5.00"},
+                {"request_id": self.elsewhere.pk, "amount": "5.00"},
+                {"request_id": self.accepted[1].pk},
+                {
+                    "request_id": self.accepted[1].pk,
+                    "amount": "2.50",
+                    "is_completed": True,
+                    "payment_method": "MOBILE",
+                },
+            ]
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 2)
+        results = response.data["results"]
+        self.assertEqual([result["index"] for result in results], [0, 1, 2, 3, 4])
+        self.assertEqual(
+            [sorted(result.get("errors", {})) for result in results],
+            [[], ["request_id"], ["request_id"], ["amount"], []],
+        )
+        self.assertEqual(results[4]["payment"]["request"], self.accepted[1].pk)
+        self.assertEqual(
+            CarpoolPayment.objects.filter(request__trip=self.trip).count(), 2
+        )
+        self.assertEqual(
+            list(
+                CarpoolRequest.objects.filter(
+                    pk__in=[carpool_request.pk for carpool_request in self.accepted]
+                )
+                .order_by("pk")
+                .values_list("amount_paid", flat=True)
+            ),
+            [Decimal("5.00"), Decimal("2.50"), Decimal("0.00")],
+        )
+
+    def test_query_count_does_not_depend_on_payments(self):
+        def count(size):
+            payments = [
+                {"request_id": self.accepted[i % 3].pk, "amount": "1.00"}
+                for i in range(size)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.post(payments).status_code, 201)
+            return len(queries)
+
+        self.assertEqual(count(2), count(20))
+
+    def test_accepted_requests_are_locked(self):
+        # Les demandes acceptées sont lues sous verrou, dans la transaction
+        # de l'insertion : une annulation concurrente attend les paiements
+        with CaptureQueriesContext(connection) as queries:
+            self.post([{"request_id": self.accepted[0].pk, "amount": "1.00"}])
+        locks = [
+            query["sql"]
+            for query in queries
+            if query["sql"].endswith("FOR UPDATE")
+            and '"event_carpoolrequest"."status" = \'ACCEPTED\'' in query["sql"]
+        ]
+        self.assertEqual(len(locks), 1)
+
+    def test_only_driver_and_valid_payments(self):
+        self.client.force_authenticate(self.accepted[0].passenger)
+        payments = [{"request_id": self.accepted[0].pk, "amount": "5.00"}]
+        self.assertEqual(self.post(payments).status_code, 400)
+
+        self.client.force_authenticate(self.driver)
+        response = self.post([{"request_id": self.pending.pk, "amount": "5.00"}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["created"], 0)
+        self.assertFalse(CarpoolPayment.objects.exists())
+
+
+class CarpoolRequestAcceptConcurrencyTestCase(TransactionTestCase):
+    """
+    Des acceptations simultanées sur un même trajet ne dépassent jamais le
+    nombre de places.
+    """
+
+    def test_concurrent_accepts_do_not_overbook(self):
+        driver = make_user()
+        trip = make_trip(driver, make_event(), seats_total=3)
+        requests = [
+            CarpoolRequest.objects.create(
+                trip=trip, passenger=make_user(), seats_requested=2
+            )
+            for _ in range(4)
+        ]
+        barrier = Barrier(len(requests))
+        statuses = []
+
+        def accept(carpool_request):
+            client = APIClient()
+            client.force_authenticate(driver)
+            barrier.wait()
+            try:
+                response = client.post(
+                    f"/api/event/carpool-requests/{carpool_request.pk}/request_action/",
+                    {"action": "accept"},
+                    format="json",
+                )
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [Thread(target=accept, args=(r,)) for r in requests]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(statuses), [200, 400, 400, 400])
+        trip.refresh_from_db()
+        self.assertEqual(trip.seats_available, 1)
+
+
+class CarpoolRequestPaymentConcurrencyTestCase(TransactionTestCase):
+    """
+    Des paiements simultanés d'une même demande sont complétés sur le montant
+    payé à jour.
+    """
+
+    def test_concurrent_payments_complete_once(self):
+        driver = make_user()
+        trip = make_trip(driver, make_event(), price_per_seat=10)
+        carpool_request = CarpoolRequest.objects.create(
+            trip=trip, passenger=make_user(), status="ACCEPTED"
+        )
+        barrier = Barrier(2)
+        statuses = []
+
+        def pay():
+            client = APIClient()
+            client.force_authenticate(driver)
+            barrier.wait()
+            try:
+                response = client.post(
+                    f"/api/event/carpool-requests/{carpool_request.pk}/payment/",
+                    {"amount": "5.00"},
+                    format="json",
+                )
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [Thread(target=pay) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(statuses, [200, 200])
+        carpool_request.refresh_from_db()
+        self.assertEqual(carpool_request.amount_paid, Decimal("10.00"))
+        self.assertEqual(
+            list(carpool_request.payments.values_list("amount", "is_completed")),
+            [(Decimal("10.00"), True)],
+        )
@@ -0,0 +1,256 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from ft.event.models import CarpoolRequest, CarpoolTrip
+from ft.tests.factories import make_event, make_trip, make_user
+
+
+class CarpoolTripSeatsTestCase(APITestCase):
+    """
+    Places disponibles des trajets : ce sont les places demandées par les
+    demandes acceptées qui sont décomptées, pas le nombre de demandes.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.driver = make_user()
+        event = make_event()
+        cls.full_trip = make_trip(cls.driver, event, seats_total=3)
+        cls.open_trip = make_trip(cls.driver, event, seats_total=3)
+        for seats, status in ((2, "ACCEPTED"), (1, "ACCEPTED"), (2, "PENDING")):
+            CarpoolRequest.objects.create(
+                trip=cls.full_trip,
+                passenger=make_user(),
+                seats_requested=seats,
+                status=status,
+            )
+        CarpoolRequest.objects.create(
+            trip=cls.open_trip,
+            passenger=make_user(),
+            seats_requested=2,
+            status="ACCEPTED",
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.driver)
+
+    def test_properties_sum_accepted_seats(self):
+        full_trip, open_trip = (
+            CarpoolTrip.objects.get(pk=trip.pk)
+            for trip in (self.full_trip, self.open_trip)
+        )
+        self.assertEqual(full_trip.seats_available, 0)
+        self.assertTrue(full_trip.is_full)
+        self.assertEqual(open_trip.seats_available, 1)
+        self.assertFalse(open_trip.is_full)
+
+    def test_annotation_matches_column(self):
+        trips = CarpoolTrip.objects.with_accepted_seats().in_bulk()
+        self.assertEqual(trips[self.full_trip.pk].accepted_seats, 3)
+        self.assertEqual(trips[self.open_trip.pk].seats_available, 1)
+
+    def test_has_seats_filter(self):
+        response = self.client.get("/api/event/carpool-trips/?has_seats=true")
+        self.assertEqual(
+            [trip["id"] for trip in response.data["results"]], [self.open_trip.pk]
+        )
+        self.assertEqual(response.data["results"][0]["seats_available"], 1)
+
+    def test_order_by_free_seats(self):
+        response = self.client.get("/api/event/carpool-trips/?ordering=-free_seats")
+        self.assertEqual(
+            [trip["id"] for trip in response.data["results"]],
+            [self.open_trip.pk, self.full_trip.pk],
+        )
+
+
+class CarpoolTripSeatsTakenTestCase(TestCase):
+    """
+    La colonne seats_taken suit chaque entrée et sortie de l'état ACCEPTED.
+    """
+
+    def setUp(self):
+        self.trip = make_trip(make_user(), make_event(), seats_total=4)
+        self.request = CarpoolRequest.objects.create(
+            trip=self.trip, passenger=make_user(), seats_requested=2
+        )
+
+    def assertSeatsTaken(self, expected):
+        self.trip.refresh_from_db()
+        self.assertEqual(self.trip.seats_taken, expected)
+
+    def test_transitions(self):
+        self.assertSeatsTaken(0)
+        self.request.status = "ACCEPTED"
+        self.request.save()
+        self.assertSeatsTaken(2)
+        self.request.seats_requested = 3
+        self.request.save()
+        self.assertSeatsTaken(3)
+        self.request.status = "CANCELLED"
+        self.request.save()
+        self.assertSeatsTaken(0)
+
+    def test_delete_releases_seats(self):
+        self.request.status = "ACCEPTED"
+        self.request.save()
+        CarpoolRequest.objects.filter(pk=self.request.pk).delete()
+        self.assertSeatsTaken(0)
+
+    def test_stale_trip_save_keeps_seats(self):
+        stale = CarpoolTrip.objects.get(pk=self.trip.pk)
+        self.request.status = "ACCEPTED"
+        self.request.save()
+        stale.additional_info = "Départ devant la gare"
+        stale.save()
+        self.assertSeatsTaken(2)
+
+    def test_drifted_counter_does_not_block_release(self):
+        # Compteur désynchronisé (ex: demande acceptée avant le recalcul)
+        self.request.status = "ACCEPTED"
+        self.request.save()
+        CarpoolTrip.objects.filter(pk=self.trip.pk).update(seats_taken=1)
+        self.request.status = "CANCELLED"
+        self.request.save()
+        self.assertSeatsTaken(0)
+
+        other = CarpoolRequest.objects.create(
+            trip=self.trip, passenger=make_user(), status="ACCEPTED"
+        )
+        CarpoolTrip.objects.filter(pk=self.trip.pk).update(seats_taken=0)
+        other.delete()
+        self.assertSeatsTaken(0)
+
+    def test_recompute_command_fixes_drift(self):
+        CarpoolTrip.objects.filter(pk=self.trip.pk).update(seats_taken=3)
+        out = StringIO()
+        call_command("recompute_trip_seats", stdout=out)
+        self.assertIn("1 trajet(s) corrigé(s)", out.getvalue())
+        self.assertSeatsTaken(0)
+
+
+class CarpoolTripCitySearchTestCase(APITestCase):
+    """
+    Recherche approximative des villes, sans accents ni casse, classée par
+    similarité.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        event = make_event()
+        cls.compiegne = make_trip(cls.user, event, departure_city="Compiègne")
+        cls.saint_quentin = make_trip(
+            cls.user, event, departure_city="Saint-Quentin", arrival_city="Lille"
+        )
+        cls.beauvais = make_trip(
+            cls.user, event, departure_city="Beauvais", arrival_city="Rouen"
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def search(self, **params):
+        response = self.client.get("/api/event/carpool-trips/", params)
+        return [trip["id"] for trip in response.data["results"]]
+
+    def test_ignores_accents_and_case(self):
+        self.assertEqual(self.search(departure_search="COMPIEGNE"), [self.compiegne.pk])
+
+    def test_tolerates_typos(self):
+        self.assertEqual(
+            self.search(departure_search="saint quentn"), [self.saint_quentin.pk]
+        )
+        self.assertEqual(self.search(arrival_search="amien"), [self.compiegne.pk])
+
+    def test_search_param_matches_cities_and_info(self):
+        # ?search= garde les villes, sans accents ni casse
+        trip = make_trip(
+            self.user,
+            make_event(),
+            departure_city="Noyon",
+            additional_info="Départ de la gare",
+        )
+        self.assertEqual(self.search(search="compiegne"), [self.compiegne.pk])
+        self.assertEqual(self.search(search="LILLE"), [self.saint_quentin.pk])
+        self.assertEqual(self.search(search="GARE"), [trip.pk])
+        # Chaque terme doit apparaître dans au moins un des champs
+        self.assertEqual(self.search(search="beauvais rouen"), [self.beauvais.pk])
+        self.assertEqual(self.search(search="beauvais lille"), [])
+
+    def test_ranks_by_similarity(self):
+        trips = CarpoolTrip.objects.search_cities(departure="saint quentin")
+        self.assertEqual(trips[0], self.saint_quentin)
+        self.assertGreater(trips[0].city_similarity, 0.5)
+
+
+class CarpoolTripNearTestCase(APITestCase):
+    """
+    Recherche des trajets partant à proximité d'une ville, d'après le
+    répertoire des communes embarqué.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user(city="Compiegne")
+        cls.event = make_event()
+        cls.compiegne = make_trip(cls.user, cls.event, departure_city="Compiègne")
+        # Noyon est à une vingtaine de kilomètres de Compiègne
+        cls.noyon = make_trip(
+            cls.user,
+            cls.event,
+            departure_city="Noyon",
+            departure_datetime=cls.event.start_date - timedelta(days=1),
+        )
+        cls.amiens = make_trip(cls.user, cls.event, departure_city="Amiens")
+        cls.unknown = make_trip(cls.user, cls.event, departure_city="Nulle-Part")
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def search(self, **params):
+        response = self.client.get("/api/event/carpool-trips/", params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [trip["id"] for trip in response.data["results"]]
+
+    def test_geocodes_departure_city_on_save(self):
+        self.assertAlmostEqual(self.compiegne.departure_latitude, 49.42, places=2)
+        self.assertAlmostEqual(self.compiegne.departure_longitude, 2.83, places=2)
+        self.assertIsNone(self.unknown.departure_latitude)
+
+        self.unknown.departure_city = "St Quentin"
+        self.unknown.save(update_fields=["departure_city"])
+        self.unknown.refresh_from_db()
+        self.assertAlmostEqual(self.unknown.departure_latitude, 49.85, places=2)
+
+    def test_filters_by_radius_and_orders_by_distance(self):
+        self.assertEqual(
+            self.search(near="compiegne"), [self.compiegne.pk, self.noyon.pk]
+        )
+        self.assertEqual(
+            self.search(near="Compiègne", radius=100),
+            [self.compiegne.pk, self.noyon.pk, self.amiens.pk],
+        )
+        trips = CarpoolTrip.objects.near(49.42, 2.83, 25)
+        self.assertLess(trips[0].departure_distance, 1)
+        self.assertAlmostEqual(trips[1].departure_distance, 22, delta=3)
+
+    def test_combines_with_departure_window(self):
+        self.assertEqual(
+            self.search(
+                near="me",
+                departure_after=(
+                    self.event.start_date - timedelta(hours=3)
+                ).isoformat(),
+            ),
+            [self.compiegne.pk],
+        )
+
+    def test_rejects_unknown_city_and_invalid_radius(self):
+        for params in ({"near": "Nulle-Part"}, {"near": "Noyon", "radius": "loin"}):
+            response = self.client.get("/api/event/carpool-trips/", params)
+            self.assertEqual(response.status_code, 400)
@@ -0,0 +1,29 @@
+from rest_framework.test import APITestCase
+
+from ft.event.models import Event
+from ft.tests.factories import make_event, make_user
+
+
+class ConditionalListTestCase(APITestCase):
+    """
+    Requêtes conditionnelles (ETag) sur les listes.
+    """
+
+    def setUp(self):
+        self.client.force_authenticate(make_user())
+        self.events = [make_event() for _ in range(2)]
+
+    def test_unchanged_list_is_not_modified(self):
+        response = self.client.get("/api/event/events/")
+        self.assertNotIn("Last-Modified", response.headers)
+        response = self.client.get(
+            "/api/event/events/", HTTP_IF_NONE_MATCH=response.headers["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_deleted_row_changes_etag(self):
+        etag = self.client.get("/api/event/events/").headers["ETag"]
+        Event.objects.filter(pk=self.events[0].pk).delete()
+        response = self.client.get("/api/event/events/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 1)
@@ -0,0 +1,274 @@
+from threading import Barrier, Thread
+
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APITestCase
+
+from ft.event.models import EventHosting, EventHostingRequest
+from ft.tests.factories import make_event, make_user
+
+
+class EventHostingAvailabilityTestCase(APITestCase):
+    """
+    Lits disponibles annotés sur les hébergements et exposés par l'API.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        cls.event = make_event()
+        cls.full = EventHosting.objects.create(
+            event=cls.event, host=make_user(), available_beds=1
+        )
+        cls.free = EventHosting.objects.create(
+            event=cls.event, host=make_user(), available_beds=3
+        )
+        for hosting, status in (
+            (cls.full, "ACCEPTED"),
+            (cls.free, "ACCEPTED"),
+            (cls.free, "PENDING"),
+            (cls.free, "REJECTED"),
+        ):
+            EventHostingRequest.objects.create(
+                hosting=hosting, requester=make_user(), status=status
+            )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_annotation_counts_accepted_guests(self):
+        hostings = EventHosting.objects.with_availability().in_bulk()
+        self.assertEqual(hostings[self.full.pk].available_places, 0)
+        self.assertEqual(hostings[self.free.pk].accepted_guests, 1)
+        self.assertEqual(hostings[self.free.pk].available_places, 2)
+
+    def test_for_event_exposes_availability(self):
+        response = self.client.get(
+            "/api/event/event-hostings/for_event/", {"event_id": self.event.pk}
+        )
+        places = {
+            item["id"]: item["available_places"] for item in response.data["results"]
+        }
+        self.assertEqual(places, {self.full.pk: 0, self.free.pk: 2})
+
+    def test_has_beds_filter(self):
+        response = self.client.get(
+            "/api/event/event-hostings/", {"event": self.event.pk, "has_beds": "true"}
+        )
+        self.assertEqual(
+            [item["id"] for item in response.data["results"]], [self.free.pk]
+        )
+        self.assertEqual(response.data["results"][0]["accepted_guests"], 1)
+
+
+class EventHostingRequestUniquenessTestCase(APITestCase):
+    """
+    Une seule demande d'hébergement active par événement et par demandeur,
+    garantie par la base.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        cls.event = make_event()
+        cls.hosting = EventHosting.objects.create(
+            event=cls.event, host=make_user(), available_beds=2
+        )
+        cls.other = EventHosting.objects.create(
+            event=cls.event, host=make_user(), available_beds=2
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def request_hosting(self, hosting):
+        return self.client.post(
+            "/api/event/event-hosting-requests/",
+            {"hosting_id": hosting.pk, "message": "Bonjour"},
+            format="json",
+        )
+
+    def test_create_copies_event(self):
+        response = self.request_hosting(self.hosting)
+        self.assertEqual(response.status_code, 201)
+        hosting_request = EventHostingRequest.objects.get(pk=response.data["id"])
+        self.assertEqual(hosting_request.event_id, self.event.pk)
+
+    def test_second_active_request_is_rejected(self):
+        self.assertEqual(self.request_hosting(self.hosting).status_code, 201)
+        response = self.request_hosting(self.other)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("hosting", response.data)
+        self.assertEqual(
+            EventHostingRequest.objects.filter(requester=self.user).count(), 1
+        )
+
+    def test_request_allowed_after_cancel(self):
+        EventHostingRequest.objects.create(
+            hosting=self.hosting, requester=self.user, status="CANCELLED"
+        )
+        self.assertEqual(self.request_hosting(self.other).status_code, 201)
+
+    def test_own_hosting_is_rejected(self):
+        self.client.force_authenticate(self.hosting.host)
+        response = self.request_hosting(self.hosting)
+        self.assertEqual(response.status_code, 400)
+
+    def test_hosting_event_change_is_copied(self):
+        hosting_request = EventHostingRequest.objects.create(
+            hosting=self.hosting, requester=self.user
+        )
+        self.hosting.event = make_event()
+        self.hosting.save()
+        hosting_request.refresh_from_db()
+        self.assertEqual(hosting_request.event_id, self.hosting.event_id)
+
+    def test_status_change_does_not_load_hosting(self):
+        hosting_request = EventHostingRequest.objects.create(
+            hosting=self.hosting, requester=self.user
+        )
+        hosting_request = EventHostingRequest.objects.get(pk=hosting_request.pk)
+        with CaptureQueriesContext(connection) as queries:
+            hosting_request.accept()
+        self.assertEqual(
+            [query["sql"] for query in queries if "SELECT" in query["sql"]], []
+        )
+
+    def test_hosting_change_copies_event(self):
+        hosting_request = EventHostingRequest.objects.create(
+            hosting=self.hosting, requester=self.user
+        )
+        elsewhere = EventHosting.objects.create(event=make_event(), host=make_user())
+        hosting_request = EventHostingRequest.objects.get(pk=hosting_request.pk)
+        hosting_request.hosting_id = elsewhere.pk
+        hosting_request.save()
+        hosting_request.refresh_from_db()
+        self.assertEqual(hosting_request.event_id, elsewhere.event_id)
+
+    def test_hosting_of_existing_request_cannot_change(self):
+        hosting_request = EventHostingRequest.objects.create(
+            hosting=self.hosting, requester=self.user, status="ACCEPTED"
+        )
+        url = f"/api/event/event-hosting-requests/{hosting_request.pk}/"
+        response = self.client.patch(url, {"hosting_id": self.other.pk}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("hosting_id", response.data)
+        hosting_request.refresh_from_db()
+        self.assertEqual(hosting_request.hosting_id, self.hosting.pk)
+
+        # Sans hosting_id, la demande reste modifiable (PUT compris)
+        response = self.client.put(url, {"message": "Merci"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        hosting_request.refresh_from_db()
+        self.assertEqual(hosting_request.message, "Merci")
+        self.assertEqual(hosting_request.status, "ACCEPTED")
+
+    def test_moving_hosting_onto_active_request_is_rejected(self):
+        EventHostingRequest.objects.create(hosting=self.hosting, requester=self.user)
+        event = make_event()
+        EventHostingRequest.objects.create(
+            hosting=EventHosting.objects.create(event=event, host=make_user()),
+            requester=self.user,
+        )
+        self.client.force_authenticate(self.hosting.host)
+        response = self.client.patch(
+            f"/api/event/event-hostings/{self.hosting.pk}/",
+            {"event": event.pk},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("event", response.data)
+        self.hosting.refresh_from_db()
+        self.assertEqual(self.hosting.event_id, self.event.pk)
+
+
+class EventHostingRequestActionsTestCase(APITestCase):
+    """
+    Listes « mes demandes » et « demandes pour mes hébergements », paginées.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.host = make_user()
+        cls.hosting = EventHosting.objects.create(
+            event=make_event(), host=cls.host, available_beds=2
+        )
+        cls.requesters = [make_user() for _ in range(3)]
+        for requester in cls.requesters:
+            EventHostingRequest.objects.create(hosting=cls.hosting, requester=requester)
+
+    def test_for_my_hostings_is_paginated(self):
+        self.client.force_authenticate(self.host)
+        response = self.client.get("/api/event/event-hosting-requests/for_my_hostings/")
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(len(response.data["results"]), 3)
+
+    def test_accept_without_bed_left_returns_plain_error(self):
+        self.client.force_authenticate(self.host)
+        statuses = []
+        for hosting_request in EventHostingRequest.objects.order_by("pk"):
+            response = self.client.post(
+                f"/api/event/event-hosting-requests/{hosting_request.pk}/accept/"
+            )
+            statuses.append(response.status_code)
+        self.assertEqual(statuses, [200, 200, 400])
+        # Même forme que les autres erreurs de l'action
+        self.assertEqual(
+            response.data, {"error": "Vous n'avez plus de places disponibles."}
+        )
+
+    def test_my_requests_lists_own_requests(self):
+        self.client.force_authenticate(self.requesters[0])
+        response = self.client.get("/api/event/event-hosting-requests/my_requests/")
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(
+            response.data["results"][0]["requester"]["id"], self.requesters[0].pk
+        )
+
+
+class EventHostingAcceptConcurrencyTestCase(TransactionTestCase):
+    """
+    Des acceptations simultanées sur un même hébergement (plusieurs onglets de
+    l'hôte) ne dépassent jamais le nombre de lits.
+    """
+
+    def test_concurrent_accepts_do_not_overbook(self):
+        host = make_user()
+        hosting = EventHosting.objects.create(
+            event=make_event(), host=host, available_beds=2
+        )
+        hosting_requests = [
+            EventHostingRequest.objects.create(hosting=hosting, requester=make_user())
+            for _ in range(5)
+        ]
+        barrier = Barrier(len(hosting_requests))
+        statuses = []
+
+        def accept(hosting_request):
+            client = APIClient()
+            client.force_authenticate(host)
+            barrier.wait()
+            try:
+                response = client.post(
+                    f"/api/event/event-hosting-requests/{hosting_request.pk}/accept/",
+                    {},
+                    format="json",
+                )
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [Thread(target=accept, args=(r,)) for r in hosting_requests]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(statuses), [200, 200, 400, 400, 400])
+        self.assertEqual(
+            EventHostingRequest.objects.filter(
+                hosting=hosting, status="ACCEPTED"
+            ).count(),
+            2,
+        )
@@ -0,0 +1,184 @@
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from ft.tests.factories import make_user
+from ft.user.models import Membership, User
+
+
+class MembershipOverlapTestCase(APITestCase):
+    """
+    Deux adhésions actives d'un même utilisateur ne se chevauchent jamais,
+    garanti par la contrainte d'exclusion.
+    """
+
+    def setUp(self):
+        self.user = make_user()
+        self.start = timezone.now()
+        self.membership = Membership.objects.create(
+            user=self.user,
+            start_date=self.start,
+            end_date=self.start + timedelta(days=364),
+        )
+        self.client.force_authenticate(make_user(is_staff=True))
+
+    def create(self, start, end):
+        return self.client.post(
+            "/api/user/memberships/",
+            {"user": self.user.pk, "start_date": start, "end_date": end},
+            format="json",
+        )
+
+    def test_overlap_is_rejected(self):
+        response = self.create(
+            self.start + timedelta(days=364), self.start + timedelta(days=729)
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Membership.objects.filter(user=self.user).count(), 1)
+
+    def test_following_membership_is_accepted(self):
+        response = self.create(
+            self.start + timedelta(days=365), self.start + timedelta(days=729)
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["user"], self.user.pk)
+
+    def test_inverted_dates_are_rejected(self):
+        response = self.create(self.start + timedelta(days=800), self.start)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("end_date", response.data)
+
+    def test_inactive_memberships_may_overlap(self):
+        Membership.objects.create(
+            user=self.user,
+            start_date=self.start,
+            end_date=self.start + timedelta(days=30),
+            is_active=False,
+        )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Membership.objects.filter(user=self.user).update(is_active=True)
+
+    def test_model_validation_reports_overlap(self):
+        # Validation des formulaires de l'administration
+        overlapping = Membership(
+            user=self.user,
+            start_date=self.start + timedelta(days=100),
+            end_date=self.start + timedelta(days=200),
+        )
+        with self.assertRaises(ValidationError):
+            overlapping.validate_constraints()
+
+
+class MembershipPermissionTestCase(APITestCase):
+    """
+    Seul le staff enregistre des adhésions ; les autres utilisateurs
+    authentifiés peuvent seulement les consulter.
+    """
+
+    def setUp(self):
+        self.start = timezone.now()
+        self.payload = {
+            "start_date": self.start,
+            "end_date": self.start + timedelta(days=364),
+        }
+
+    def test_anonymous_is_rejected(self):
+        response = self.client.post(
+            "/api/user/memberships/", self.payload, format="json"
+        )
+        self.assertIn(response.status_code, (401, 403))
+        response = self.client.get("/api/user/memberships/")
+        self.assertIn(response.status_code, (401, 403))
+        self.assertFalse(Membership.objects.exists())
+
+    def test_member_cannot_register_themselves(self):
+        user = make_user()
+        self.client.force_authenticate(user)
+        response = self.client.post(
+            "/api/user/memberships/", self.payload, format="json"
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Membership.objects.exists())
+        self.assertEqual(self.client.get("/api/user/memberships/").status_code, 200)
+
+    def test_member_cannot_extend_membership(self):
+        user = make_user()
+        membership = Membership.objects.create(user=user, **self.payload)
+        self.client.force_authenticate(user)
+        response = self.client.patch(
+            f"/api/user/memberships/{membership.pk}/",
+            {"end_date": self.start + timedelta(days=3650)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 403)
+        response = self.client.delete(f"/api/user/memberships/{membership.pk}/")
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(Membership.objects.filter(pk=membership.pk).exists())
+
+    def test_staff_registers_membership(self):
+        staff = make_user(is_staff=True)
+        member = make_user()
+        self.client.force_authenticate(staff)
+        response = self.client.post(
+            "/api/user/memberships/",
+            {"user": member.pk, **self.payload},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["user"], member.pk)
+        response = self.client.post(
+            "/api/user/memberships/",
+            {
+                "start_date": self.start,
+                "end_date": self.start + timedelta(days=30),
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["user"], staff.pk)
+
+
+class MembershipStatusTestCase(APITestCase):
+    """
+    Annotation is_member_now des utilisateurs.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.member = make_user()
+        cls.former = make_user()
+        cls.inactive = make_user()
+        for user, start, is_active in (
+            (cls.member, now - timedelta(days=10), True),
+            (cls.former, now - timedelta(days=400), True),
+            (cls.inactive, now - timedelta(days=10), False),
+        ):
+            Membership.objects.create(
+                user=user,
+                start_date=start,
+                end_date=start + timedelta(days=364),
+                is_active=is_active,
+            )
+
+    def test_annotation(self):
+        statuses = dict(
+            User.objects.with_membership_status().values_list("pk", "is_member_now")
+        )
+        self.assertTrue(statuses[self.member.pk])
+        self.assertFalse(statuses[self.former.pk])
+        self.assertFalse(statuses[self.inactive.pk])
+
+    def test_user_list_exposes_status(self):
+        self.client.force_authenticate(self.former)
+        response = self.client.get("/api/user/users/")
+        statuses = {
+            item["id"]: item["is_member_now"] for item in response.data["results"]
+        }
+        self.assertEqual(
+            statuses,
+            {self.member.pk: True, self.former.pk: False, self.inactive.pk: False},
+        )
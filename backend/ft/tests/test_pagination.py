@@ -0,0 +1,78 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from ft.pagination import KeysetCursorPagination
+from ft.resources.models import Link
+from ft.tests.factories import make_user
+
+
+class KeysetCursorPaginationTestCase(APITestCase):
+    """
+    Pagination par curseur sur un ordre composite dont le premier champ a
+    beaucoup d'égalités (plus que l'ancienne limite d'OFFSET de 1000).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        links = Link.objects.bulk_create(
+            Link(name="Lien", url="https://tocarde.fr") for _ in range(1100)
+        )
+        ids = [link.pk for link in links]
+        # Quelques dates distinctes, et beaucoup d'égalités
+        Link.objects.filter(pk__in=ids[::7]).update(created_at=now - timedelta(days=1))
+        Link.objects.exclude(pk__in=ids[::7]).update(created_at=now)
+        # Ordre naturel de la liste (cursor_ordering de LinkViewSet)
+        cls.ids = list(Link.objects.order_by("name", "id").values_list("pk", flat=True))
+
+    def walk(self, url, link="next"):
+        seen, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            page = [item["id"] for item in response.data["results"]]
+            seen.extend(page if link == "next" else reversed(page))
+            url = response.data[link]
+            pages += 1
+        return seen, pages
+
+    def test_walks_every_row_once_in_order(self):
+        self.client.force_authenticate(make_user())
+        seen, pages = self.walk("/api/resources/links/?pagination=cursor")
+        self.assertEqual(seen, self.ids)
+        self.assertEqual(pages, -(-len(self.ids) // 50))
+
+    def test_walks_back_with_previous_links(self):
+        self.client.force_authenticate(make_user())
+        url = "/api/resources/links/?pagination=cursor"
+        while True:
+            response = self.client.get(url)
+            if not response.data["next"]:
+                break
+            url = response.data["next"]
+        last_page = [item["id"] for item in response.data["results"]]
+        seen, _ = self.walk(response.data["previous"], link="previous")
+        self.assertEqual(seen[::-1] + last_page, self.ids)
+
+    def test_mixed_directions(self):
+        paginator = KeysetCursorPagination()
+        view = SimpleNamespace(cursor_ordering=("-created_at", "id"))
+        expected = list(
+            Link.objects.order_by("-created_at", "id").values_list("pk", flat=True)
+        )
+        seen, url = [], "/api/resources/links/"
+        while url:
+            request = Request(APIRequestFactory().get(url))
+            page = paginator.paginate_queryset(Link.objects.all(), request, view)
+            seen.extend(link.pk for link in page)
+            url = paginator.get_next_link()
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor(self):
+        self.client.force_authenticate(make_user())
+        response = self.client.get("/api/resources/links/", {"cursor": "nope"})
+        self.assertEqual(response.status_code, 404)
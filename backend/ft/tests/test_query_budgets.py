@@ -0,0 +1,326 @@
+import sys
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from ft.event.models import (
+    CarpoolRequest,
+    CarpoolTrip,
+    EventHosting,
+    EventHostingRequest,
+)
+from ft.resources.models import Link
+from ft.tests.factories import make_event, make_trip, make_user, seed_dataset
+from ft.user.models import Membership
+
+# Taille du jeu de données initial et nombre de lots ajoutés avant la seconde
+# mesure des listes : le nombre de requêtes ne doit pas varier entre les deux.
+INITIAL_SIZE = 2
+GROWTH_SIZE = 5
+
+
+class QueryBudgetTestCase(APITestCase):
+    """
+    Vérifie que chaque endpoint de l'API reste sous un budget fixe de requêtes
+    SQL, et que ce nombre ne dépend pas du nombre de lignes listées.
+
+    Les nombres mesurés sont affichés en fin de classe pour pouvoir resserrer
+    les budgets au fil des optimisations.
+    """
+
+    measured = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = make_user()
+        seed_dataset(cls.viewer, INITIAL_SIZE)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        width = max(len(name) for name in cls.measured) if cls.measured else 0
+        sys.stdout.write("\nRequêtes SQL par endpoint (mesuré / budget) :\n")
+        for name, (queries, budget) in sorted(cls.measured.items()):
+            sys.stdout.write(f"  {name.ljust(width)}  {queries:>3} / {budget}\n")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.viewer)
+
+    def count_queries(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data, format="json")
+        self.assertLess(
+            response.status_code,
+            400,
+            f"{method.upper()} {url} a renvoyé {response.status_code}: "
+            f"{getattr(response, 'data', response.content)}",
+        )
+        return len(queries), queries
+
+    def assertQueryBudget(self, name, budget, url, method="get", data=None):
+        """
+        Vérifie qu'un appel reste sous le budget de requêtes.
+        """
+        measured, queries = self.count_queries(method, url, data)
+        self.measured[name] = (measured, budget)
+        self.assertLessEqual(
+            measured,
+            budget,
+            f"{name}: {measured} requêtes pour un budget de {budget}\n"
+            + "\n".join(query["sql"] for query in queries),
+        )
+
+    def assertListBudget(self, name, budget, url):
+        """
+        Vérifie qu'une liste reste sous le budget de requêtes, et que ce nombre
+        ne change pas quand le nombre de lignes listées augmente.
+        """
+        small, _ = self.count_queries("get", url)
+        seed_dataset(self.viewer, GROWTH_SIZE)
+        cache.clear()
+        large, queries = self.count_queries("get", url)
+        self.measured[name] = (large, budget)
+        self.assertEqual(
+            small,
+            large,
+            f"{name}: {small} requêtes avec {INITIAL_SIZE} lots, {large} avec "
+            f"{INITIAL_SIZE + GROWTH_SIZE} lots\n"
+            + "\n".join(query["sql"] for query in queries),
+        )
+        self.assertLessEqual(large, budget, f"{name}: budget de {budget} dépassé")
+
+    # Événements
+
+    def test_event_list(self):
+        self.assertListBudget("events list", 4, "/api/event/events/")
+
+    def test_event_list_cursor(self):
+        self.assertListBudget(
+            "events list (cursor)", 4, "/api/event/events/?pagination=cursor"
+        )
+
+    def test_event_retrieve(self):
+        event = self.viewer.eventsubscription_set.first().event
+        self.assertQueryBudget("events retrieve", 3, f"/api/event/events/{event.pk}/")
+
+    def test_event_subscribe(self):
+        event = make_event()
+        self.assertQueryBudget(
+            "events subscribe",
+            12,
+            f"/api/event/events/{event.pk}/subscribe/",
+            method="post",
+            data={"answer": "MAYBE"},
+        )
+
+    def test_event_subscription_list(self):
+        self.assertListBudget(
+            "event-subscriptions list", 3, "/api/event/event-subscriptions/"
+        )
+
+    def test_event_subscription_retrieve(self):
+        subscription = self.viewer.eventsubscription_set.first()
+        self.assertQueryBudget(
+            "event-subscriptions retrieve",
+            2,
+            f"/api/event/event-subscriptions/{subscription.pk}/",
+        )
+
+    # Hébergements
+
+    def test_event_hosting_list(self):
+        self.assertListBudget("event-hostings list", 3, "/api/event/event-hostings/")
+
+    def test_event_hosting_retrieve(self):
+        hosting = EventHosting.objects.filter(host=self.viewer).first()
+        self.assertQueryBudget(
+            "event-hostings retrieve", 3, f"/api/event/event-hostings/{hosting.pk}/"
+        )
+
+    def test_event_hosting_me(self):
+        self.assertListBudget("event-hostings me", 3, "/api/event/event-hostings/me/")
+
+    def test_event_hosting_for_event(self):
+        event = self.viewer.eventsubscription_set.first().event
+        self.assertQueryBudget(
+            "event-hostings for_event",
+            3,
+            f"/api/event/event-hostings/for_event/?event_id={event.pk}",
+        )
+
+    def test_event_hosting_available_places(self):
+        hosting = EventHosting.objects.filter(host=self.viewer).first()
+        self.assertQueryBudget(
+            "event-hostings available_places",
+            3,
+            f"/api/event/event-hostings/{hosting.pk}/available_places/",
+        )
+
+    # Demandes d'hébergement
+
+    def test_event_hosting_request_list(self):
+        self.assertListBudget(
+            "event-hosting-requests list", 3, "/api/event/event-hosting-requests/"
+        )
+
+    def test_event_hosting_request_retrieve(self):
+        hosting_request = EventHostingRequest.objects.filter(
+            requester=self.viewer
+        ).first()
+        self.assertQueryBudget(
+            "event-hosting-requests retrieve",
+            5,
+            f"/api/event/event-hosting-requests/{hosting_request.pk}/",
+        )
+
+    def test_event_hosting_request_my_requests(self):
+        self.assertListBudget(
+            "event-hosting-requests my_requests",
+            3,
+            "/api/event/event-hosting-requests/my_requests/",
+        )
+
+    def test_event_hosting_request_for_my_hostings(self):
+        self.assertListBudget(
+            "event-hosting-requests for_my_hostings",
+            3,
+            "/api/event/event-hosting-requests/for_my_hostings/",
+        )
+
+    def test_event_hosting_request_accept(self):
+        hosting_request = EventHostingRequest.objects.filter(
+            hosting__host=self.viewer
+        ).first()
+        self.assertQueryBudget(
+            "event-hosting-requests accept",
+            10,
+            f"/api/event/event-hosting-requests/{hosting_request.pk}/accept/",
+            method="post",
+            data={"host_message": "Bienvenue"},
+        )
+
+    def test_event_hosting_request_reject(self):
+        hosting_request = EventHostingRequest.objects.filter(
+            hosting__host=self.viewer
+        ).first()
+        self.assertQueryBudget(
+            "event-hosting-requests reject",
+            10,
+            f"/api/event/event-hosting-requests/{hosting_request.pk}/reject/",
+            method="post",
+        )
+
+    def test_event_hosting_request_cancel(self):
+        hosting_request = EventHostingRequest.objects.filter(
+            requester=self.viewer
+        ).first()
+        self.assertQueryBudget(
+            "event-hosting-requests cancel",
+            10,
+            f"/api/event/event-hosting-requests/{hosting_request.pk}/cancel/",
+            method="post",
+        )
+
+    # Covoiturages
+
+    def test_carpool_trip_list(self):
+        self.assertListBudget("carpool-trips list", 4, "/api/event/carpool-trips/")
+
+    def test_carpool_trip_list_has_seats(self):
+        self.assertListBudget(
+            "carpool-trips list (has_seats)",
+            4,
+            "/api/event/carpool-trips/?has_seats=true",
+        )
+
+    def test_carpool_trip_retrieve(self):
+        trip = CarpoolTrip.objects.filter(driver=self.viewer).first()
+        self.assertQueryBudget(
+            "carpool-trips retrieve", 4, f"/api/event/carpool-trips/{trip.pk}/"
+        )
+
+    def test_carpool_request_list(self):
+        self.assertListBudget(
+            "carpool-requests list", 4, "/api/event/carpool-requests/"
+        )
+
+    def test_carpool_request_retrieve(self):
+        carpool_request = CarpoolRequest.objects.filter(passenger=self.viewer).first()
+        self.assertQueryBudget(
+            "carpool-requests retrieve",
+            4,
+            f"/api/event/carpool-requests/{carpool_request.pk}/",
+        )
+
+    def test_carpool_request_accept(self):
+        trip = make_trip(self.viewer, make_event())
+        carpool_request = CarpoolRequest.objects.create(
+            trip=trip, passenger=make_user()
+        )
+        self.assertQueryBudget(
+            "carpool-requests request_action",
+            13,
+            f"/api/event/carpool-requests/{carpool_request.pk}/request_action/",
+            method="post",
+            data={"action": "accept"},
+        )
+
+    def test_carpool_request_payment(self):
+        carpool_request = CarpoolRequest.objects.filter(
+            trip__driver=self.viewer
+        ).first()
+        self.assertQueryBudget(
+            "carpool-requests payment",
+            13,
+            f"/api/event/carpool-requests/{carpool_request.pk}/payment/",
+            method="post",
+            data={"amount": "5.00", "is_completed": True},
+        )
+
+    def test_carpool_payment_list(self):
+        self.assertListBudget(
+            "carpool-payments list", 3, "/api/event/carpool-payments/"
+        )
+
+    def test_carpool_payment_retrieve(self):
+        payment = CarpoolRequest.objects.filter(passenger=self.viewer).first()
+        payment = payment.payments.first()
+        self.assertQueryBudget(
+            "carpool-payments retrieve",
+            2,
+            f"/api/event/carpool-payments/{payment.pk}/",
+        )
+
+    # Utilisateurs et adhésions
+
+    def test_user_list(self):
+        self.assertListBudget("users list", 2, "/api/user/users/")
+
+    def test_user_retrieve(self):
+        self.assertQueryBudget(
+            "users retrieve", 1, f"/api/user/users/{self.viewer.pk}/"
+        )
+
+    def test_current_user(self):
+        self.assertQueryBudget("users me", 0, "/api/user/me/")
+
+    def test_membership_list(self):
+        self.assertListBudget("memberships list", 2, "/api/user/memberships/")
+
+    def test_membership_retrieve(self):
+        membership = Membership.objects.first()
+        self.assertQueryBudget(
+            "memberships retrieve", 1, f"/api/user/memberships/{membership.pk}/"
+        )
+
+    # Ressources
+
+    def test_link_list(self):
+        self.assertListBudget("links list", 3, "/api/resources/links/")
+
+    def test_link_retrieve(self):
+        link = Link.objects.first()
+        self.assertQueryBudget("links retrieve", 1, f"/api/resources/links/{link.pk}/")
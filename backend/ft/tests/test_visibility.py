@@ -0,0 +1,68 @@
+from django.test import TestCase
+
+from ft.event.models import (
+    CarpoolPayment,
+    CarpoolRequest,
+    EventHosting,
+    EventHostingRequest,
+)
+from ft.tests.factories import make_event, make_trip, make_user
+
+
+class VisibleToTestCase(TestCase):
+    """
+    visible_to() renvoie les lignes dont l'utilisateur est l'un des
+    participants, et elles seules.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, driver, other = make_user(), make_user(), make_user()
+        event = make_event()
+
+        own_trip = make_trip(cls.user, event)
+        other_trip = make_trip(driver, event)
+        cls.as_driver = CarpoolRequest.objects.create(trip=own_trip, passenger=other)
+        cls.as_passenger = CarpoolRequest.objects.create(
+            trip=other_trip, passenger=cls.user
+        )
+        cls.unrelated = CarpoolRequest.objects.create(trip=other_trip, passenger=other)
+        for carpool_request in (cls.as_driver, cls.as_passenger, cls.unrelated):
+            CarpoolPayment.objects.create(request=carpool_request, amount=5)
+
+        own_hosting = EventHosting.objects.create(
+            event=event, host=cls.user, available_beds=2
+        )
+        other_hosting = EventHosting.objects.create(
+            event=event, host=driver, available_beds=2
+        )
+        cls.as_host = EventHostingRequest.objects.create(
+            hosting=own_hosting, requester=other
+        )
+        cls.as_requester = EventHostingRequest.objects.create(
+            hosting=other_hosting, requester=cls.user
+        )
+        EventHostingRequest.objects.create(hosting=other_hosting, requester=make_user())
+
+    def test_carpool_requests(self):
+        self.assertQuerySetEqual(
+            CarpoolRequest.objects.visible_to(self.user),
+            {self.as_driver, self.as_passenger},
+            ordered=False,
+        )
+
+    def test_carpool_payments(self):
+        self.assertQuerySetEqual(
+            CarpoolPayment.objects.visible_to(self.user).values_list(
+                "request", flat=True
+            ),
+            {self.as_driver.pk, self.as_passenger.pk},
+            ordered=False,
+        )
+
+    def test_hosting_requests(self):
+        self.assertQuerySetEqual(
+            EventHostingRequest.objects.visible_to(self.user),
+            {self.as_host, self.as_requester},
+            ordered=False,
+        )
@@ -2,7 +2,6 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.utils.translation import gettext_lazy as _
 from ft.user.models import User, Membership
-from django.core.exceptions import ValidationError
 
 
 @admin.register(User)
@@ -18,6 +17,7 @@ class UserAdmin(UserAdmin):
         "can_host_peoples",
         "home_available_beds",
         "home_rules",
+        "is_member_now",
         "is_staff",
         "is_active",
     )
@@ -108,6 +108,13 @@ class UserAdmin(UserAdmin):
     ordering = ("last_name", "first_name", "email")
     list_filter = ("faluche_status", "has_car", "can_host_peoples")
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_membership_status()
+
+    @admin.display(boolean=True, description="Adhérent", ordering="is_member_now")
+    def is_member_now(self, obj):
+        return obj.is_member_now
+
 
 @admin.register(Membership)
 class MembershipAdmin(admin.ModelAdmin):
@@ -123,25 +130,3 @@ class MembershipAdmin(admin.ModelAdmin):
     readonly_fields = ("created_at", "updated_at")
     search_fields = ("user",)
     ordering = ("start_date", "end_date", "user")
-
-    def save_model(self, request, obj, form, change):
-        # Validation: une seule adhésion active par période
-        if obj.is_active:
-            overlapping = Membership.objects.filter(
-                user=obj.user,
-                is_active=True,
-                start_date__lte=obj.end_date,
-                end_date__gte=obj.start_date,
-            )
-
-            # Exclure l'instance actuelle si c'est une modification
-            if change:
-                overlapping = overlapping.exclude(pk=obj.pk)
-
-            if overlapping.exists():
-                raise ValidationError(
-                    "Cet utilisateur a déjà une adhésion active "
-                    "pendant cette période."
-                )
-
-        super().save_model(request, obj, form, change)
@@ -0,0 +1,35 @@
+from django.contrib.postgres.fields import DateTimeRangeField, RangeBoundary
+from django.contrib.postgres.functions import TransactionNow
+from django.db import models
+from django.db.models import Func
+
+
+class MembershipQuerySet(models.QuerySet):
+    """
+    QuerySet des adhésions.
+    """
+
+    @staticmethod
+    def period():
+        """
+        Période couverte par une adhésion, dates de début et de fin incluses.
+        Expression de la contrainte d'exclusion de Membership : les filtres
+        qui l'utilisent sont servis par son index GiST.
+        """
+        return Func(
+            "start_date",
+            "end_date",
+            RangeBoundary(inclusive_lower=True, inclusive_upper=True),
+            function="TSTZRANGE",
+            output_field=DateTimeRangeField(),
+        )
+
+    def current(self):
+        """
+        Adhésions actives qui couvrent l'instant présent.
+        """
+        return (
+            self.filter(is_active=True)
+            .alias(period=self.period())
+            .filter(period__contains=TransactionNow())
+        )
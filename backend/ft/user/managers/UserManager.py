@@ -1,7 +1,9 @@
 from django.contrib.auth.base_user import BaseUserManager
 
+from .UserQuerySet import UserQuerySet
 
-class UserManager(BaseUserManager):
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     use_in_migrations = True
 
     def _create_user(self, email, password, **extra_fields):
@@ -0,0 +1,22 @@
+from django.db import models
+from django.db.models import Exists, OuterRef
+
+
+class UserQuerySet(models.QuerySet):
+    """
+    QuerySet des utilisateurs, avec les annotations utilisées par les listes.
+    """
+
+    def with_membership_status(self):
+        """
+        Annote si l'utilisateur est adhérent aujourd'hui (is_member_now), par
+        une sous-requête EXISTS servie par l'index de la contrainte
+        d'exclusion des adhésions, au lieu d'une requête par utilisateur.
+        """
+        from ft.user.models import Membership
+
+        return self.annotate(
+            is_member_now=Exists(
+                Membership.objects.current().filter(user=OuterRef("pk"))
+            )
+        )
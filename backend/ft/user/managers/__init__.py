@@ -1,3 +1,5 @@
+from .MembershipQuerySet import MembershipQuerySet
+from .UserQuerySet import UserQuerySet
 from .UserManager import UserManager
 
-__all__ = ["UserManager"]
+__all__ = ["MembershipQuerySet", "UserQuerySet", "UserManager"]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("user", "0002_membership"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="membership",
+            index=models.Index(
+                fields=["start_date", "end_date", "id"], name="membership_dates_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["last_name", "first_name", "id"], name="user_name_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:29
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+from django.db.models import F
+
+
+def deactivate_overlapping_memberships(apps, schema_editor):
+    """
+    Désactive les adhésions actives qui empêcheraient la pose de la
+    contrainte : dates inversées, ou chevauchement avec une adhésion plus
+    ancienne du même utilisateur (vérification applicative concurrente).
+    """
+    Membership = apps.get_model("user", "Membership")
+    active = Membership.objects.filter(is_active=True)
+    invalid = set(
+        active.filter(end_date__lt=F("start_date")).values_list("pk", flat=True)
+    )
+    kept = {}
+    for pk, user, start, end in (
+        active.exclude(pk__in=invalid)
+        .order_by("user", "start_date", "created_at", "id")
+        .values_list("pk", "user", "start_date", "end_date")
+    ):
+        # Triées par début : il suffit de comparer à la dernière conservée
+        if user in kept and start <= kept[user]:
+            invalid.add(pk)
+        else:
+            kept[user] = end
+    Membership.objects.filter(pk__in=invalid).update(is_active=False)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0003_cursor_pagination_indexes"),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.RunPython(
+            deactivate_overlapping_memberships, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="membership",
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                condition=models.Q(("is_active", True)),
+                expressions=[
+                    ("user", "="),
+                    (
+                        models.Func(
+                            "start_date",
+                            "end_date",
+                            django.contrib.postgres.fields.ranges.RangeBoundary(
+                                inclusive_lower=True, inclusive_upper=True
+                            ),
+                            function="TSTZRANGE",
+                            output_field=django.contrib.postgres.fields.ranges.DateTimeRangeField(),
+                        ),
+                        "&&",
+                    ),
+                ],
+                name="membership_no_overlap",
+                violation_error_message="Cet utilisateur a déjà une adhésion active pendant cette période.",
+            ),
+        ),
+    ]
@@ -1,6 +1,9 @@
 from datetime import datetime
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import RangeOperators
 from django.db import models
 
+from ft.user.managers import MembershipQuerySet
 from ft.user.models import User
 
 
@@ -37,10 +40,34 @@ class Membership(models.Model):
         help_text="Date de mise à jour de l'adhésion",
     )
 
+    objects = MembershipQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Adhésion"
         verbose_name_plural = "Adhésions"
         ordering = ["start_date", "end_date"]
+        indexes = [
+            # Ordre de la pagination par curseur
+            models.Index(
+                fields=["start_date", "end_date", "id"], name="membership_dates_id_idx"
+            ),
+        ]
+        constraints = [
+            # Pas deux adhésions actives d'un même utilisateur sur des périodes
+            # qui se chevauchent, vérifié par la base. L'index GiST (btree_gist
+            # pour l'égalité sur user) sert aussi MembershipQuerySet.current()
+            ExclusionConstraint(
+                name="membership_no_overlap",
+                expressions=[
+                    ("user", RangeOperators.EQUAL),
+                    (MembershipQuerySet.period(), RangeOperators.OVERLAPS),
+                ],
+                condition=models.Q(is_active=True),
+                violation_error_message=(
+                    "Cet utilisateur a déjà une adhésion active pendant cette période."
+                ),
+            ),
+        ]
 
     def __str__(self):
         return "{} {} ({})".format(
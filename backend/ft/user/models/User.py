@@ -96,6 +96,12 @@ class User(AbstractUser):
         verbose_name = "User"
         verbose_name_plural = "Users"
         ordering = ["last_name", "first_name"]
+        indexes = [
+            # Ordre de la pagination par curseur
+            models.Index(
+                fields=["last_name", "first_name", "id"], name="user_name_id_idx"
+            ),
+        ]
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
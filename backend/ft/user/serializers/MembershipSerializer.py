@@ -1,6 +1,10 @@
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from ft.user.models import Membership
 
+# Contrainte d'exclusion de Membership.Meta.constraints
+NO_OVERLAP_CONSTRAINT = "membership_no_overlap"
+
 
 class MembershipSerializer(serializers.ModelSerializer):
     class Meta:
@@ -19,45 +23,31 @@ class MembershipSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
         extra_kwargs = {
-            "user": {"read_only": True},
+            "user": {"required": False},
         }
 
     def validate(self, data):
-        # On ne vérifie que si l'adhésion est active
-        is_active = data.get(
-            "is_active", self.instance.is_active if self.instance else True
-        )
-        if not is_active:
-            return data
-
-        user = self.context["request"].user if not self.instance else self.instance.user
         start_date = data.get(
             "start_date", self.instance.start_date if self.instance else None
         )
         end_date = data.get(
             "end_date", self.instance.end_date if self.instance else None
         )
+        if start_date and end_date and end_date < start_date:
+            raise serializers.ValidationError(
+                {"end_date": "La date de fin doit suivre la date de début."}
+            )
+        return data
 
-        # Recherche d'adhésions actives qui se chevauchent
-        overlapping = Membership.objects.filter(
-            user=user,
-            is_active=True,
-        ).exclude(
-            # Exclure l'instance en cours de modification
-            pk=self.instance.pk
-            if self.instance
-            else None
-        )
-
-        # Vérifier s'il y a chevauchement de dates
-        overlapping = overlapping.filter(
-            start_date__lte=end_date,  # Début avant fin
-            end_date__gte=start_date,  # Fin après début
-        )
-
-        if overlapping.exists():
+    def save(self, **kwargs):
+        # Le chevauchement de deux adhésions actives est rejeté par la
+        # contrainte d'exclusion, dans l'INSERT ou l'UPDATE même
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError as error:
+            if NO_OVERLAP_CONSTRAINT not in str(error):
+                raise
             raise serializers.ValidationError(
                 "Cet utilisateur a déjà une adhésion active " "pendant cette période."
             )
-
-        return data
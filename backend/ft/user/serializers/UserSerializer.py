@@ -3,6 +3,9 @@ from ft.user.models import User
 
 
 class UserSerializer(serializers.ModelSerializer):
+    # Annoté par UserQuerySet.with_membership_status() (omis sinon)
+    is_member_now = serializers.BooleanField(read_only=True)
+
     class Meta:
         model = User
         fields = [
@@ -28,6 +31,7 @@ class UserSerializer(serializers.ModelSerializer):
             "home_rules",
             "faluche_nickname",
             "faluche_status",
+            "is_member_now",
         ]
         read_only_fields = [
             "last_login",
@@ -1,11 +1,25 @@
 from ft.user.models import Membership
 from ft.user.serializers import MembershipSerializer
+from ft.event.permissions import IsStaffOrReadOnly
 from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
 
 
 class MembershipViewSet(viewsets.ModelViewSet):
     queryset = Membership.objects.all()
     serializer_class = MembershipSerializer
+    # Seul le staff enregistre, modifie ou supprime les adhésions
+    permission_classes = [IsAuthenticated, IsStaffOrReadOnly]
+    # Ordre de la pagination par curseur (?pagination=cursor)
+    cursor_ordering = ("start_date", "end_date", "id")
 
     def get_queryset(self):
         return Membership.objects.filter(is_active=True)
+
+    def perform_create(self, serializer):
+        """
+        Associe l'adhésion à l'utilisateur indiqué, ou à défaut au membre du
+        staff qui la crée.
+        """
+        user = serializer.validated_data.get("user", self.request.user)
+        serializer.save(user=user)
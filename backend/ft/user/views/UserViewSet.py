@@ -6,6 +6,8 @@ from ft.user.serializers import UserSerializer
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    # Ordre de la pagination par curseur (?pagination=cursor)
+    cursor_ordering = ("last_name", "first_name", "id")
 
     def get_queryset(self):
-        return User.objects.filter(is_active=True)
+        return User.objects.filter(is_active=True).with_membership_status()
@@ -0,0 +1,61 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+)
+from django.utils.http import quote_etag
+
+
+class ConditionalListMixin:
+    """
+    Ajoute les requêtes conditionnelles (ETag) à l'action list d'un ViewSet.
+
+    Le validateur est calculé par une seule requête d'agrégat sur le queryset
+    filtré (date de dernière modification et nombre de lignes) : si le client
+    possède déjà la version courante, on renvoie une 304 sans sérialiser.
+
+    Pas d'en-tête Last-Modified : la suppression d'une ligne (ou sa sortie
+    des filtres) ne fait pas avancer la date de dernière modification, un
+    If-Modified-Since donnerait alors une 304 pour une liste modifiée. L'ETag
+    tient compte du nombre de lignes.
+    """
+
+    # Champ de date de mise à jour des objets listés
+    last_modified_field = "updated_at"
+
+    def get_list_etag(self, request, queryset):
+        """
+        Renvoie l'ETag de la liste demandée.
+        """
+        aggregates = queryset.order_by().aggregate(
+            last_modified=Max(self.last_modified_field),
+            count=Count("pk"),
+        )
+        last_modified = aggregates["last_modified"]
+        # L'ETag dépend aussi de la requête (pagination, filtres, format) et de
+        # l'utilisateur, les listes pouvant être filtrées selon ses droits
+        fingerprint = "|".join(
+            [
+                request.get_full_path(),
+                str(request.user.pk),
+                request.accepted_renderer.format,
+                str(aggregates["count"]),
+                last_modified.isoformat() if last_modified else "",
+            ]
+        )
+        return quote_etag(hashlib.md5(fingerprint.encode()).hexdigest())
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        etag = self.get_list_etag(request, queryset)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+
+        response.headers["ETag"] = etag
+        # Le client doit revalider à chaque fois (réponse privée)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
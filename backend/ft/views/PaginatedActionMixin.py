@@ -0,0 +1,22 @@
+from rest_framework.response import Response
+
+
+class PaginatedActionMixin:
+    """
+    Renvoie les listes des actions personnalisées d'un ViewSet (ex: « mes
+    demandes ») comme l'action list : filtrées par les filtres de la vue et
+    paginées, pour que la taille de la réponse reste bornée.
+    """
+
+    def list_response(self, queryset):
+        """
+        Sérialise une page du queryset, ou tout le queryset si la vue n'a pas
+        de pagination.
+        """
+        queryset = self.filter_queryset(queryset)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)